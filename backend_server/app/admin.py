@@ -0,0 +1,163 @@
+"""
+Schema setup and sample-data seeding, kept out of the API workers' import path.
+
+    python -m app.admin migrate     # tables, indexes, views, NOTIFY triggers
+    python -m app.admin seed        # default robot + sampleDataInDB CSVs, only into empty tables
+    python -m app.admin setup       # both
+
+Each command runs in one transaction under a PostgreSQL advisory lock, so
+concurrent runs (several uvicorn workers with DB_AUTO_SETUP, or a deploy
+script racing a worker) are serialised. The second run finds everything in
+place and does nothing. Run `setup` before starting the API and after
+every deploy; with DB_AUTO_SETUP=true each worker runs it in its lifespan
+instead.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import exists, func, insert, inspect, select, text
+
+from app import bulk, crud, database, live, models, sales
+
+# pg_advisory_xact_lock key for setup (arbitrary, fixed)
+SETUP_LOCK_KEY = 0x76656E64
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sampleDataInDB")
+
+DEFAULT_ROBOT = {
+    "name": "VendorBot Alpha",
+    "image_url": "https://vendorbot.com/images/alpha.png",
+    "status": "idle",
+    "battery_level": 95,
+}
+
+
+# Columns added to tables after they were first created: (table, column,
+# backfill for the existing rows or None). create_all never alters a table.
+ADDED_COLUMNS = [
+    # The token older kiosks stored in videourl, until the camera replaced it
+    # with the video path; rows already holding a path keep NULL
+    ("delivery_records", "recording_session_id", f"""
+        UPDATE delivery_records SET recording_session_id = videourl
+        WHERE recording_session_id IS NULL AND videourl ~ '{crud.RECORDING_SESSION_ID_PATTERN}'
+    """),
+]
+
+
+def _add_columns(conn):
+    inspector = inspect(conn)
+    for table_name, column_name, backfill in ADDED_COLUMNS:
+        if column_name in {c["name"] for c in inspector.get_columns(table_name)}:
+            continue
+        column = models.Base.metadata.tables[table_name].c[column_name]
+        conn.execute(text(
+            f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(conn.dialect)}"
+        ))
+        filled = conn.execute(text(backfill)).rowcount if backfill else 0
+        print(f"Added {table_name}.{column_name} (backfilled {filled} rows).")
+
+
+# Columns made NOT NULL after the table was created: (table, column, value
+# for the rows that hold NULL). Keyset pagination cannot order or resume
+# after a NULL created_at.
+NOT_NULL_COLUMNS = [
+    ("robot_logs", "created_at", "now()"),
+    ("delivery_records", "created_at", "COALESCE(last_updated_at, now())"),
+]
+
+
+def _set_not_null(conn):
+    inspector = inspect(conn)
+    for table_name, column_name, fill in NOT_NULL_COLUMNS:
+        columns = {c["name"]: c for c in inspector.get_columns(table_name)}
+        if not columns[column_name]["nullable"]:
+            continue
+        filled = conn.execute(text(
+            f"UPDATE {table_name} SET {column_name} = {fill} WHERE {column_name} IS NULL"
+        )).rowcount
+        conn.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET NOT NULL"))
+        print(f"Made {table_name}.{column_name} NOT NULL (filled {filled} rows).")
+
+
+# Constraints replaced by newer ones: (table, constraint). Dropped after the
+# new indexes exist.
+DROPPED_CONSTRAINTS = [
+    # Unique per (robot, code, status) forbade two delivered orders sharing a
+    # code; uq_delivery_records_active_code only covers open orders
+    ("delivery_records", "_robot_code_status_uc"),
+]
+
+
+# Tables filled from existing data when migrate creates them
+BACKFILLS = {
+    "order_items": sales.BACKFILL_SQL,
+}
+
+
+def migrate(conn):
+    """Create missing tables, columns, sequences, indexes, views and triggers."""
+    missing = [name for name in BACKFILLS if not inspect(conn).has_table(name)]
+    models.Base.metadata.create_all(bind=conn)
+    _add_columns(conn)
+    _set_not_null(conn)
+    for name in missing:
+        filled = conn.execute(text(BACKFILLS[name])).rowcount
+        print(f"Created {name} (backfilled {filled} rows).")
+    # create_all only indexes tables it creates; add newer indexes to old tables
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    for table_name, constraint in DROPPED_CONSTRAINTS:
+        conn.execute(text(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint}"))
+    sales.install_views(conn)
+    live.install_triggers(conn)
+
+
+def _empty(conn, model) -> bool:
+    return not conn.execute(select(exists().select_from(model))).scalar()
+
+
+def seed(conn):
+    """Load sample data into tables that are still empty (one COPY per file)."""
+    if _empty(conn, models.Robot):
+        conn.execute(insert(models.Robot), [DEFAULT_ROBOT])
+        print("Created default robot.")
+
+    # Headerless files, every column in table order (ids included)
+    for model, filename in (
+        (models.InventoryItem, "iventory.csv"),
+        (models.RobotLog, "logdata.csv"),
+    ):
+        if not _empty(conn, model):
+            continue
+        path = os.path.join(SAMPLE_DIR, filename)
+        if not os.path.exists(path):
+            print(f"ERROR: CSV file not found at {path}. Skipping {model.__tablename__}.")
+            continue
+        print(f"Seeded {bulk.copy_file(conn, model.__table__, path)} rows into {model.__tablename__}.")
+
+
+def setup(migrate_schema=True, seed_data=True):
+    with database.engine.begin() as conn:
+        conn.execute(select(func.pg_advisory_xact_lock(SETUP_LOCK_KEY)))
+        if migrate_schema:
+            migrate(conn)
+        if seed_data:
+            seed(conn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "seed", "setup"])
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    setup(migrate_schema=args.command in ("migrate", "setup"), seed_data=args.command in ("seed", "setup"))
+    print(f"{args.command}: done in {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
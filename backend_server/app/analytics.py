@@ -0,0 +1,318 @@
+"""
+Server-side analytics over orders, inventory and satisfaction results.
+
+Dashboards read small rollup tables (models.analytics_*), keyed by robot
+or item and the hour of the order's created_at:
+
+  analytics_orders_hourly        orders, units, revenue, delivered, canceled
+                                 and delivery time (created_at ->
+                                 last_updated_at of delivered orders)
+  analytics_item_hourly          units and revenue per inventory item
+  analytics_satisfaction_hourly  satisfaction scores in 10-point buckets
+
+An hour is always rebuilt whole from delivery_records and order_items
+(DELETE + INSERT ... SELECT in one transaction). Refreshing is
+incremental: AnalyticsRefresher follows delivery_records NOTIFY events
+through the /live hub, marks each event's hour dirty, and rebuilds the
+dirty hours every ANALYTICS_REFRESH_INTERVAL_S.
+
+A full rebuild (every hour, all tables) happens only when events may have
+been missed: at startup, when the event stream was interrupted, on
+POST /analytics/refresh, and every ANALYTICS_FULL_REFRESH_S if that is
+set (default 0, never). One worker runs it: the others find its lock
+taken and rebuild only their own dirty hours. Changes that send no NOTIFY
+(migrate backfills) appear at the next full rebuild. Rebuilds take an
+advisory lock, so several workers can run the refresher.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app import database
+from app.live import hub
+
+ANALYTICS_REFRESH_INTERVAL_S = float(os.getenv("ANALYTICS_REFRESH_INTERVAL_S", "5"))
+ANALYTICS_FULL_REFRESH_S = float(os.getenv("ANALYTICS_FULL_REFRESH_S", "0"))   # 0 = only when needed
+
+# pg_advisory_xact_lock keys for rollup rebuilds, and for the single worker
+# running a full rebuild (arbitrary, fixed)
+ANALYTICS_LOCK_KEY = 0x616E6C74
+ANALYTICS_FULL_LOCK_KEY = 0x616E6C66
+
+DELIVERED_STATUSES = ["DELIVERIED", "DELIVERED"]
+CANCELED_STATUSES = ["CANCELED", "CANCELLED", "FAILED"]
+
+ROLLUP_TABLES = ["analytics_orders_hourly", "analytics_item_hourly", "analytics_satisfaction_hourly"]
+
+# {scope} limits a source table to the hours being rebuilt (empty = all)
+_HOURS_SCOPE = (
+    "JOIN unnest(CAST(:hours AS timestamp[])) AS w(h) "
+    "ON {alias}.created_at >= w.h AND {alias}.created_at < w.h + interval '1 hour'"
+)
+
+ROLLUP_SQL = [
+    """
+    INSERT INTO analytics_orders_hourly (robot_id, hour, orders, units, revenue, delivered, canceled,
+                                         delivery_seconds_sum, delivery_seconds_max)
+    SELECT d.robot_id, date_trunc('hour', d.created_at),
+           count(*),
+           COALESCE(sum(l.units), 0),
+           COALESCE(sum(l.revenue), 0),
+           count(*) FILTER (WHERE d.status = ANY(:delivered)),
+           count(*) FILTER (WHERE d.status = ANY(:canceled)),
+           COALESCE(sum(t.seconds) FILTER (WHERE d.status = ANY(:delivered)), 0),
+           max(t.seconds) FILTER (WHERE d.status = ANY(:delivered))
+    FROM delivery_records d {scope_d}
+    LEFT JOIN (
+        -- order_items.created_at is the order's created_at, so the same hours
+        SELECT oi.delivery_record_id, sum(oi.quantity) AS units, sum(oi.quantity * oi.unit_price) AS revenue
+        FROM order_items oi {scope_oi}
+        GROUP BY 1
+    ) l ON l.delivery_record_id = d.id
+    CROSS JOIN LATERAL (
+        SELECT GREATEST(extract(epoch FROM d.last_updated_at - d.created_at), 0) AS seconds
+    ) t
+    WHERE d.robot_id IS NOT NULL AND d.created_at IS NOT NULL
+    GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO analytics_item_hourly (inventory_item_id, hour, units, revenue)
+    SELECT oi.inventory_item_id, date_trunc('hour', oi.created_at),
+           sum(oi.quantity), COALESCE(sum(oi.quantity * oi.unit_price), 0)
+    FROM order_items oi {scope_oi}
+    GROUP BY 1, 2
+    """,
+    # statisfied_level is "{'Happy': ..., 'Satisfaction': '85.3%'}" or "85.3%"
+    r"""
+    INSERT INTO analytics_satisfaction_hourly (robot_id, hour, bucket, responses)
+    SELECT d.robot_id, date_trunc('hour', d.created_at), LEAST(floor(s.score / 10)::int, 9), count(*)
+    FROM delivery_records d {scope_d}
+    CROSS JOIN LATERAL (
+        SELECT (regexp_match(d.statisfied_level, '([0-9]+(?:\.[0-9]+)?)%'))[1]::numeric AS score
+    ) s
+    WHERE d.robot_id IS NOT NULL AND d.created_at IS NOT NULL AND s.score IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+]
+
+
+def refresh(db: Session, hours=None) -> bool:
+    """
+    Rebuild the rollups for the given hour starts, or all of them, and
+    commit. False when a full rebuild was skipped because another worker
+    is running one.
+    """
+    params = {"delivered": DELIVERED_STATUSES, "canceled": CANCELED_STATUSES}
+    if hours is None:
+        where, scope_d, scope_oi = "", "", ""
+    else:
+        params["hours"] = sorted(hours)
+        where = " WHERE hour = ANY(CAST(:hours AS timestamp[]))"
+        scope_d, scope_oi = _HOURS_SCOPE.format(alias="d"), _HOURS_SCOPE.format(alias="oi")
+    try:
+        if hours is None and not db.execute(select(func.pg_try_advisory_xact_lock(ANALYTICS_FULL_LOCK_KEY))).scalar():
+            db.rollback()
+            return False
+        db.execute(select(func.pg_advisory_xact_lock(ANALYTICS_LOCK_KEY)))
+        for table in ROLLUP_TABLES:
+            db.execute(text(f"DELETE FROM {table}{where}"), params)
+        for statement in ROLLUP_SQL:
+            db.execute(text(statement.format(scope_d=scope_d, scope_oi=scope_oi)), params)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+def _hour(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+class AnalyticsRefresher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty: set[datetime] = set()
+        self._need_full = True
+        self._last_full = 0.0
+        self.last_refresh = None
+        self.last_full_refresh = None
+        self.refreshes = 0
+        self.hours_rebuilt = 0
+        self.full_skipped = 0
+
+    @property
+    def pending_hours(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def mark(self, created_at):
+        if not created_at:
+            return
+        try:
+            hour = _hour(created_at)
+        except ValueError:
+            return
+        with self._lock:
+            self._dirty.add(hour)
+
+    def request_full(self):
+        with self._lock:
+            self._need_full = True
+
+    def refresh_pending(self):
+        """Rebuild what is dirty (call in a worker thread)."""
+        with self._lock:
+            full = self._need_full or (
+                ANALYTICS_FULL_REFRESH_S > 0 and time.monotonic() - self._last_full >= ANALYTICS_FULL_REFRESH_S
+            )
+            hours, self._dirty = self._dirty, set()
+            self._need_full = False
+        if not full and not hours:
+            return
+
+        db = database.SessionLocal()
+        try:
+            if full and not refresh(db, None):
+                # Another worker is rebuilding everything; its snapshot or its
+                # own events cover what this one missed
+                full = False
+                with self._lock:
+                    self.full_skipped += 1
+                if hours:
+                    refresh(db, hours)
+            elif not full:
+                refresh(db, hours)
+        except Exception:
+            with self._lock:
+                self._dirty |= hours
+                self._need_full = self._need_full or full
+            raise
+        finally:
+            db.close()
+
+        now = datetime.now()
+        with self._lock:
+            self.last_refresh = now
+            self.refreshes += 1
+            if full:
+                self._last_full = time.monotonic()
+                self.last_full_refresh = now
+            else:
+                self.hours_rebuilt += len(hours)
+
+    async def _follow_events(self):
+        while True:
+            sub = hub.subscribe()
+            try:
+                while (event := await sub.next_event()) is not None:
+                    if event["type"] == "delivery":
+                        self.mark(event["data"].get("created_at"))
+            finally:
+                hub.unsubscribe(sub)
+            # The stream was closed (fell behind or lost LISTEN): events were missed
+            self.request_full()
+
+    async def run(self, interval: float = ANALYTICS_REFRESH_INTERVAL_S):
+        """Refresh loop for the app lifespan."""
+        follower = asyncio.create_task(self._follow_events())
+        try:
+            while True:
+                try:
+                    async with database.db_slots:
+                        await run_in_threadpool(self.refresh_pending)
+                except Exception as e:
+                    print(f"[Analytics] Refresh failed: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            follower.cancel()
+
+
+refresher = AnalyticsRefresher()
+
+
+# ---------------- Queries (rollups only) ----------------
+
+def _range(robot_column: str, robot_id, since, until):
+    clauses, params = ["hour >= :since", "hour < :until"], {"since": since, "until": until}
+    if robot_id is not None:
+        clauses.append(f"{robot_column} = :robot_id")
+        params["robot_id"] = robot_id
+    return " AND ".join(clauses), params
+
+
+def orders(db: Session, robot_id, since: datetime, until: datetime, granularity: str):
+    where, params = _range("robot_id", robot_id, since, until)
+    params["granularity"] = granularity
+    return db.execute(text(f"""
+        SELECT robot_id, date_trunc(:granularity, hour) AS period,
+               sum(orders) AS orders, sum(units) AS units, sum(revenue) AS revenue,
+               sum(delivered) AS delivered, sum(canceled) AS canceled
+        FROM analytics_orders_hourly
+        WHERE {where}
+        GROUP BY 1, 2
+        ORDER BY 2, 1
+    """), params).mappings().all()
+
+
+def delivery_times(db: Session, robot_id, since: datetime, until: datetime):
+    where, params = _range("robot_id", robot_id, since, until)
+    return db.execute(text(f"""
+        SELECT robot_id, sum(delivered) AS delivered,
+               sum(delivery_seconds_sum) / NULLIF(sum(delivered), 0) AS avg_seconds,
+               max(delivery_seconds_max) AS max_seconds
+        FROM analytics_orders_hourly
+        WHERE {where}
+        GROUP BY 1
+        ORDER BY 1
+    """), params).mappings().all()
+
+
+def satisfaction(db: Session, robot_id, since: datetime, until: datetime):
+    where, params = _range("robot_id", robot_id, since, until)
+    counts = dict(db.execute(text(f"""
+        SELECT bucket, sum(responses) FROM analytics_satisfaction_hourly
+        WHERE {where}
+        GROUP BY 1
+    """), params).all())
+    return [{"low": b * 10, "high": b * 10 + 10, "responses": int(counts.get(b, 0))} for b in range(10)]
+
+
+def depletion(db: Session, window_hours: int, robot_id=None):
+    """Sales rate per item over the last window_hours, and hours until its stock runs out."""
+    params = {"window_hours": window_hours}
+    robot_filter = ""
+    if robot_id is not None:
+        robot_filter = "WHERE i.robot_id = :robot_id"
+        params["robot_id"] = robot_id
+    rows = db.execute(text(f"""
+        SELECT i.id AS inventory_item_id, i.name, i.quantity AS stock, COALESCE(s.units, 0) AS units_sold
+        FROM inventory_items i
+        LEFT JOIN (
+            SELECT inventory_item_id, sum(units) AS units
+            FROM analytics_item_hourly
+            WHERE hour >= date_trunc('hour', localtimestamp - make_interval(hours => :window_hours))
+            GROUP BY 1
+        ) s ON s.inventory_item_id = i.id
+        {robot_filter}
+        ORDER BY i.id
+    """), params).mappings().all()
+
+    out = []
+    for row in rows:
+        rate = row["units_sold"] / window_hours
+        out.append({
+            **row,
+            "units_per_hour": rate,
+            "hours_to_empty": (row["stock"] or 0) / rate if rate > 0 else None,
+        })
+    return out
@@ -0,0 +1,255 @@
+"""
+Bulk import and export for inventory, logs and delivery records.
+
+Imports are loaded with one PostgreSQL COPY per request, which reads the
+upload while it is still arriving (see ChunkReader), so memory stays flat
+whatever the size:
+
+  csv     passed through to COPY ... (FORMAT csv) unchanged. With a header
+          row, it names the columns. Without one, the columns are the
+          table's, in table order, as in the sampleDataInDB files. An
+          unquoted empty field is NULL.
+  ndjson  one JSON object per line. The first object's keys are the
+          columns, and a key missing from a later object is NULL. Each line
+          is re-encoded as a CSV row for COPY.
+
+The import is one transaction, so a bad row rejects the whole file. That
+includes a row leaving NULL in a field its API schema requires (the table's
+SCHEMAS entry), which every GET would then fail to serialize. When the
+import sets id explicitly, the id sequence is moved past the largest id.
+Imported delivery records get their order_items rows, parsed from
+inventory_ids / quantity, in the same transaction (sales.py).
+
+Exports read through a server-side cursor, EXPORT_BATCH_ROWS rows per
+fetch, ordered by id. They write the same two formats, so an export can
+be imported again as it is.
+"""
+
+import csv
+import json
+import types
+import typing
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from sqlalchemy import text
+
+from app import models, sales, schemas
+
+TABLES = {
+    "inventory": models.InventoryItem.__table__,
+    "logs": models.RobotLog.__table__,
+    "deliveries": models.deliveryRecords.__table__,
+}
+
+EXPORT_BATCH_ROWS = 5000
+
+# Run after a COPY into these tables, in the same transaction
+AFTER_IMPORT = {
+    "delivery_records": sales.BACKFILL_CURRENT_XACT_SQL,
+}
+
+# The schema rows of each table are read back with
+SCHEMAS = {
+    "inventory_items": schemas.InventoryItem,
+    "robot_logs": schemas.RobotLog,
+    "delivery_records": schemas.DeliveryRecord,
+}
+
+
+def _allows_none(annotation) -> bool:
+    return annotation is type(None) or (
+        typing.get_origin(annotation) in (typing.Union, types.UnionType)
+        and type(None) in typing.get_args(annotation)
+    )
+
+
+@lru_cache(maxsize=None)
+def required_columns(table) -> tuple[str, ...]:
+    """Columns whose schema field is not Optional (NULL there breaks reads)."""
+    schema = SCHEMAS.get(table.name)
+    if schema is None:
+        return ()
+    return tuple(
+        name for name, field in schema.model_fields.items()
+        if name in table.c and table.c[name].nullable and not _allows_none(field.annotation)
+    )
+
+
+def check_required(conn, table):
+    """Reject NULLs in required columns among the rows this transaction wrote."""
+    columns = required_columns(table)
+    if not columns:
+        return
+    counts = conn.execute(text(
+        f"SELECT {', '.join(f'count(*) FILTER (WHERE {c} IS NULL)' for c in columns)} "
+        f"FROM {table.name} WHERE xmin = pg_current_xact_id()::xid"
+    )).one()
+    missing = [f"{column} ({count} rows)" for column, count in zip(columns, counts) if count]
+    if missing:
+        raise ValueError(f"missing required values: {', '.join(missing)}")
+
+
+def resolve_columns(table, names) -> list[str]:
+    """Validate column names against the table (they are spliced into COPY)."""
+    names = [n.strip() for n in names]
+    unknown = [n for n in names if n not in table.c]
+    if unknown:
+        raise ValueError(f"unknown columns for {table.name}: {', '.join(unknown)}")
+    if not names or len(set(names)) != len(names):
+        raise ValueError("columns must be non-empty and unique")
+    return names
+
+
+class ChunkReader:
+    """
+    File-like view of a chunk source, for cursor.copy_expert().
+
+    `next_chunk()` returns the next bytes chunk, or None at the end (for an
+    upload, it pulls from the request stream on the event loop).
+    """
+
+    def __init__(self, next_chunk):
+        self._next_chunk = next_chunk
+        self._buf = b""
+        self._eof = False
+
+    def _fill(self) -> bool:
+        while not self._eof:
+            chunk = self._next_chunk()
+            if chunk is None:
+                self._eof = True
+            elif chunk:
+                self._buf += chunk
+                return True
+        return False
+
+    def readline(self) -> bytes:
+        while b"\n" not in self._buf and self._fill():
+            pass
+        line, sep, self._buf = self._buf.partition(b"\n")
+        return line + sep
+
+    def read(self, size=-1) -> bytes:
+        if not self._buf:
+            self._fill()
+        data, self._buf = self._buf, b""
+        return data
+
+
+def _csv_field(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def csv_line(values) -> str:
+    """One COPY csv row: NULL stays an unquoted empty field, '' is quoted."""
+    return ",".join(_csv_field(v) for v in values) + "\n"
+
+
+class NdjsonToCsv:
+    """Re-encode NDJSON lines from a ChunkReader as COPY csv rows."""
+
+    def __init__(self, reader: ChunkReader, table):
+        self._reader = reader
+        self.columns = None
+        first = self._next_object()
+        if first is None:
+            raise ValueError("no rows")
+        self.columns = resolve_columns(table, list(first))
+        self._pending = csv_line(first.get(c) for c in self.columns).encode()
+
+    def _next_object(self):
+        while True:
+            line = self._reader.readline()
+            if not line:
+                return None
+            if line.strip():
+                try:
+                    return json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"invalid JSON line: {e}") from None
+
+    def read(self, size=-1) -> bytes:
+        out, self._pending = self._pending, b""
+        if out:
+            return out
+        rows = []
+        for _ in range(1000):
+            obj = self._next_object()
+            if obj is None:
+                break
+            rows.append(csv_line(obj.get(c) for c in self.columns))
+        return "".join(rows).encode()
+
+
+def copy_in(conn, table, columns, source) -> int:
+    """COPY csv rows from a file-like `source` into table (no commit)."""
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", source
+        )
+        rows = cursor.rowcount
+    finally:
+        cursor.close()
+    if "id" in columns:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(max(id), 0) + 1 FROM {table.name}), false)"
+        ))
+    check_required(conn, table)
+    if table.name in AFTER_IMPORT:
+        conn.execute(text(AFTER_IMPORT[table.name]))
+    return rows
+
+
+def import_stream(conn, table, next_chunk, fmt: str, header: bool = True) -> int:
+    reader = ChunkReader(next_chunk)
+    if fmt == "ndjson":
+        source = NdjsonToCsv(reader, table)
+        columns = source.columns
+    elif header:
+        first = reader.readline().decode("utf-8-sig")
+        columns = resolve_columns(table, next(csv.reader([first]), []))
+        source = reader
+    else:
+        columns = [c.name for c in table.columns]
+        source = reader
+    return copy_in(conn, table, columns, source)
+
+
+def copy_file(conn, table, path: str, header: bool = False) -> int:
+    """Load a CSV file (by default headerless, all columns) with one COPY."""
+    with open(path, "rb") as f:
+        return import_stream(conn, table, lambda: f.read(1 << 16) or None, "csv", header)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export_rows(db, table, fmt: str, filters=()):
+    """Yield the encoded export in chunks of EXPORT_BATCH_ROWS rows."""
+    result = db.execute(
+        table.select().where(*filters).order_by(table.c.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS)
+    )
+    columns = list(result.keys())
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+        for rows in result.partitions():
+            yield "".join(csv_line(row) for row in rows)
+    else:
+        for rows in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+            )
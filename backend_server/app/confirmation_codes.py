@@ -0,0 +1,68 @@
+"""
+Confirmation code allocation.
+
+Codes come from a PostgreSQL sequence, so every call gets a distinct
+number from one nextval() without probing for free codes, and concurrent
+orders cannot collide. The sequence value is scrambled into a 6-digit code
+with a keyed Feistel permutation over [0, 10^6) (two base-1000 halves).
+That makes consecutive orders get unrelated-looking codes while staying a
+bijection, so codes only repeat after 10^6 orders.
+
+A code only has to be unique among a robot's open orders: the partial
+unique index uq_delivery_records_active_code covers WAITING and
+IN_PROGRESS records, so the INSERT itself enforces it and delivered or
+canceled orders free their codes. A clash needs an order still open after
+10^6 newer ones (or an open code from the old random allocator); the order
+then fails with ConfirmationCodeConflict (409) instead of an IntegrityError.
+"""
+
+import hashlib
+import hmac
+import os
+
+from sqlalchemy import Sequence
+from sqlalchemy.orm import Session
+
+from app.database import Base
+
+CODE_DIGITS = 6
+_HALF = 1000                      # 10^6 = 1000 * 1000
+_ROUNDS = 4
+UNIQUE_INDEX = "uq_delivery_records_active_code"
+
+# Changing the key changes every future code; keep it stable per deployment.
+_KEY = os.getenv("CONFIRMATION_CODE_KEY", "vendobot-confirmation-codes").encode()
+
+confirmation_code_seq = Sequence("confirmation_code_seq", metadata=Base.metadata)
+
+
+def _round(value: int, i: int) -> int:
+    digest = hmac.new(_KEY, f"{i}:{value}".encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], "big") % _HALF
+
+
+def permute(n: int) -> int:
+    """Keyed bijection on [0, 10^6)."""
+    left, right = divmod(n % (_HALF * _HALF), _HALF)
+    for i in range(_ROUNDS):
+        left, right = right, (left + _round(right, i)) % _HALF
+    return left * _HALF + right
+
+
+def code_for(n: int) -> str:
+    return f"{permute(n):0{CODE_DIGITS}d}"
+
+
+class ConfirmationCodeConflict(Exception):
+    """The order's confirmation code is held by another open order of the robot."""
+
+
+def next_confirmation_code(db: Session) -> str:
+    """Allocate a code with one nextval(); the INSERT checks it against open orders."""
+    return code_for(db.execute(confirmation_code_seq.next_value()).scalar_one())
+
+
+def is_code_conflict(error) -> bool:
+    """True for an IntegrityError raised by uq_delivery_records_active_code."""
+    diag = getattr(getattr(error, "orig", None), "diag", None)
+    return getattr(diag, "constraint_name", None) == UNIQUE_INDEX
@@ -1,16 +1,58 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql import func
 from . import models, schemas
-import csv
-import os
+from .confirmation_codes import ConfirmationCodeConflict, is_code_conflict, next_confirmation_code
 from decimal import Decimal
 from datetime import datetime
-import random
-
-def get_robots(db: Session):
-    return db.query(models.Robot).all()
+import re
+import uuid
+
+def _robot_options(include_inventory: bool):
+    # Inventory is loaded for all robots in one extra IN query, or not at all
+    return [selectinload(models.Robot.inventory_items)] if include_inventory else []
+
+def get_robots(db: Session, include_inventory: bool = False):
+    return (db.query(models.Robot)
+            .options(*_robot_options(include_inventory))
+            .order_by(models.Robot.id)
+            .all())
+
+def get_robot_by_id(db: Session, robot_id: int, include_inventory: bool = False):
+    return db.get(models.Robot, robot_id, options=_robot_options(include_inventory))
+
+def update_robot_position(db: Session, robot_id: int, x: float, y: float, include_inventory: bool = False):
+    """Single UPDATE ... RETURNING; None if the robot does not exist."""
+    robot = db.scalars(
+        update(models.Robot)
+        .where(models.Robot.id == robot_id)
+        .values(current_pos_x=x, current_pos_y=y, last_updated=func.now())
+        .returning(models.Robot)
+        .options(*_robot_options(include_inventory))
+    ).first()
+    db.commit()
+    return robot
+
+_UPDATE_POSITIONS_SQL = text("""
+    UPDATE robots AS r
+    SET current_pos_x = p.x, current_pos_y = p.y, last_updated = p.at
+    FROM unnest(CAST(:ids AS integer[]), CAST(:xs AS numeric[]),
+                CAST(:ys AS numeric[]), CAST(:ats AS timestamp[])) AS p(id, x, y, at)
+    WHERE r.id = p.id
+    RETURNING r.id
+""")
+
+def update_robot_positions(db: Session, poses):
+    """Write many (robot_id, x, y, at) poses in one statement; returns the ids that exist."""
+    ids, xs, ys, ats = (list(col) for col in zip(*poses))
+    updated = db.execute(_UPDATE_POSITIONS_SQL, {"ids": ids, "xs": xs, "ys": ys, "ats": ats}).scalars().all()
+    db.commit()
+    return updated
 
-def get_robot_by_id(db: Session, robot_id: int):
-    return db.query(models.Robot).filter(models.Robot.id == robot_id).first()
+def existing_robot_ids(db: Session, ids):
+    """The ids among `ids` that have a robot."""
+    return db.scalars(select(models.Robot.id).where(models.Robot.id.in_(ids))).all()
 
 
 def create_robot(db: Session, robot: schemas.RobotCreate):
@@ -36,118 +78,6 @@ def create_inventory_item(db: Session, item: schemas.InventoryItemCreate):
     db.refresh(db_item)
     return db_item
 
-def get_inventory_count(db: Session) -> int:
-    """Returns the total number of inventory items in the database."""
-    return db.query(models.InventoryItem).count()
-
-def seed_inventory_from_csv(db: Session):
-    """Reads inventory_items.csv and seeds the database."""
-    
-    # 1. Construct the path to the CSV file
-    # Get the current file's directory (app/crud.py)
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    csv_path = os.path.join(base_dir, 'sampleDataInDB', 'inventory_items.csv')
-
-    print(f"Attempting to load inventory from: {csv_path}")
-
-    try:
-        with open(csv_path, mode='r', newline='', encoding='utf-8') as file:
-            # Use DictReader to easily access columns by header name
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                # 2. Map CSV data to the Pydantic schema
-                item_data = schemas.InventoryItemCreate(
-                    name=row.get('name'),
-                    image_url=row.get('image_url'),
-                    # Convert string values to correct Python types expected by Pydantic
-                    price=float(row.get('price', 0.00)), 
-                    quantity=int(row.get('quantity', 0)),
-                    category=row.get('category'),
-                    robot_id=int(row.get('robot_id')) if row.get('robot_id') else None
-                )
-                
-                # 3. Create the database entry
-                create_inventory_item(db, item_data)
-        
-        print(f"Successfully seeded {db.query(models.InventoryItem).count()} inventory items.")
-
-    except FileNotFoundError:
-        print(f"ERROR: CSV file not found at {csv_path}. Skipping inventory seeding.")
-    except Exception as e:
-        db.rollback()
-        print(f"ERROR during inventory seeding: {e}")
-        
-
-def get_logs_count(db: Session) -> int:
-    """Returns the total number of logs in the database."""
-    return db.query(models.RobotLog).count()
-
-def seed_logs_from_csv(db: Session):
-    """Reads logdata.csv and seeds the robot_logs table."""
-    
-    # 1. Construct the path (Same location as inventory_items.csv)
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    csv_path = os.path.join(base_dir, 'sampleDataInDB', 'logdata.csv')
-
-    print(f"Attempting to load logs from: {csv_path}")
-
-    try:
-        with open(csv_path, mode='r', newline='', encoding='utf-8') as file:
-            # The file has no headers, so we use standard reader
-            reader = csv.reader(file)
-            
-            logs_to_create = []
-            
-            for row in reader:
-                # Expected format: ID, robot_id, message, timestamp
-                # Example: 34,1,Starting Record,2025-11-11 13:06:13.847743
-                
-                if len(row) < 4:
-                    continue
-
-                try:
-                    # row[0] is the CSV ID (we ignore it and let DB auto-increment new IDs)
-                    robot_id_val = int(row[1])
-                    message_val = row[2]
-                    timestamp_str = row[3]
-                    
-                    # Parse timestamp (matches: 2025-11-11 13:06:13.847743)
-                    # We try specific formats to be safe
-                    try:
-                        timestamp_val = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
-                    except ValueError:
-                        # Fallback for timestamps without microseconds if necessary
-                        timestamp_val = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-
-                    # Create Model directly (to allow setting created_at manually)
-                    log_entry = models.RobotLog(
-                        robot_id=robot_id_val,
-                        message=message_val,
-                        created_at=timestamp_val
-                    )
-                    logs_to_create.append(log_entry)
-                    
-                except ValueError as e:
-                    print(f"Skipping invalid log row {row}: {e}")
-                    continue
-            
-            # Bulk save is faster for logs
-            if logs_to_create:
-                db.add_all(logs_to_create)
-                db.commit()
-                print(f"Successfully seeded {len(logs_to_create)} log entries.")
-            else:
-                print("No valid logs found to seed.")
-
-    except FileNotFoundError:
-        print(f"ERROR: CSV file not found at {csv_path}. Skipping log seeding.")
-    except Exception as e:
-        db.rollback()
-        print(f"ERROR during log seeding: {e}")
-
-
-
 def create_log(db: Session, log: schemas.RobotLogCreate):
     new_log = models.RobotLog(**log.model_dump())
     db.add(new_log)
@@ -155,52 +85,158 @@ def create_log(db: Session, log: schemas.RobotLogCreate):
     db.refresh(new_log)
     return new_log
 
+class InvalidOrderError(ValueError):
+    """inventory_ids / quantity could not be parsed or do not line up."""
+
+
+class InsufficientInventoryError(Exception):
+    """One or more line items are unknown or would oversell."""
+    def __init__(self, item_ids):
+        self.item_ids = sorted(item_ids)
+        super().__init__(f"Insufficient inventory for item(s): {self.item_ids}")
+
+
+def parse_id_list(value: str) -> list[int]:
+    """Accepts both "1,4" and the app's "[1, 4]" formats."""
+    try:
+        return [int(part) for part in value.strip().strip("[]").split(",") if part.strip()]
+    except ValueError:
+        raise InvalidOrderError(f"Expected a list of integers, got {value!r}")
+
+
+def parse_order_lines(inventory_ids: str, quantity: str) -> dict[int, int]:
+    """Returns {item_id: total quantity}, merging repeated items."""
+    ids = parse_id_list(inventory_ids or "")
+    quantities = parse_id_list(quantity or "")
+    if len(ids) != len(quantities):
+        raise InvalidOrderError("inventory_ids and quantity have different lengths")
+
+    lines = {}
+    for item_id, qty in zip(ids, quantities):
+        if qty <= 0:
+            raise InvalidOrderError(f"Quantity for item {item_id} must be positive")
+        lines[item_id] = lines.get(item_id, 0) + qty
+    return lines
+
+
+# Locks the items in id order (so concurrent orders cannot deadlock), then
+# decrements every line that still has enough stock in the same statement.
+# Rows that are missing or would go negative are simply not RETURNed.
+_RESERVE_SQL = text("""
+    WITH locked AS (
+        SELECT id FROM inventory_items
+        WHERE id = ANY(:ids)
+        ORDER BY id
+        FOR UPDATE
+    ),
+    lines AS (
+        SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:qtys AS integer[])) AS l(id, qty)
+    )
+    UPDATE inventory_items AS i
+    SET quantity = i.quantity - lines.qty
+    FROM lines JOIN locked ON locked.id = lines.id
+    WHERE i.id = lines.id
+      AND i.quantity >= lines.qty
+    RETURNING i.id, i.price
+""")
+
+
+def reserve_inventory(db: Session, lines: dict[int, int]):
+    """
+    Decrement all order lines in one round trip, inside the caller's
+    transaction, and return {item_id: unit price}. Raises
+    InsufficientInventoryError (caller must roll back) if any line could
+    not be reserved.
+    """
+    if not lines:
+        return {}
+    ids = sorted(lines)
+    reserved = dict(db.execute(_RESERVE_SQL, {"ids": ids, "qtys": [lines[i] for i in ids]}).all())
+    if len(reserved) != len(ids):
+        raise InsufficientInventoryError(set(ids) - set(reserved))
+    return reserved
+
+
+def add_order_items(db: Session, record, lines: dict[int, int], prices: dict[int, Decimal]):
+    """Store the order's lines in order_items with one multi-row INSERT."""
+    if not lines:
+        return
+    db.execute(insert(models.OrderItem), [
+        {
+            "delivery_record_id": record.id,
+            "inventory_item_id": item_id,
+            "quantity": qty,
+            "unit_price": prices.get(item_id),
+        }
+        for item_id, qty in lines.items()
+    ])
+
+
+ACTIVE_DELIVERY_STATUSES = ("WAITING", "IN_PROGRESS")
+
+def get_active_delivery_records(db: Session, robot_id: int = None):
+    query = db.query(models.deliveryRecords).filter(
+        models.deliveryRecords.status.in_(ACTIVE_DELIVERY_STATUSES)
+    )
+    if robot_id is not None:
+        query = query.filter(models.deliveryRecords.robot_id == robot_id)
+    return query.order_by(models.deliveryRecords.id).all()
+
+
+# Recording sessions tie a camera recording to its delivery record. Kiosks
+# used to put a random token in videourl and the camera looked the record
+# up by that text; the token now lives in its own indexed column.
+RECORDING_SESSION_ID_PATTERN = "^[A-Za-z0-9_-]{1,64}$"      # also a PostgreSQL regex
+RECORDING_SESSION_ID_RE = re.compile(RECORDING_SESSION_ID_PATTERN)
+
+def new_recording_session_id() -> str:
+    return uuid.uuid4().hex
+
+def recording_session_id_for(record: schemas.DeliveryRecordCreate):
+    if record.recording_session_id:
+        return record.recording_session_id
+    # Older kiosks send the session token as the placeholder videourl
+    if record.videourl and RECORDING_SESSION_ID_RE.match(record.videourl):
+        return record.videourl
+    return None
+
+def get_delivery_record_by_recording_session(db: Session, recording_session_id: str):
+    return (db.query(models.deliveryRecords)
+            .filter(models.deliveryRecords.recording_session_id == recording_session_id)
+            .order_by(models.deliveryRecords.id.desc())
+            .first())
+
 def create_delivery_record(db: Session, record: schemas.DeliveryRecordCreate):
-    # 1. Generate Confirmation Code
-    while True:
-        code = f"{random.randint(0, 999999):06d}"
-        existing = db.query(models.deliveryRecords).filter(
-            models.deliveryRecords.confirmation_code == code,
-            models.deliveryRecords.status == "WAITING"
-        ).first()
-        if not existing:
-            break
-    
-    # 2. Update Inventory Quantities
+    # 1. Allocate Confirmation Code (one nextval(), unique among open orders)
+    code = next_confirmation_code(db)
+
+    # 2. Reserve inventory and create the record in one transaction:
+    #    either every line item is decremented and the order exists, or neither.
+    lines = parse_order_lines(record.inventory_ids, record.quantity)
+    if record.recording_session_id and not RECORDING_SESSION_ID_RE.match(record.recording_session_id):
+        raise InvalidOrderError("recording_session_id must be 1-64 letters, digits, '_' or '-'")
     try:
-        # Parse the CSV strings (e.g., "1,4" -> [1, 4])
-        if record.inventory_ids and record.quantity:
-            inv_ids = [int(id_str) for id_str in record.inventory_ids.split(',') if id_str.strip()]
-            quantities = [int(q_str) for q_str in record.quantity.split(',') if q_str.strip()]
-
-            if len(inv_ids) == len(quantities):
-                for i in range(len(inv_ids)):
-                    item_id = inv_ids[i]
-                    qty_to_remove = quantities[i]
-                    
-                    # Fetch item and update quantity
-                    db_item = db.query(models.InventoryItem).filter(models.InventoryItem.id == item_id).first()
-                    if db_item:
-                        # Ensure we don't go below zero
-                        if db_item.quantity >= qty_to_remove:
-                            db_item.quantity -= qty_to_remove
-                        else:
-                            db_item.quantity = 0
-            else:
-                print("Warning: Inventory IDs and Quantities length mismatch.")
-                
-    except Exception as e:
-        print(f"Error updating inventory counts: {e}")
-        # We don't rollback here because we still want to try creating the record,
-        # but in a production app, you might want to fail the order instead.
-
-    # 3. Create the Delivery Record
-    new_record_data = record.model_dump()
-    new_record_data['confirmation_code'] = code
-    
-    new_record = models.deliveryRecords(**new_record_data)
-    db.add(new_record)
-    db.commit()
+        prices = reserve_inventory(db, lines)
+
+        new_record_data = record.model_dump()
+        new_record_data['confirmation_code'] = code
+        new_record_data['recording_session_id'] = recording_session_id_for(record)
+
+        new_record = models.deliveryRecords(**new_record_data)
+        db.add(new_record)
+        db.flush()
+        # created_at defaults to now(), the same transaction time as the record's
+        add_order_items(db, new_record, lines, prices)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if is_code_conflict(e):
+            raise ConfirmationCodeConflict(f"Confirmation code {code} is held by another open order; retry") from e
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
     db.refresh(new_record)
     return new_record
 
@@ -217,9 +253,8 @@ def update_delivery_record_by_robotID(db: Session, record_id: int, video_url: st
     db.refresh(record)
     return record
 
-def update_delivery_record_after_stop_record(db: Session, text2find: str, video_url: str):
-    
-    record = db.query(models.deliveryRecords).filter(models.deliveryRecords.videourl == text2find).first()
+def update_delivery_record_after_stop_record(db: Session, recording_session_id: str, video_url: str):
+    record = get_delivery_record_by_recording_session(db, recording_session_id)
     
     if not record:
         return None  
@@ -231,9 +266,16 @@ def update_delivery_record_after_stop_record(db: Session, text2find: str, video_
     db.refresh(record)
     return record
 
-def update_Statisfication_after_stop_record(db: Session, statisfication: str, video_url: str):
-    print(video_url)
-    record = db.query(models.deliveryRecords).filter(models.deliveryRecords.videourl == video_url).first()
+def update_Statisfication_after_stop_record(db: Session, statisfication: str, video_url: str,
+                                            recording_session_id: str = None):
+    if recording_session_id:
+        record = get_delivery_record_by_recording_session(db, recording_session_id)
+    else:
+        # Hash index on videourl (ix_delivery_records_videourl_hash)
+        record = (db.query(models.deliveryRecords)
+                  .filter(models.deliveryRecords.videourl == video_url)
+                  .order_by(models.deliveryRecords.id.desc())
+                  .first())
     if not record:
         return None  
     
@@ -243,7 +285,3 @@ def update_Statisfication_after_stop_record(db: Session, statisfication: str, vi
     db.commit()
     db.refresh(record)
     return record
-
-def get_robots_count(db: Session) -> int:
-    """Returns the total number of robots in the database."""
-    return db.query(models.Robot).count()
\ No newline at end of file
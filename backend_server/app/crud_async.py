@@ -0,0 +1,42 @@
+"""
+Async variants of the hot crud functions, for the asyncpg engine
+(DB_ASYNC=true, see app/database.py and app/routers/async_api.py).
+Same queries and return values as their counterparts in crud.py.
+"""
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from . import models
+from .crud import _robot_options
+
+
+async def get_robots(db: AsyncSession, include_inventory: bool = False):
+    result = await db.scalars(
+        select(models.Robot).options(*_robot_options(include_inventory)).order_by(models.Robot.id)
+    )
+    return result.all()
+
+async def get_robot_by_id(db: AsyncSession, robot_id: int, include_inventory: bool = False):
+    return await db.get(models.Robot, robot_id, options=_robot_options(include_inventory))
+
+async def update_robot_position(db: AsyncSession, robot_id: int, x: float, y: float,
+                                include_inventory: bool = False):
+    """Single UPDATE ... RETURNING; None if the robot does not exist."""
+    result = await db.scalars(
+        update(models.Robot)
+        .where(models.Robot.id == robot_id)
+        .values(current_pos_x=x, current_pos_y=y, last_updated=func.now())
+        .returning(models.Robot)
+        .options(*_robot_options(include_inventory))
+    )
+    robot = result.first()
+    await db.commit()
+    return robot
+
+async def get_delivery_records_by_robot(db: AsyncSession, robot_id: int):
+    result = await db.scalars(
+        select(models.deliveryRecords).where(models.deliveryRecords.robot_id == robot_id)
+    )
+    return result.all()
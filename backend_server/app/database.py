@@ -1,20 +1,84 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+import asyncio
 import os
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection pool (per engine), tunable from .env
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))    # 0 = no limit
+# Serve the hot endpoints from async routes on an asyncpg engine (needs `pip install asyncpg`)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+_pool_kwargs = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_S,
+    pool_recycle=DB_POOL_RECYCLE_S,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+_connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS:
+    _connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(DATABASE_URL, connect_args=_connect_args, **_pool_kwargs)
+# crud functions refresh() what they return explicitly; not expiring on commit
+# lets a row loaded by UPDATE ... RETURNING be serialised without a reload.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Sessions in use at once: at most one per pooled connection.
+# Sync endpoints run, and have their responses serialised, in worker
+# threads while their session keeps its connection until get_db closes it.
+# Without this cap, under load every worker thread can end up blocked on
+# the pool waiting for connections held by requests that need a thread to
+# finish (a deadlock until pool_timeout). Waiting here costs no thread.
+# Every SessionLocal() opened for a worker thread takes a slot first:
+# get_db, the pose flush, analytics refreshes, /live snapshots and bulk
+# exports (`async with database.db_slots:`).
+db_slots = asyncio.Semaphore(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+async def get_db():
+    async with db_slots:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            # Returning the connection rolls back: a round-trip, so not on the loop
+            await run_in_threadpool(db.close)
+
+
+# ---------------- Optional async engine ----------------
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS:
+        _async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    async_engine = create_async_engine(
+        make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        connect_args=_async_connect_args,
+        **_pool_kwargs,
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,308 @@
+"""
+Live robot and delivery updates for dashboards and robot clients.
+
+The server holds ONE PostgreSQL LISTEN connection (watched with
+loop.add_reader, no polling) on three trigger-fed channels:
+
+  robots_channel            robots row + op, on INSERT / changed UPDATE / DELETE
+                            (pose flushes, status and battery changes)
+  delivery_records_channel  delivery_records row + op, the trigger the base
+                            station already listens to
+  inventory_items_channel   {"robot_id"} + op of a changed inventory item, for
+                            in-process consumers (app/response_cache.py); not
+                            sent to /live clients
+
+NotifyHub fans each event out to every subscriber's queue, so N viewers
+cost one database subscription. A client first gets a snapshot (robots,
+plus deliveries that are still WAITING or IN_PROGRESS) and then deltas:
+
+  {"type": "snapshot", "robots": [...], "deliveries": [...]}
+  {"type": "robot" | "delivery", "op": "INSERT" | "UPDATE" | "DELETE", "data": {row}}
+
+Deltas are whole rows, so a delta that repeats what the snapshot already
+showed is harmless. A subscriber that falls SUBSCRIBER_QUEUE_SIZE events
+behind, or that was connected while the LISTEN connection dropped, has its
+stream closed. It should reconnect and start again from a fresh snapshot.
+"""
+
+import asyncio
+import json
+
+import psycopg2
+import psycopg2.extensions
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from app import crud, database, schemas
+from app.pose_buffer import pose_buffer
+
+ROBOTS_CHANNEL = "robots_channel"
+DELIVERIES_CHANNEL = "delivery_records_channel"
+INVENTORY_CHANNEL = "inventory_items_channel"
+CHANNEL_KINDS = {ROBOTS_CHANNEL: "robot", DELIVERIES_CHANNEL: "delivery", INVENTORY_CHANNEL: "inventory"}
+# Event types a subscriber gets unless it asks for others
+LIVE_KINDS = frozenset({"robot", "delivery"})
+SUBSCRIBER_QUEUE_SIZE = 1000
+RECONNECT_DELAY_S = 3.0
+
+# notify_new_delivery() is the function from base_station/README_delivery
+# watcher.md, unchanged; the base station keeps working against it.
+TRIGGER_FUNCTIONS_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION notify_new_delivery()
+    RETURNS trigger AS $$
+    DECLARE
+        rec delivery_records;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+        ELSE
+            rec := NEW;
+        END IF;
+
+        PERFORM pg_notify(
+            'delivery_records_channel',
+            (row_to_json(rec)::jsonb || jsonb_build_object('op', TG_OP))::text
+        );
+        RETURN rec;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notify_robot_change()
+    RETURNS trigger AS $$
+    DECLARE
+        rec robots;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+        ELSIF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NEW;
+        ELSE
+            rec := NEW;
+        END IF;
+
+        PERFORM pg_notify(
+            'robots_channel',
+            (row_to_json(rec)::jsonb || jsonb_build_object('op', TG_OP))::text
+        );
+        RETURN rec;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Only the robot id: notifications repeated within a transaction are
+    # delivered once, so an order or a bulk import sends one per robot.
+    """
+    CREATE OR REPLACE FUNCTION notify_inventory_change()
+    RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('inventory_items_channel',
+                              json_build_object('robot_id', OLD.robot_id, 'op', TG_OP)::text);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify('inventory_items_channel',
+                              json_build_object('robot_id', NEW.robot_id, 'op', TG_OP)::text);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+# name -> (table, function), each AFTER INSERT OR UPDATE OR DELETE, FOR EACH ROW
+TRIGGERS = {
+    "delivery_insert_trigger": ("delivery_records", "notify_new_delivery"),
+    "robot_change_trigger": ("robots", "notify_robot_change"),
+    "inventory_change_trigger": ("inventory_items", "notify_inventory_change"),
+}
+# pg_trigger.tgtype of such a trigger: ROW | INSERT | DELETE | UPDATE
+TRIGGER_TYPE = 1 | 4 | 8 | 16
+
+
+def install_triggers(conn):
+    """Run by `python -m app.admin migrate`, inside its transaction."""
+    # Never hold up startup behind long transactions on these tables
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    for statement in TRIGGER_FUNCTIONS_SQL:
+        conn.execute(text(statement))
+    # (Re)created only when missing or different, e.g. the AFTER INSERT
+    # delivery trigger of older installs: CREATE TRIGGER locks the table
+    # against writes
+    existing = {name: (table, function, tgtype) for name, table, function, tgtype in conn.execute(text("""
+        SELECT t.tgname, c.relname, p.proname, t.tgtype
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_proc p ON p.oid = t.tgfoid
+        WHERE t.tgname = ANY(:names) AND NOT t.tgisinternal
+    """), {"names": list(TRIGGERS)})}
+    for name, (table, function) in TRIGGERS.items():
+        if existing.get(name) == (table, function, TRIGGER_TYPE):
+            continue
+        if name in existing:
+            conn.execute(text(f"DROP TRIGGER {name} ON {existing[name][0]}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {name} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+        ))
+
+
+class Subscription:
+    def __init__(self, robot_id=None, kinds=LIVE_KINDS):
+        self.robot_id = robot_id
+        self.kinds = kinds
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed_reason = None
+
+    def wants(self, event) -> bool:
+        if event["type"] not in self.kinds:
+            return False
+        if self.robot_id is None:
+            return True
+        data = event["data"]
+        key = "id" if event["type"] == "robot" else "robot_id"
+        return data.get(key) == self.robot_id
+
+    def close(self, reason):
+        # Drop whatever is queued; the reader sees None and ends the stream
+        self.closed_reason = reason
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next_event(self):
+        return await self.queue.get()
+
+
+class NotifyHub:
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._conn = None
+        self._lost = None
+        self.events = 0
+        self.dropped_subscribers = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def connected(self) -> bool:
+        """True while LISTEN is up, i.e. no change can go unnoticed."""
+        return self._lost is not None and not self._lost.is_set()
+
+    def subscribe(self, robot_id=None, kinds=LIVE_KINDS) -> Subscription:
+        sub = Subscription(robot_id, kinds)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscribers.discard(sub)
+
+    def snapshot(self, robot_id=None) -> dict:
+        """Current state from the database (call in a worker thread)."""
+        db = database.SessionLocal()
+        try:
+            if robot_id is None:
+                robots = crud.get_robots(db)
+            else:
+                robot = crud.get_robot_by_id(db, robot_id)
+                robots = [robot] if robot else []
+            deliveries = crud.get_active_delivery_records(db, robot_id)
+
+            robots_out = []
+            for robot in robots:
+                out = schemas.RobotSummary.model_validate(robot)
+                pose = pose_buffer.get(robot.id)
+                if pose is not None:
+                    out.current_pos_x, out.current_pos_y, out.last_updated = pose.x, pose.y, pose.received_at
+                robots_out.append(out.model_dump(mode="json"))
+            return {
+                "type": "snapshot",
+                "robots": robots_out,
+                "deliveries": [schemas.DeliveryRecord.model_validate(d).model_dump(mode="json") for d in deliveries],
+            }
+        finally:
+            db.close()
+
+    async def read_snapshot(self, robot_id=None) -> dict:
+        async with database.db_slots:
+            return await run_in_threadpool(self.snapshot, robot_id)
+
+    # ---------------- LISTEN connection ----------------
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._conn = await loop.run_in_executor(None, self._listen_connection)
+            except Exception as e:
+                print(f"[Live] Cannot LISTEN: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_S)
+                continue
+
+            print(f"[Live] Listening on {', '.join(CHANNEL_KINDS)}")
+            self._lost = asyncio.Event()
+            # psycopg2 closes a connection the server dropped, after which
+            # fileno() raises: keep the fd to remove the reader by
+            fd = self._conn.fileno()
+            loop.add_reader(fd, self._on_readable)
+            try:
+                await self._lost.wait()
+            finally:
+                self._lost.set()
+                for cleanup in (lambda: loop.remove_reader(fd), self._conn.close):
+                    try:
+                        cleanup()
+                    except Exception as e:
+                        print(f"[Live] Cleanup after lost connection: {e}")
+                # Events were missed while disconnected: everyone resyncs
+                for sub in list(self._subscribers):
+                    sub.close("database connection lost")
+
+            print("[Live] Lost the LISTEN connection; reconnecting ...")
+            await asyncio.sleep(RECONNECT_DELAY_S)
+
+    def _listen_connection(self):
+        cargs, cparams = database.engine.dialect.create_connect_args(database.engine.url)
+        conn = psycopg2.connect(*cargs, **cparams)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cur = conn.cursor()
+        cur.execute("".join(f"LISTEN {channel};" for channel in CHANNEL_KINDS))
+        cur.close()
+        return conn
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except Exception as e:
+            print(f"[Live] PostgreSQL error: {e}")
+            self._lost.set()
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                data = json.loads(notify.payload)
+            except ValueError:
+                print(f"[Live] Invalid NOTIFY payload: {notify.payload[:80]}")
+                continue
+            op = data.pop("op", "INSERT")
+            self._publish({"type": CHANNEL_KINDS.get(notify.channel, "delivery"), "op": op, "data": data})
+
+    def _publish(self, event):
+        self.events += 1
+        for sub in list(self._subscribers):
+            if sub.closed_reason or not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped_subscribers += 1
+                sub.close("too far behind")
+
+
+hub = NotifyHub()
@@ -1,64 +1,57 @@
 print("Starting FastAPI app...")
 
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import anyio
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from app.routers import robots, inventory, logs, deliveryRecord, control
-from app import database, models, crud, schemas
-
-def seed_initial_data():
-    db = database.SessionLocal()
-    try:
-        # 1. Check and Seed ROBOTS
-        if crud.get_robots_count(db) == 0:
-            print("Database is empty. Creating default robot...")
-            robot_data = schemas.RobotCreate(
-                name="VendorBot Alpha",
-                image_url="https://vendorbot.com/images/alpha.png",
-                status="idle",
-                battery_level=95
-            )
-            crud.create_robot(db, robot_data)
-            db.commit()
-            print("Default robot created successfully.")
-        else:
-            print("Robots already exist. Skipping robot seeding.")
-
-        # 2. Check and Seed INVENTORY
-        if crud.get_inventory_count(db) == 0:
-            print("Inventory table is empty. Loading data from CSV...")
-            crud.seed_inventory_from_csv(db)
-            db.commit()
-            print("Inventory seeding complete.")
-        else:
-            print("Inventory items already exist. Skipping inventory seeding.")
-
-        # 3. Check and Seed LOGS (New Section)
-        if crud.get_logs_count(db) == 0:
-            print("Log table is empty. Loading data from logdata.csv...")
-            crud.seed_logs_from_csv(db)
-            # Commit is handled inside the function, but safe to verify
-            print("Log seeding complete.")
-        else:
-            print("Logs already exist. Skipping log seeding.")
-
-    except Exception as e:
-        db.rollback()
-        print(f"Error in initial data seeding: {e}")
-    finally:
-        db.close()
+from app.routers import robots, inventory, logs, deliveryRecord, control, live, bulk, sales, analytics
+from app import admin, database, schemas
+from app.analytics import refresher
+from app.pose_buffer import pose_buffer
+from app.live import hub
+from app.response_cache import response_cache
 
-try:
-    print("Attempting to create database tables...")
-    models.Base.metadata.create_all(bind=database.engine)
-    print("Database tables checked/created.")
-    
-    seed_initial_data()
-except Exception as e:
-    print(f"Error creating database tables: {e}")
+# Run `python -m app.admin setup` (schema, triggers, sample data) in each
+# worker's lifespan. Off by default: run it once before starting the server.
+DB_AUTO_SETUP = os.getenv("DB_AUTO_SETUP", "false").lower() in ("1", "true", "yes")
+
+# Worker threads for sync (def) endpoints; Starlette's default is 40
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
 
 
-app = FastAPI(title="Vendor Bot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Background flush of buffered robot poses (POST /robots/positions)
+    flusher = asyncio.create_task(pose_buffer.run())
+    if DB_AUTO_SETUP:
+        try:
+            await run_in_threadpool(admin.setup)
+        except Exception as e:
+            print(f"Error in database setup: {e}")
+    # One LISTEN connection feeding /live subscribers
+    listener = asyncio.create_task(hub.run())
+    # Analytics rollups, rebuilt from delivery NOTIFY events
+    rollups = asyncio.create_task(refresher.run())
+    # GET /inventory/ and /robots/ response cache, invalidated from NOTIFY events
+    invalidator = asyncio.create_task(response_cache.run())
+    yield
+    for task in (invalidator, rollups, listener, flusher):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+
+app = FastAPI(title="Vendor Bot API", lifespan=lifespan)
 print("FastAPI app instance created.")
 
 
@@ -72,17 +65,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],         # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],         # Allows all headers
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache"],  # Pagination cursor, response cache
 )
 # ----------------------------------------
 
 
 try:
     # 3. Include your routers *after* adding the middleware
+    if database.async_engine is not None:
+        # DB_ASYNC: async routes shadow the sync ones at the same URLs
+        from app.routers import async_api
+        app.include_router(async_api.router)
+        print("Async (asyncpg) routes enabled")
     app.include_router(robots.router)
     app.include_router(inventory.router)
     app.include_router(logs.router)
     app.include_router(deliveryRecord.router)
     app.include_router(control.router)
+    app.include_router(live.router)
+    app.include_router(bulk.router)
+    app.include_router(sales.router)
+    app.include_router(analytics.router)
     print("Routers imported successfully")
 except Exception as e:
     print("Error importing routers:", e)
@@ -92,3 +95,9 @@ except Exception as e:
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Vendor Bot API"}
+
+
+@app.get("/cache/status", response_model=schemas.CacheStatus)
+def cache_status():
+    """Hit rate and size of the GET /inventory/ and /robots/ response cache."""
+    return response_cache.status()
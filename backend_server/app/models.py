@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DECIMAL, TIMESTAMP, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DECIMAL, TIMESTAMP, Index, REAL, Table, CheckConstraint, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -38,10 +38,16 @@ class RobotLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     robot_id = Column(Integer, ForeignKey("robots.id"))
     message = Column(Text)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())   # keyset pagination key
 
     robot = relationship("Robot", back_populates="logs")
 
+    # Keyset pagination on (created_at, id), optionally per robot
+    __table_args__ = (
+        Index("ix_robot_logs_created_id", "created_at", "id"),
+        Index("ix_robot_logs_robot_created_id", "robot_id", "created_at", "id"),
+    )
+
 
 class deliveryRecords(Base):
     __tablename__ = "delivery_records"
@@ -63,9 +69,98 @@ class deliveryRecords(Base):
     dest_pos_y = Column(DECIMAL(10, 4), nullable=True)
     
     confirmation_code = Column(String(6), nullable=True, index=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())   # keyset pagination key
     last_updated_at = Column(TIMESTAMP, server_default=func.now())
+
+    # Key of the camera recording for this order (see crud.RECORDING_SESSION_ID_PATTERN)
+    recording_session_id = Column(String(64), nullable=True, index=True)
     
     __table_args__ = (
-        UniqueConstraint('robot_id', 'confirmation_code', 'status', name='_robot_code_status_uc'),
-    )
\ No newline at end of file
+        # A code belongs to one open order per robot (crud.ACTIVE_DELIVERY_STATUSES);
+        # delivered or canceled orders free it for reuse
+        Index("uq_delivery_records_active_code", "robot_id", "confirmation_code", unique=True,
+              postgresql_where=text("status IN ('WAITING', 'IN_PROGRESS')")),
+        # Equality lookups by video path (satisfaction results); hash has no key size limit
+        Index("ix_delivery_records_videourl_hash", "videourl", postgresql_using="hash"),
+        # Keyset pagination on (created_at, id), optionally per robot / status
+        Index("ix_delivery_records_created_id", "created_at", "id"),
+        Index("ix_delivery_records_robot_created_id", "robot_id", "created_at", "id"),
+        Index("ix_delivery_records_status_created_id", "status", "created_at", "id"),
+    )
+
+
+class OrderItem(Base):
+    """One line of a delivery record: which item, how many, at what price."""
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True)
+    delivery_record_id = Column(Integer, ForeignKey("delivery_records.id", ondelete="CASCADE"), nullable=False)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(DECIMAL(10, 2))
+    # Copied from the delivery record so sales by time need no join
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("quantity > 0", name="ck_order_items_quantity_positive"),
+        Index("ix_order_items_delivery_record_id", "delivery_record_id"),
+        # Sales per item over time, and per time range, answered from the index alone
+        Index("ix_order_items_item_created", "inventory_item_id", "created_at",
+              postgresql_include=["quantity", "unit_price"]),
+        Index("ix_order_items_created", "created_at",
+              postgresql_include=["inventory_item_id", "quantity", "unit_price"]),
+    )
+
+
+# Append-only pose samples, one partition per day (see app/pose_history.py).
+# No primary key or foreign key: rows are only ever COPYed in, range-scanned
+# by (robot_id, recorded_at) and dropped a partition at a time.
+robot_pose_history = Table(
+    "robot_pose_history",
+    Base.metadata,
+    Column("robot_id", Integer, nullable=False),
+    Column("recorded_at", TIMESTAMP, nullable=False),
+    Column("x", REAL, nullable=False),
+    Column("y", REAL, nullable=False),
+    Index("ix_robot_pose_history_robot_time", "robot_id", "recorded_at"),
+    postgresql_partition_by="RANGE (recorded_at)",
+)
+
+
+# Rollups maintained by app/analytics.py, one row per key and hour (of the
+# order's created_at). Rebuilt per hour, never edited in place.
+analytics_orders_hourly = Table(
+    "analytics_orders_hourly",
+    Base.metadata,
+    Column("robot_id", Integer, primary_key=True),
+    Column("hour", TIMESTAMP, primary_key=True),
+    Column("orders", Integer, nullable=False),
+    Column("units", Integer, nullable=False),
+    Column("revenue", DECIMAL(12, 2), nullable=False),
+    Column("delivered", Integer, nullable=False),
+    Column("canceled", Integer, nullable=False),
+    Column("delivery_seconds_sum", REAL, nullable=False),
+    Column("delivery_seconds_max", REAL),
+    Index("ix_analytics_orders_hourly_hour", "hour"),
+)
+
+analytics_item_hourly = Table(
+    "analytics_item_hourly",
+    Base.metadata,
+    Column("inventory_item_id", Integer, primary_key=True),
+    Column("hour", TIMESTAMP, primary_key=True),
+    Column("units", Integer, nullable=False),
+    Column("revenue", DECIMAL(12, 2), nullable=False),
+    Index("ix_analytics_item_hourly_hour", "hour"),
+)
+
+# bucket b counts satisfaction scores in [10b, 10b + 10) percent (100 -> 9)
+analytics_satisfaction_hourly = Table(
+    "analytics_satisfaction_hourly",
+    Base.metadata,
+    Column("robot_id", Integer, primary_key=True),
+    Column("hour", TIMESTAMP, primary_key=True),
+    Column("bucket", Integer, primary_key=True),
+    Column("responses", Integer, nullable=False),
+    Index("ix_analytics_satisfaction_hourly_hour", "hour"),
+)
@@ -0,0 +1,192 @@
+"""
+Keyset (cursor) pagination and sparse field selection for list endpoints.
+
+Pages are ordered by a unique sort key, (created_at, id) for time-ordered
+tables, or id alone. Each page is fetched with a row comparison against
+the last key of the previous page, e.g.
+`WHERE (created_at, id) > (:c, :i) ORDER BY created_at, id LIMIT n`, so
+page 10 000 costs the same index range scan as page 1. This needs the
+composite indexes declared in models.py.
+
+The response body stays a plain JSON list. When more rows exist, the
+opaque cursor for the next page is returned in the X-Next-Cursor header.
+
+With FAST_JSON=true, pages of endpoints that pass their response schema
+skip ORM objects and Pydantic. The schema's columns are selected as Core
+row tuples and written with orjson, with the same fields in the same
+order. DECIMAL columns of float fields are cast to double precision in
+the query. Any other column whose Python type differs from its field is
+converted in Python. Rows are not validated, so a NULL in a
+required field is sent as null rather than failing the request.
+"""
+
+import base64
+import json
+import os
+import typing
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Literal, Optional
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Float, cast, select, tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Core rows + orjson for list pages (needs `pip install orjson`)
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+if FAST_JSON:
+    import orjson
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        order: Literal["asc", "desc"] = "asc",
+        fields: Optional[str] = Query(None, description="Comma-separated subset of fields to return"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.order = order
+        self.fields = fields
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _cursor_value(value, col):
+    """A cursor element as the column's Python type; ValueError if it is not one."""
+    python_type = col.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if isinstance(value, bool):
+        raise ValueError
+    if python_type in (float, Decimal) and isinstance(value, (int, float)):
+        return Decimal(str(value)) if python_type is Decimal else float(value)
+    if not isinstance(value, python_type):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor: str, sort_cols) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(sort_cols):
+            raise ValueError
+        return [_cursor_value(v, col) for v, col in zip(values, sort_cols)]
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _columns(model, fields: Optional[str], sort_cols):
+    """Requested columns, plus the sort key (needed for the next cursor)."""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    table_cols = model.__table__.columns
+    unknown = [n for n in names if n not in table_cols]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return names, [table_cols[n] for n in names] + [c for c in sort_cols if c.key not in names]
+
+
+def _keyset(sort_cols, page: PageParams):
+    """WHERE clauses (after the cursor) and ORDER BY for one page."""
+    where = []
+    if page.cursor:
+        key, after = tuple_(*sort_cols), tuple_(*decode_cursor(page.cursor, sort_cols))
+        where.append(key > after if page.order == "asc" else key < after)
+    order_by = list(sort_cols) if page.order == "asc" else [c.desc() for c in sort_cols]
+    return where, order_by
+
+
+def _trim(rows, sort_cols, page: PageParams) -> tuple[list, dict]:
+    """Drop the look-ahead row; X-Next-Cursor header when there was one."""
+    if len(rows) <= page.limit:
+        return rows, {}
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return rows, {NEXT_CURSOR_HEADER: encode_cursor([getattr(last, c.key) for c in sort_cols])}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def _json_response(body, headers) -> Response:
+    if FAST_JSON:
+        return Response(orjson.dumps(body, default=_json_default), media_type="application/json", headers=headers)
+    return JSONResponse(jsonable_encoder(body), headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _schema_columns(model, schema) -> tuple[list[str], list, list]:
+    """Field names of schema, the columns to select, and (name, converter) for other types."""
+    table_cols = model.__table__.columns
+    names, columns, conversions = [], [], []
+    for name, field in schema.model_fields.items():
+        column = table_cols[name]
+        python_type = column.type.python_type
+        args = [a for a in typing.get_args(field.annotation) if a is not type(None)]
+        target = args[0] if len(args) == 1 else field.annotation
+        if target is float and python_type in (Decimal, int):
+            column = cast(column, Float).label(name)
+        elif target is not python_type:
+            conversions.append((name, TypeAdapter(field.annotation).validate_python))
+        names.append(name)
+        columns.append(column)
+    return names, columns, conversions
+
+
+def _fast_page(db, model, schema, sort_cols, filters, page: PageParams) -> Response:
+    names, columns, conversions = _schema_columns(model, schema)
+    where, order_by = _keyset(sort_cols, page)
+    stmt = (select(*columns, *(c for c in sort_cols if c.key not in names))
+            .where(*filters, *where).order_by(*order_by).limit(page.limit + 1))
+    rows, headers = _trim(db.execute(stmt).all(), sort_cols, page)
+
+    body = [dict(zip(names, row)) for row in rows]
+    for name, convert in conversions:
+        for item in body:
+            if item[name] is not None:
+                item[name] = convert(item[name])
+    return _json_response(body, headers)
+
+
+def paginate(db, model, sort_cols, filters, page: PageParams, response: Response, schema=None):
+    """
+    Run one keyset page over `model` and return either ORM rows (for the
+    endpoint's response_model) or, with ?fields=, a JSONResponse of dicts.
+    With FAST_JSON and the endpoint's item `schema`, always a response.
+    """
+    if FAST_JSON and schema is not None and not page.fields:
+        return _fast_page(db, model, schema, sort_cols, filters, page)
+
+    selected = _columns(model, page.fields, sort_cols)
+    query: OrmQuery = db.query(*selected[1]) if selected else db.query(model)
+    where, order_by = _keyset(sort_cols, page)
+    query = query.filter(*filters, *where).order_by(*order_by)
+    rows, headers = _trim(query.limit(page.limit + 1).all(), sort_cols, page)
+
+    if selected:
+        names = selected[0]
+        body = [{n: getattr(row, n) for n in names} for row in rows]
+        return _json_response(body, headers)
+
+    response.headers.update(headers)
+    return rows
@@ -0,0 +1,138 @@
+"""
+Latest-pose buffer for high-rate robot position reports.
+
+Position samples from POST /robots/positions and the /robots/positions/ws
+WebSocket only overwrite an in-memory entry per robot. A background task
+writes the robots that changed to robots.current_pos_x/y with one UPDATE
+every POSE_FLUSH_INTERVAL_S seconds. At 1 Hz or 100 Hz per robot, the
+database sees at most one statement per interval. Robot reads overlay the
+buffered pose, so clients never see a position older than the last sample.
+
+Every sample is also queued for robot_pose_history and written by the same
+flush with one COPY (app/pose_history.py). If the database stays down, the
+queue keeps only the newest POSE_HISTORY_MAX_PENDING samples.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+
+from app import crud, database, pose_history
+
+POSE_FLUSH_INTERVAL_S = float(os.getenv("POSE_FLUSH_INTERVAL_S", "1.0"))
+POSE_HISTORY_MAX_PENDING = 100_000
+
+
+@dataclass
+class Pose:
+    x: float
+    y: float
+    received_at: datetime
+
+
+class PoseBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._poses: dict[int, Pose] = {}
+        self._dirty: set[int] = set()
+        self._history = deque(maxlen=POSE_HISTORY_MAX_PENDING)
+        self.samples = 0
+        self.version = 0        # changes whenever a buffered pose does (response_cache stamps)
+        self.flushes = 0
+        self.rows_written = 0
+
+    def record(self, robot_id: int, x: float, y: float):
+        with self._lock:
+            pose = self._poses[robot_id] = Pose(x, y, datetime.now())
+            self._dirty.add(robot_id)
+            self._history.append((robot_id, pose.received_at, x, y))
+            self.samples += 1
+            self.version += 1
+
+    def forget(self, robot_id: int):
+        """Drop a buffered pose that a direct write has superseded."""
+        with self._lock:
+            if self._poses.pop(robot_id, None) is not None:
+                self.version += 1
+            self._dirty.discard(robot_id)
+
+    def get(self, robot_id: int):
+        with self._lock:
+            return self._poses.get(robot_id)
+
+    def snapshot(self) -> dict[int, Pose]:
+        with self._lock:
+            return dict(self._poses)
+
+    def _requeue_history(self, history):
+        # Older samples go back in front; past maxlen the oldest are dropped
+        self._history = deque(history + list(self._history), maxlen=POSE_HISTORY_MAX_PENDING)
+
+    def flush(self) -> int:
+        """
+        Write every pose changed since the last flush in one UPDATE and the
+        pending history samples with one COPY; returns robot rows written.
+        """
+        with self._lock:
+            if not self._dirty and not self._history:
+                return 0
+            batch = {rid: self._poses[rid] for rid in self._dirty}
+            self._dirty.clear()
+            history = list(self._history)
+            self._history.clear()
+
+        db = database.SessionLocal()
+        try:
+            written = set(crud.update_robot_positions(db, [
+                (rid, pose.x, pose.y, pose.received_at) for rid, pose in batch.items()
+            ])) if batch else set()
+            # Re-queued samples can belong to robots whose pose an earlier flush wrote
+            others = {s[0] for s in history} - written
+            known = written | set(crud.existing_robot_ids(db, others)) if others else written
+        except Exception:
+            # Re-queue unless a newer sample arrived in the meantime
+            with self._lock:
+                self._dirty.update(rid for rid, pose in batch.items() if self._poses.get(rid) is pose)
+                self._requeue_history(history)
+            db.close()
+            raise
+
+        try:
+            pose_history.copy_samples(db, [s for s in history if s[0] in known])
+        except Exception:
+            with self._lock:
+                self._requeue_history(history)
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            # Samples for robot ids that do not exist are dropped
+            for rid, pose in batch.items():
+                if rid not in written and self._poses.get(rid) is pose:
+                    del self._poses[rid]
+            self.flushes += 1
+            self.rows_written += len(written)
+        return len(written)
+
+    async def run(self, interval: float = POSE_FLUSH_INTERVAL_S):
+        """Flush loop for the app lifespan; flushes once more when cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    async with database.db_slots:
+                        await run_in_threadpool(self.flush)
+                except Exception as e:
+                    print(f"[Poses] Flush failed: {e}")
+        finally:
+            async with database.db_slots:
+                await run_in_threadpool(self.flush)
+
+
+pose_buffer = PoseBuffer()
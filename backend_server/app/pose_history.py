@@ -0,0 +1,194 @@
+"""
+Pose history: every reported sample, for route replay and analytics.
+
+Samples reach robot_pose_history through the pose buffer's flush as one
+COPY per interval. The table is range-partitioned by day. Partitions are
+created on first use, and those older than POSE_HISTORY_RETENTION_DAYS
+are dropped whole, with no DELETE or VACUUM.
+
+Trajectories are downsampled on the server, so a day at 10 Hz (864 000
+rows) can be drawn from a thousand points:
+
+  bucket  fixed-width time buckets averaged in SQL (date_bin); cost grows
+          with the rows scanned, and only the buckets cross the wire
+  lttb    Largest-Triangle-Three-Buckets over the raw samples, keeping the
+          points that shape the path (turns, stops). Windows larger than
+          LTTB_MAX_INPUT rows are bucketed in SQL down to that size first.
+  raw     every sample
+
+encode_binary() packs a trajectory as little-endian columns:
+  b"POSE", uint32 n, float64 t[n] (unix seconds), float32 x[n], float32 y[n]
+"""
+
+import io
+import os
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+POSE_HISTORY_RETENTION_DAYS = int(os.getenv("POSE_HISTORY_RETENTION_DAYS", "30"))
+LTTB_MAX_INPUT = 200_000
+BINARY_MAGIC = b"POSE"
+BINARY_MEDIA_TYPE = "application/x-vendobot-trajectory"
+
+# Days whose partition is known to exist (per process)
+_partitions: set[date] = set()
+
+
+def _partition_name(day: date) -> str:
+    return f"robot_pose_history_{day:%Y%m%d}"
+
+
+def ensure_partitions(db: Session, days):
+    created = False
+    for day in sorted(set(days) - _partitions):
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} PARTITION OF robot_pose_history "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+        _partitions.add(day)
+        created = True
+    if created and POSE_HISTORY_RETENTION_DAYS > 0:
+        drop_partitions_before(db, date.today() - timedelta(days=POSE_HISTORY_RETENTION_DAYS))
+
+
+def drop_partitions_before(db: Session, cutoff: date) -> list[str]:
+    names = db.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'robot_pose_history'
+    """)).scalars().all()
+    dropped = []
+    for name in names:
+        try:
+            day = datetime.strptime(name.rsplit("_", 1)[1], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if day < cutoff:
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            _partitions.discard(day)
+            dropped.append(name)
+    return dropped
+
+
+def copy_samples(db: Session, samples):
+    """Append (robot_id, recorded_at, x, y) samples with one COPY and commit."""
+    if not samples:
+        return 0
+
+    buf = io.StringIO()
+    for robot_id, at, x, y in samples:
+        buf.write(f"{robot_id}\t{at.isoformat(' ')}\t{x!r}\t{y!r}\n")
+    buf.seek(0)
+
+    try:
+        ensure_partitions(db, {at.date() for _, at, _, _ in samples})
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert("COPY robot_pose_history (robot_id, recorded_at, x, y) FROM STDIN", buf)
+        finally:
+            cursor.close()
+        db.commit()
+    except Exception:
+        db.rollback()
+        _partitions.clear()     # a CREATE may have been rolled back with it
+        raise
+    return len(samples)
+
+
+def _raw(db: Session, robot_id: int, since: datetime, until: datetime):
+    return db.execute(text("""
+        SELECT recorded_at, x, y FROM robot_pose_history
+        WHERE robot_id = :robot_id AND recorded_at >= :since AND recorded_at < :until
+        ORDER BY recorded_at
+    """), {"robot_id": robot_id, "since": since, "until": until}).all()
+
+
+def _buckets(db: Session, robot_id: int, since: datetime, until: datetime, points: int):
+    width = max((until - since).total_seconds() / points, 0.001)
+    return db.execute(text("""
+        SELECT timestamp 'epoch' + avg(recorded_at - timestamp 'epoch') AS t, avg(x), avg(y)
+        FROM robot_pose_history
+        WHERE robot_id = :robot_id AND recorded_at >= :since AND recorded_at < :until
+        GROUP BY date_bin(make_interval(secs => :width), recorded_at, :since)
+        ORDER BY 1
+    """), {"robot_id": robot_id, "since": since, "until": until, "width": width}).all()
+
+
+def _count(db: Session, robot_id: int, since: datetime, until: datetime) -> int:
+    return db.execute(text("""
+        SELECT count(*) FROM robot_pose_history
+        WHERE robot_id = :robot_id AND recorded_at >= :since AND recorded_at < :until
+    """), {"robot_id": robot_id, "since": since, "until": until}).scalar()
+
+
+def lttb(rows, threshold: int):
+    """
+    Largest-Triangle-Three-Buckets on (t, x, y) rows. The triangle area is
+    taken in the x/y plane, so the points kept are the ones that bend the
+    route; first and last samples are always kept.
+    """
+    n = len(rows)
+    if threshold >= n or threshold < 3:
+        return list(rows)
+
+    out = [rows[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # Average of the next bucket (or the last point)
+        nstart, nend = end, min(int((i + 2) * every) + 1, n)
+        if nstart >= nend:
+            nstart, nend = n - 1, n
+        cnt = nend - nstart
+        avg_x = sum(r[1] for r in rows[nstart:nend]) / cnt
+        avg_y = sum(r[2] for r in rows[nstart:nend]) / cnt
+
+        ax, ay = rows[a][1], rows[a][2]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            bx, by = rows[j][1], rows[j][2]
+            area = abs((ax - avg_x) * (by - ay) - (ax - bx) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(rows[best])
+        a = best
+
+    out.append(rows[-1])
+    return out
+
+
+def trajectory(db: Session, robot_id: int, since: datetime, until: datetime, points: int, mode: str):
+    """Columns (t, x, y) of a robot's path in [since, until), downsampled to about `points`."""
+    if mode == "bucket":
+        rows = _buckets(db, robot_id, since, until, points)
+    elif mode == "lttb":
+        if _count(db, robot_id, since, until) > LTTB_MAX_INPUT:
+            rows = _buckets(db, robot_id, since, until, LTTB_MAX_INPUT)
+        else:
+            rows = _raw(db, robot_id, since, until)
+        rows = lttb(rows, points)
+    else:
+        rows = _raw(db, robot_id, since, until)
+
+    return (
+        [r[0].timestamp() for r in rows],
+        [float(r[1]) for r in rows],
+        [float(r[2]) for r in rows],
+    )
+
+
+def encode_binary(t, x, y) -> bytes:
+    cols = [array("d", t), array("f", x), array("f", y)]
+    if sys.byteorder == "big":
+        for col in cols:
+            col.byteswap()
+    return BINARY_MAGIC + struct.pack("<I", len(t)) + b"".join(col.tobytes() for col in cols)
@@ -0,0 +1,221 @@
+"""
+In-process cache of serialized JSON responses for read-heavy list routes
+(GET /inventory/, GET /robots/).
+
+An entry is the response body exactly as sent, with its ETag and headers.
+A hit returns those bytes without touching the database or Pydantic. A
+request whose If-None-Match matches gets 304 Not Modified, on hits and
+misses alike. The cache is an LRU of RESPONSE_CACHE_MAX_ENTRIES entries,
+each kept at most RESPONSE_CACHE_TTL_S seconds (0 turns the cache off).
+
+Invalidation is driven by the NOTIFY triggers in app/live.py, followed
+through the /live hub. Each entry carries tags naming the rows it was
+built from:
+
+  "robots"         any robots row             robot events
+  "inventory"      any inventory item         inventory events (every robot)
+  "inventory:<r>"  the items of robot r       inventory events for robot r
+
+An event drops exactly the entries holding one of its tags. Entries can
+also carry a stamp (the pose buffer version for robot lists), checked
+on every lookup.
+
+Nothing is served or stored unless LISTEN is up and this cache's
+subscription is open. Otherwise a change could go unnoticed. A closed
+subscription (the hub fell behind or lost LISTEN) empties the cache. A
+response is stored only if none of its tags was invalidated while it was
+being built, so a read racing a write cannot store the old rows.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.live import hub
+
+RESPONSE_CACHE_TTL_S = float(os.getenv("RESPONSE_CACHE_TTL_S", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+CACHE_HEADER = "X-Cache"
+EVENT_KINDS = frozenset({"robot", "inventory"})
+
+
+def inventory_tags(robot_id) -> set[str]:
+    return {"inventory"} if robot_id is None else {f"inventory:{robot_id}"}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclass
+class Entry:
+    body: bytes
+    etag: str
+    headers: dict
+    tags: frozenset
+    expires: float
+    stamp: object = None
+
+
+@dataclass
+class Token:
+    """Tag versions when a miss started building its response."""
+    epoch: int
+    versions: dict = field(default_factory=dict)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, Entry] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._sub = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        sub = self._sub
+        return self.ttl > 0 and sub is not None and sub.closed_reason is None and hub.connected
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _respond(self, request: Request, entry: Entry, status: str) -> Response:
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", CACHE_HEADER: status}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers={**entry.headers, **headers})
+
+    def lookup(self, request: Request, key: tuple, stamp=None) -> Optional[Response]:
+        """The cached response for key, or None on a miss."""
+        if not self.enabled:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires <= now or entry.stamp != stamp:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._respond(request, entry, "HIT")
+
+    def begin(self, tags) -> Optional[Token]:
+        """Call before reading the rows behind a response; pass the token to store()."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return Token(self._epoch, {tag: self._versions.get(tag, 0) for tag in tags})
+
+    def store(self, request: Request, key: tuple, token: Optional[Token], body: bytes,
+              headers: Optional[dict] = None, stamp=None) -> Response:
+        """Cache body (unless a tag changed since begin()) and return the response for it."""
+        entry = Entry(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            headers=dict(headers or {}),
+            tags=frozenset(token.versions) if token else frozenset(),
+            expires=time.monotonic() + self.ttl,
+            stamp=stamp,
+        )
+        if token is not None and self.enabled:
+            with self._lock:
+                current = token.epoch == self._epoch and all(
+                    self._versions.get(tag, 0) == version for tag, version in token.versions.items()
+                )
+                if current:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    self.stores += 1
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return self._respond(request, entry, "MISS")
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def _on_event(self, event):
+        if event["type"] == "robot":
+            self.invalidate({"robots"})
+        elif event["type"] == "inventory":
+            self.invalidate({"inventory", f"inventory:{event['data'].get('robot_id')}"})
+
+    async def run(self):
+        """Follow robot and inventory NOTIFY events (app lifespan)."""
+        while True:
+            sub = self._sub = hub.subscribe(kinds=EVENT_KINDS)
+            try:
+                while (event := await sub.next_event()) is not None:
+                    self._on_event(event)
+            finally:
+                hub.unsubscribe(sub)
+                self._sub = None
+            # Events were missed: nothing cached can be trusted
+            self.clear()
+            await asyncio.sleep(0)
+
+    def status(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "not_modified": self.not_modified,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app import analytics, database, schemas
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Every route reads the rollup tables maintained by analytics.refresher
+
+
+def _window(since: Optional[datetime], until: Optional[datetime]):
+    # Default: the last 7 days
+    until = until or datetime.now()
+    since = since or until - timedelta(days=7)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return since, until
+
+
+@router.get("/orders", response_model=list[schemas.OrdersPeriod])
+def get_orders(
+    robot_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    granularity: Literal["hour", "day", "week", "month"] = "hour",
+    db: Session = Depends(database.get_db),
+):
+    """Orders, units and revenue per robot per period (by order time)."""
+    since, until = _window(since, until)
+    return analytics.orders(db, robot_id, since, until, granularity)
+
+
+@router.get("/delivery-times", response_model=list[schemas.DeliveryTimes])
+def get_delivery_times(
+    robot_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(database.get_db),
+):
+    """created_at -> last_updated_at of delivered orders, per robot."""
+    since, until = _window(since, until)
+    return analytics.delivery_times(db, robot_id, since, until)
+
+
+@router.get("/satisfaction", response_model=list[schemas.SatisfactionBucket])
+def get_satisfaction(
+    robot_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(database.get_db),
+):
+    """Distribution of satisfaction scores in 10-point buckets."""
+    since, until = _window(since, until)
+    return analytics.satisfaction(db, robot_id, since, until)
+
+
+@router.get("/depletion", response_model=list[schemas.ItemDepletion])
+def get_depletion(
+    robot_id: Optional[int] = None,
+    window_hours: int = Query(24, ge=1, le=24 * 90),
+    db: Session = Depends(database.get_db),
+):
+    """Units sold per hour over the window and hours until each item's stock runs out."""
+    return analytics.depletion(db, window_hours, robot_id)
+
+
+@router.get("/status", response_model=schemas.AnalyticsStatus)
+def get_status():
+    r = analytics.refresher
+    return schemas.AnalyticsStatus(
+        last_refresh=r.last_refresh,
+        last_full_refresh=r.last_full_refresh,
+        pending_hours=r.pending_hours,
+        refreshes=r.refreshes,
+        hours_rebuilt=r.hours_rebuilt,
+        full_skipped=r.full_skipped,
+    )
+
+
+@router.post("/refresh", status_code=202)
+def request_refresh():
+    """Rebuild every rollup at the next refresh (after a change made without NOTIFY)."""
+    analytics.refresher.request_full()
+    return {"status": "scheduled"}
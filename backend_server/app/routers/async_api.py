@@ -0,0 +1,49 @@
+# app/routers/async_api.py
+# Async versions of the hot endpoints, on the asyncpg engine. main.py
+# includes this router ahead of the sync ones when DB_ASYNC=true, so these
+# routes take the same URLs and return the same bodies without using the
+# threadpool.
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, schemas, database
+from app.pose_buffer import pose_buffer
+from app.routers.robots import (
+    Include, RobotOut, RobotPositionUpdate, _serialize, robot_list_begin, robot_list_lookup, robot_list_store,
+)
+
+router = APIRouter(tags=["async"])
+
+@router.get("/robots/", response_model=list[RobotOut])
+async def get_all_robots(request: Request, include: Include = None,
+                         db: AsyncSession = Depends(database.get_async_db)):
+    key, stamp, cached = robot_list_lookup(request, include)
+    if cached is not None:
+        return cached
+    token = robot_list_begin(include)
+    robots = await crud_async.get_robots(db, include_inventory=include == "inventory")
+    return robot_list_store(request, key, stamp, token, robots, include)
+
+@router.get("/robots/{robot_id:int}", response_model=RobotOut)
+async def get_robot_by_id(robot_id: int, include: Include = None,
+                          db: AsyncSession = Depends(database.get_async_db)):
+    robot = await crud_async.get_robot_by_id(db, robot_id, include_inventory=include == "inventory")
+    if robot is None:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    return _serialize(robot, include)
+
+@router.put("/robots/{robot_id:int}/position", response_model=RobotOut)
+async def update_robot_position(robot_id: int, position: RobotPositionUpdate, include: Include = None,
+                                db: AsyncSession = Depends(database.get_async_db)):
+    db_robot = await crud_async.update_robot_position(
+        db, robot_id, position.current_pos_x, position.current_pos_y,
+        include_inventory=include == "inventory",
+    )
+    if not db_robot:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    pose_buffer.forget(robot_id)
+    return _serialize(db_robot, include)
+
+@router.get("/deliveryRecord/{robot_id:int}", response_model=list[schemas.DeliveryRecord])
+async def get_delivery_record_by_robotID(robot_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    return await crud_async.get_delivery_records_by_robot(db, robot_id)
@@ -0,0 +1,96 @@
+import time
+from datetime import datetime
+from typing import Literal, Optional
+
+import anyio
+import psycopg2
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app import bulk, database
+
+router = APIRouter(prefix="/bulk", tags=["bulk"])
+
+Table = Literal["inventory", "logs", "deliveries"]
+Format = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@router.post("/{table}/import")
+async def import_rows(
+    table: Table,
+    request: Request,
+    format: Format = "csv",
+    header: bool = True,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Load the request body (csv or ndjson, see app/bulk.py) with one COPY.
+    All rows are committed, or none.
+    """
+    chunks = request.stream()
+
+    async def next_chunk():
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def load():
+        # Runs in a worker thread; pulls the upload from the event loop as COPY reads it
+        count = bulk.import_stream(
+            db.connection(), bulk.TABLES[table], lambda: anyio.from_thread.run(next_chunk), format, header
+        )
+        db.commit()
+        return count
+
+    t0 = time.perf_counter()
+    try:
+        count = await run_in_threadpool(load)
+    except (ValueError, UnicodeDecodeError, psycopg2.Error, DBAPIError) as e:
+        await run_in_threadpool(db.rollback)
+        # COPY runs on the raw connection, so most errors are psycopg2's own
+        detail = str(getattr(e, "orig", None) or e).strip().splitlines()[0]
+        raise HTTPException(status_code=400, detail=f"Import into {table} failed: {detail}")
+    return {"table": table, "rows": count, "seconds": round(time.perf_counter() - t0, 3)}
+
+
+@router.get("/{table}/export")
+def export_rows(
+    table: Table,
+    format: Format = "csv",
+    robot_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Stream every matching row, ordered by id, through a server-side cursor."""
+    sa_table = bulk.TABLES[table]
+    filters = []
+    if robot_id is not None:
+        filters.append(sa_table.c.robot_id == robot_id)
+    if since is not None or until is not None:
+        if "created_at" not in sa_table.c:
+            raise HTTPException(status_code=400, detail=f"{table} has no created_at to filter on")
+        if since is not None:
+            filters.append(sa_table.c.created_at >= since)
+        if until is not None:
+            filters.append(sa_table.c.created_at < until)
+
+    async def body():
+        # Own session (the stream outlives the request's dependencies), under the same cap
+        async with database.db_slots:
+            db = database.SessionLocal()
+            try:
+                async for chunk in iterate_in_threadpool(bulk.export_rows(db, sa_table, format, filters)):
+                    yield chunk
+            finally:
+                await run_in_threadpool(db.close)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
@@ -1,30 +1,77 @@
 # app/routers/logs.py
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 # Import models
 from app import crud, schemas, database, models
+from app.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/deliveryRecord", tags=["deliveryRecord"])
 
 @router.get("/", response_model=list[schemas.DeliveryRecord])
-def get_delivery_record(db: Session = Depends(database.get_db)):
-    return db.query(models.deliveryRecords).all()
+def get_delivery_record(
+    response: Response,
+    robot_id: Optional[int] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(database.get_db),
+):
+    """One keyset page ordered by (created_at, id); see X-Next-Cursor."""
+    filters = []
+    if robot_id is not None:
+        filters.append(models.deliveryRecords.robot_id == robot_id)
+    if status is not None:
+        filters.append(models.deliveryRecords.status == status)
+    if since is not None:
+        filters.append(models.deliveryRecords.created_at >= since)
+    if until is not None:
+        filters.append(models.deliveryRecords.created_at < until)
+
+    sort_cols = (models.deliveryRecords.created_at, models.deliveryRecords.id)
+    return paginate(db, models.deliveryRecords, sort_cols, filters, page, response, schemas.DeliveryRecord)
 
 @router.post("/", response_model=schemas.DeliveryRecord)
 def create_delivery_record(record: schemas.DeliveryRecordCreate, db: Session = Depends(database.get_db)):
-    return crud.create_delivery_record(db, record)
+    try:
+        return crud.create_delivery_record(db, record)
+    except crud.InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.InsufficientInventoryError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "item_ids": e.item_ids})
+    except crud.ConfirmationCodeConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/recordingSession", response_model=schemas.RecordingSession)
+def start_recording_session():
+    """Issue the id that ties a recording to its delivery record.
+
+    Send it as recording_session_id when creating the record, and with the
+    video path when recording stops.
+    """
+    return {"recording_session_id": crud.new_recording_session_id()}
 
 @router.post("/updateVideoURL")
 def update_delivery_record_after_stop_record(body: dict, db: Session = Depends(database.get_db)):
-    
-    received_video_url = body.get("video_url")
-
-    text2find, video_url = received_video_url.split(",", 1)
+    """Body: {"recording_session_id", "video_url"}, or the legacy {"video_url": "<session id>,<path>"}."""
+    if "recording_session_id" in body:
+        try:
+            update = schemas.VideoUrlUpdate.model_validate(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors())
+        recording_session_id, video_url = update.recording_session_id, update.video_url
+    else:
+        received_video_url = body.get("video_url") or ""
+        recording_session_id, _, video_url = received_video_url.partition(",")
     
     if not video_url:
         raise HTTPException(status_code=400, detail="Missing 'video_url' in request body")
 
-    updated_record = crud.update_delivery_record_after_stop_record(db,text2find, video_url)
+    updated_record = crud.update_delivery_record_after_stop_record(db, recording_session_id, video_url)
 
     return updated_record
 
@@ -33,13 +80,12 @@ def update_Statisfication_after_stop_record(body: dict, db: Session = Depends(da
     
     statisfication = body.get("statisfication")
     video_url = body.get("video_url")
-    print(video_url)
-    print(statisfication)
+    recording_session_id = body.get("recording_session_id")
     
     if not statisfication:
         raise HTTPException(status_code=400, detail="Missing 'statisfication' in request body")
 
-    updated_record = crud.update_Statisfication_after_stop_record(db,statisfication, video_url)
+    updated_record = crud.update_Statisfication_after_stop_record(db, statisfication, video_url, recording_session_id)
 
     return updated_record
 
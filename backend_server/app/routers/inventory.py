@@ -1,13 +1,48 @@
 # app/routers/inventory.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from app import crud, schemas, database
+from app import crud, schemas, database, models
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, paginate
+from app.response_cache import inventory_tags, response_cache
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
+_items = TypeAdapter(list[schemas.InventoryItem])
+
 @router.get("/", response_model=list[schemas.InventoryItem])
-def get_inventory_items(db: Session = Depends(database.get_db)):
-    return crud.get_inventory(db)
+def get_inventory_items(
+    request: Request,
+    response: Response,
+    robot_id: Optional[int] = None,
+    category: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(database.get_db),
+):
+    """One keyset page ordered by id; see X-Next-Cursor. Served from app/response_cache.py."""
+    key = ("inventory", robot_id, category, page.limit, page.cursor, page.order, page.fields)
+    cached = response_cache.lookup(request, key)
+    if cached is not None:
+        return cached
+    token = response_cache.begin(inventory_tags(robot_id))
+
+    filters = []
+    if robot_id is not None:
+        filters.append(models.InventoryItem.robot_id == robot_id)
+    if category is not None:
+        filters.append(models.InventoryItem.category == category)
+
+    result = paginate(db, models.InventoryItem, (models.InventoryItem.id,), filters, page, response,
+                      schemas.InventoryItem)
+    if isinstance(result, Response):     # ?fields= or FAST_JSON: already a response
+        body, next_cursor = result.body, result.headers.get(NEXT_CURSOR_HEADER)
+    else:
+        body = _items.dump_json(_items.validate_python(result, from_attributes=True))
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return response_cache.store(request, key, token, body, headers)
 
 @router.post("/", response_model=schemas.InventoryItem)
 def create_inventory_item(item: schemas.InventoryItemCreate, db: Session = Depends(database.get_db)):
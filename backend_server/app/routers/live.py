@@ -0,0 +1,69 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.live import hub
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+SSE_KEEPALIVE_S = 15.0
+
+
+@router.websocket("/ws")
+async def live_ws(websocket: WebSocket, robot_id: Optional[int] = None):
+    """Snapshot, then robot / delivery deltas as JSON text messages (see app/live.py)."""
+    await websocket.accept()
+    # Subscribe before reading the snapshot so no change falls in between
+    sub = hub.subscribe(robot_id)
+    try:
+        await websocket.send_json(await hub.read_snapshot(robot_id))
+        receiver = asyncio.ensure_future(websocket.receive())
+        while True:
+            getter = asyncio.ensure_future(sub.next_event())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())   # ignore client messages
+                continue
+            event = getter.result()
+            if event is None:
+                # Close with "service restart": reconnect for a fresh snapshot
+                receiver.cancel()
+                await websocket.close(code=1012, reason=sub.closed_reason)
+                return
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/events")
+async def live_events(request: Request, robot_id: Optional[int] = None):
+    """The same stream as Server-Sent Events (`event: snapshot|robot|delivery`)."""
+    sub = hub.subscribe(robot_id)
+
+    async def stream():
+        try:
+            snapshot = await hub.read_snapshot(robot_id)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.next_event(), SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield f"event: resync\ndata: {json.dumps({'reason': sub.closed_reason})}\n\n"
+                    return
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,18 +1,35 @@
 # app/routers/logs.py
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 # Import models
 from app import crud, schemas, database, models
+from app.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
 @router.get("/", response_model=list[schemas.RobotLog])
-def get_logs(db: Session = Depends(database.get_db)):
-    # This was the bug:
-    # return db.query(schemas.RobotLog).all()  
-    
-    # This is the fix (query models.RobotLog):
-    return db.query(models.RobotLog).all()
+def get_logs(
+    response: Response,
+    robot_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(database.get_db),
+):
+    """One keyset page ordered by (created_at, id); see X-Next-Cursor."""
+    filters = []
+    if robot_id is not None:
+        filters.append(models.RobotLog.robot_id == robot_id)
+    if since is not None:
+        filters.append(models.RobotLog.created_at >= since)
+    if until is not None:
+        filters.append(models.RobotLog.created_at < until)
+
+    sort_cols = (models.RobotLog.created_at, models.RobotLog.id)
+    return paginate(db, models.RobotLog, sort_cols, filters, page, response, schemas.RobotLog)
 
 
 @router.post("/", response_model=schemas.RobotLog)
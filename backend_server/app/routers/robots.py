@@ -1,51 +1,147 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from typing import Literal, Optional, Union
+
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
-from app import crud, schemas, database, models
+from app import crud, schemas, database, pose_history
+from app.pose_buffer import pose_buffer
+from app.response_cache import response_cache
 from fastapi import HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 router = APIRouter(prefix="/robots", tags=["robots"])
 
-@router.get("/", response_model=list[schemas.Robot])
-def get_all_robots(db: Session = Depends(database.get_db)):
-    return crud.get_robots(db)
+# ?include=inventory embeds each robot's inventory_items (one extra IN query
+# for the whole response); without it robots are returned without items.
+Include = Optional[Literal["inventory"]]
+RobotOut = Union[schemas.Robot, schemas.RobotSummary]
+
+
+def _serialize(robot, include: Include):
+    if include == "inventory":
+        out = schemas.Robot.model_validate(robot)
+    else:
+        out = schemas.RobotSummary.model_validate(robot)
+    # A buffered pose is newer than the row until the next flush
+    pose = pose_buffer.get(robot.id)
+    if pose is not None:
+        out.current_pos_x, out.current_pos_y, out.last_updated = pose.x, pose.y, pose.received_at
+    return out
+
+
+# GET /robots/ is served from app/response_cache.py. Entries are stamped
+# with the pose buffer version, since _serialize overlays buffered poses.
+_robot_list = TypeAdapter(list[RobotOut])
+
+
+def robot_list_lookup(request: Request, include: Include):
+    """(key, stamp, cached response or None) for GET /robots/."""
+    key, stamp = ("robots", include), pose_buffer.version
+    return key, stamp, response_cache.lookup(request, key, stamp)
+
+
+def robot_list_begin(include: Include):
+    return response_cache.begin({"robots", "inventory"} if include == "inventory" else {"robots"})
+
+
+def robot_list_store(request: Request, key, stamp, token, robots, include: Include):
+    body = _robot_list.dump_json([_serialize(r, include) for r in robots])
+    return response_cache.store(request, key, token, body, stamp=stamp)
+
+
+@router.get("/", response_model=list[RobotOut])
+def get_all_robots(request: Request, include: Include = None, db: Session = Depends(database.get_db)):
+    key, stamp, cached = robot_list_lookup(request, include)
+    if cached is not None:
+        return cached
+    token = robot_list_begin(include)
+    robots = crud.get_robots(db, include_inventory=include == "inventory")
+    return robot_list_store(request, key, stamp, token, robots, include)
 
 @router.post("/", response_model=schemas.Robot)
 def create_robot(robot: schemas.RobotCreate, db: Session = Depends(database.get_db)):
     return crud.create_robot(db, robot)
 
-@router.get("/{robot_id}", response_model=schemas.Robot)
-def get_robot_by_id(robot_id: int, db: Session = Depends(database.get_db)):
-    print("✅ Received robot_id:", robot_id)
-    allRobots = crud.get_robots(db)
+# --- High-rate position ingestion (see app/pose_buffer.py) ---
+_pose_batch = TypeAdapter(list[schemas.PoseSample])
+
+@router.post("/positions", response_model=schemas.PoseBatchResult, status_code=202)
+def report_positions(samples: list[schemas.PoseSample]):
+    for s in samples:
+        pose_buffer.record(s.robot_id, s.current_pos_x, s.current_pos_y)
+    return schemas.PoseBatchResult(accepted=len(samples))
+
+@router.get("/positions", response_model=list[schemas.RobotPose])
+def get_positions():
+    """Latest reported pose of every robot, from memory."""
+    return [
+        schemas.RobotPose(robot_id=rid, current_pos_x=p.x, current_pos_y=p.y, last_updated=p.received_at)
+        for rid, p in sorted(pose_buffer.snapshot().items())
+    ]
 
-    for robot in allRobots:
-        if robot.id == robot_id:
-            # Return this single robot, not the whole list
-            return robot
+@router.websocket("/positions/ws")
+async def stream_positions(websocket: WebSocket):
+    """Each message is one PoseSample object or a list of them; no reply unless invalid."""
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            try:
+                samples = _pose_batch.validate_python(data if isinstance(data, list) else [data])
+            except ValidationError as e:
+                await websocket.send_json({"error": e.errors(include_url=False)})
+                continue
+            for s in samples:
+                pose_buffer.record(s.robot_id, s.current_pos_x, s.current_pos_y)
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/{robot_id}", response_model=RobotOut)
+def get_robot_by_id(robot_id: int, include: Include = None, db: Session = Depends(database.get_db)):
+    robot = crud.get_robot_by_id(db, robot_id, include_inventory=include == "inventory")
+    if robot is None:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    return _serialize(robot, include)
+
+@router.get("/{robot_id}/trajectory", response_model=schemas.Trajectory)
+def get_trajectory(
+    robot_id: int,
+    since: Optional[datetime] = Query(None, description="Default: one hour before `until`"),
+    until: Optional[datetime] = Query(None, description="Default: now"),
+    points: int = Query(1000, ge=3, le=100_000, description="Target point count (lttb, bucket)"),
+    mode: Literal["lttb", "bucket", "raw"] = "lttb",
+    format: Literal["json", "binary"] = "json",
+    db: Session = Depends(database.get_db),
+):
+    """Pose history as columns; format=binary is the packed layout in app/pose_history.py."""
+    until = until or datetime.now()
+    since = since or until - timedelta(hours=1)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="`since` must be before `until`")
 
-    # If no match found, return 404
-    raise HTTPException(status_code=404, detail="Robot not found")
+    t, x, y = pose_history.trajectory(db, robot_id, since, until, points, mode)
+    if format == "binary":
+        return Response(pose_history.encode_binary(t, x, y), media_type=pose_history.BINARY_MEDIA_TYPE)
+    # Plain columns: skip per-element response_model validation
+    return JSONResponse({"robot_id": robot_id, "mode": mode, "t": t, "x": x, "y": y})
 
 class RobotPositionUpdate(BaseModel):
     current_pos_x: float
     current_pos_y: float
 
-@router.put("/{robot_id}/position", response_model=schemas.Robot)
+@router.put("/{robot_id}/position", response_model=RobotOut)
 def update_robot_position(
     robot_id: int, 
     position: RobotPositionUpdate, 
+    include: Include = None,
     db: Session = Depends(database.get_db)
 ):
-    db_robot = db.query(models.Robot).filter(models.Robot.id == robot_id).first()
+    db_robot = crud.update_robot_position(
+        db, robot_id, position.current_pos_x, position.current_pos_y,
+        include_inventory=include == "inventory",
+    )
     if not db_robot:
         raise HTTPException(status_code=404, detail="Robot not found")
-    
-    db_robot.current_pos_x = position.current_pos_x
-    db_robot.current_pos_y = position.current_pos_y
-    db_robot.last_updated = func.now()
-    
-    db.commit()
-    db.refresh(db_robot)
-    return db_robot
\ No newline at end of file
+    pose_buffer.forget(robot_id)
+    return _serialize(db_robot, include)
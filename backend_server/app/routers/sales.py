@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app import database, schemas, sales
+
+router = APIRouter(prefix="/sales", tags=["sales"])
+
+
+def _window(since: Optional[datetime], until: Optional[datetime]):
+    # Default: the last 24 hours
+    until = until or datetime.now()
+    since = since or until - timedelta(days=1)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return since, until
+
+
+@router.get("/items/{inventory_item_id}/hourly", response_model=list[schemas.SalesBucket])
+def get_item_sales_by_hour(
+    inventory_item_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(database.get_db),
+):
+    """Units of one item ordered per hour (hours with no orders are omitted)."""
+    since, until = _window(since, until)
+    return sales.item_sales_by_hour(db, inventory_item_id, since, until)
+
+
+@router.get("/top", response_model=list[schemas.ItemSales])
+def get_top_items(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=1000),
+    db: Session = Depends(database.get_db),
+):
+    """Best-selling items by units ordered in the window."""
+    since, until = _window(since, until)
+    return sales.top_items(db, since, until, limit)
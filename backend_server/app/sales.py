@@ -0,0 +1,87 @@
+"""
+Order line items (order_items) and the sales aggregates built on them.
+
+Every delivery record's lines are stored as order_items rows, written with
+one multi-row INSERT in the order's transaction (crud.add_order_items).
+The comma-separated inventory_ids / quantity columns on delivery_records
+are still stored as sent, for existing clients. order_lines_compat gives
+the same strings rebuilt from order_items, for SQL readers that should
+stop depending on those columns.
+
+Aggregates group the covering indexes on (inventory_item_id, created_at)
+and (created_at) by hour, so they are answered from the index alone
+without parsing strings.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+COMPAT_VIEW_SQL = """
+    CREATE OR REPLACE VIEW order_lines_compat AS
+    SELECT delivery_record_id,
+           string_agg(inventory_item_id::text, ', ' ORDER BY id) AS inventory_ids,
+           string_agg(quantity::text, ', ' ORDER BY id) AS quantity
+    FROM order_items
+    GROUP BY delivery_record_id
+"""
+
+# Lines of existing delivery records, parsed from their strings in SQL
+# ("1,4" or "[1, 4]"). Repeated items are merged; lines naming unknown items
+# or non-positive quantities, and lists of different lengths, are skipped.
+_BACKFILL_TEMPLATE = r"""
+    INSERT INTO order_items (delivery_record_id, inventory_item_id, quantity, unit_price, created_at)
+    SELECT d.id, i.id, sum(l.qty::int), i.price, COALESCE(d.created_at, now())
+    FROM delivery_records d
+    CROSS JOIN LATERAL unnest(
+        regexp_split_to_array(btrim(d.inventory_ids, '[] '), '\s*,\s*'),
+        regexp_split_to_array(btrim(d.quantity, '[] '), '\s*,\s*')
+    ) AS l(item_id, qty)
+    JOIN inventory_items i ON i.id = CASE WHEN l.item_id ~ '^\d{1,9}$' THEN l.item_id::int END
+    WHERE l.qty ~ '^\d{1,9}$'
+      AND cardinality(regexp_split_to_array(btrim(d.inventory_ids, '[] '), '\s*,\s*'))
+        = cardinality(regexp_split_to_array(btrim(d.quantity, '[] '), '\s*,\s*'))
+      /*scope*/
+    GROUP BY d.id, i.id, i.price, d.created_at
+    HAVING sum(l.qty::int) > 0
+"""
+# Every record (migrate, when it creates order_items)
+BACKFILL_SQL = _BACKFILL_TEMPLATE.replace("/*scope*/", "")
+# Only the records written by the current transaction: a bulk import of
+# delivery_records, whose COPY bypasses crud.add_order_items. xmin is not
+# indexed, so this reads the whole table once per import.
+BACKFILL_CURRENT_XACT_SQL = _BACKFILL_TEMPLATE.replace("/*scope*/", "AND d.xmin = pg_current_xact_id()::xid")
+
+
+def install_views(conn):
+    """Run by `python -m app.admin migrate`, inside its transaction."""
+    conn.execute(text(COMPAT_VIEW_SQL))
+
+
+def item_sales_by_hour(db: Session, inventory_item_id: int, since: datetime, until: datetime):
+    return db.execute(text("""
+        SELECT date_trunc('hour', created_at) AS hour,
+               sum(quantity) AS units,
+               sum(quantity * unit_price) AS revenue
+        FROM order_items
+        WHERE inventory_item_id = :item_id AND created_at >= :since AND created_at < :until
+        GROUP BY 1
+        ORDER BY 1
+    """), {"item_id": inventory_item_id, "since": since, "until": until}).mappings().all()
+
+
+def top_items(db: Session, since: datetime, until: datetime, limit: int):
+    return db.execute(text("""
+        SELECT s.inventory_item_id, i.name, s.units, s.revenue
+        FROM (
+            SELECT inventory_item_id, sum(quantity) AS units, sum(quantity * unit_price) AS revenue
+            FROM order_items
+            WHERE created_at >= :since AND created_at < :until
+            GROUP BY inventory_item_id
+            ORDER BY units DESC, inventory_item_id
+            LIMIT :limit
+        ) s
+        JOIN inventory_items i ON i.id = s.inventory_item_id
+        ORDER BY s.units DESC, s.inventory_item_id
+    """), {"since": since, "until": until, "limit": limit}).mappings().all()
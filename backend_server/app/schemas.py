@@ -29,13 +29,36 @@ class RobotBase(BaseModel):
 class RobotCreate(RobotBase):
     pass
 
-class Robot(RobotBase):
+class RobotSummary(RobotBase):
     id: int
     last_updated: datetime
-    inventory_items: List[InventoryItem] = []
     class Config:
         from_attributes = True
 
+class Robot(RobotSummary):
+    inventory_items: List[InventoryItem] = []
+
+class PoseSample(BaseModel):
+    robot_id: int
+    current_pos_x: float
+    current_pos_y: float
+
+class PoseBatchResult(BaseModel):
+    accepted: int
+
+class RobotPose(BaseModel):
+    robot_id: int
+    current_pos_x: float
+    current_pos_y: float
+    last_updated: datetime
+
+class Trajectory(BaseModel):
+    robot_id: int
+    mode: str
+    t: List[float]      # unix seconds
+    x: List[float]
+    y: List[float]
+
 class RobotLogBase(BaseModel):
     message: str
     robot_id: int
@@ -67,10 +90,18 @@ class DeliveryRecordBase(BaseModel):
     dest_pos_y: Optional[float] = None
     
     confirmation_code: Optional[str] = None
+    recording_session_id: Optional[str] = None
 
 class DeliveryRecordCreate(DeliveryRecordBase):
     pass
 
+class RecordingSession(BaseModel):
+    recording_session_id: str
+
+class VideoUrlUpdate(BaseModel):
+    recording_session_id: str
+    video_url: str
+
 class DeliveryRecord(DeliveryRecordBase):
     id: int
     created_at: datetime
@@ -78,6 +109,67 @@ class DeliveryRecord(DeliveryRecordBase):
     class Config:
         from_attributes = True
         
+class SalesBucket(BaseModel):
+    hour: datetime
+    units: int
+    revenue: Optional[float] = None
+
+class ItemSales(BaseModel):
+    inventory_item_id: int
+    name: str
+    units: int
+    revenue: Optional[float] = None
+
+class OrdersPeriod(BaseModel):
+    robot_id: int
+    period: datetime
+    orders: int
+    units: int
+    revenue: float
+    delivered: int
+    canceled: int
+
+class DeliveryTimes(BaseModel):
+    robot_id: int
+    delivered: int
+    avg_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
+
+class SatisfactionBucket(BaseModel):
+    low: int            # percent, inclusive
+    high: int           # percent, exclusive (the last bucket includes 100)
+    responses: int
+
+class ItemDepletion(BaseModel):
+    inventory_item_id: int
+    name: str
+    stock: Optional[int] = None
+    units_sold: int
+    units_per_hour: float
+    hours_to_empty: Optional[float] = None
+
+class AnalyticsStatus(BaseModel):
+    last_refresh: Optional[datetime] = None
+    last_full_refresh: Optional[datetime] = None
+    pending_hours: int
+    refreshes: int
+    hours_rebuilt: int
+    full_skipped: int
+
+class CacheStatus(BaseModel):
+    enabled: bool
+    entries: int
+    max_entries: int
+    ttl_s: float
+    hits: int
+    misses: int
+    bypassed: int          # lookups while the cache was off (LISTEN down, TTL 0)
+    hit_rate: Optional[float] = None
+    not_modified: int
+    stores: int
+    invalidations: int
+    evictions: int
+
 class ControlCommand(BaseModel):
     robot_id: int
     command: str  # e.g., "forward", "backward", "left", "right", "stop"
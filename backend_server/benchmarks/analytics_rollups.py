@@ -0,0 +1,161 @@
+"""
+Analytics rollups: refresh cost and /analytics/* latency vs client-side scans.
+
+COPYs --orders synthetic delivery records (message 'bench') with order
+lines, statuses, delivery times and satisfaction results, spread over
+--days across the first 10 robots and 20 inventory items. The rows are
+committed and VACUUMed. Then it times:
+
+  scan         what a dashboard did before: page through GET /deliveryRecord/
+               (limit 5000) and count orders per robot per day client-side
+  full         analytics.refresh(db): every rollup rebuilt
+  incremental  analytics.refresh(db, {hour}): one dirty hour rebuilt
+  /analytics/* each route over the whole period, through the app
+
+The bench rows are deleted at the end and the rollups rebuilt. The NOTIFY
+trigger is disabled while they are written and deleted, which locks
+delivery_records for that time. Use a development database.
+
+    DATABASE_URL=postgresql://... python benchmarks/analytics_rollups.py --orders 1000000
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import analytics, database  # noqa: E402
+from app.main import app  # noqa: E402
+
+STATUSES = ["DELIVERIED"] * 7 + ["CANCELED", "WAITING", "IN_PROGRESS"]
+
+
+def seed(db, orders, days, robot_ids, item_ids):
+    rng = random.Random(0)
+    start = datetime.now() - timedelta(days=days)
+    first_id = db.execute(text("SELECT COALESCE(max(id), 0) + 1 FROM delivery_records")).scalar()
+    records, lines = io.StringIO(), io.StringIO()
+    for n in range(orders):
+        record_id = first_id + n
+        at = start + timedelta(seconds=rng.random() * days * 86400)
+        done = at + timedelta(seconds=rng.randint(60, 1800))
+        items = rng.sample(item_ids, rng.randint(1, min(4, len(item_ids))))
+        qtys = [rng.randint(1, 3) for _ in items]
+        score = f"{{'Happy': 3, 'Satisfaction': '{rng.uniform(0, 100):.1f}%'}}" if rng.random() < 0.3 else ""
+        records.write(
+            f'{record_id},{rng.choice(robot_ids)},bench,"{items}","{qtys}",{rng.choice(STATUSES)},'
+            f'"{score}",{at},{done}\n'
+        )
+        for item_id, qty in zip(items, qtys):
+            lines.write(f"{record_id},{item_id},{qty},1.00,{at}\n")
+    cursor = db.connection().connection.cursor()
+    records.seek(0)
+    cursor.copy_expert(
+        "COPY delivery_records (id, robot_id, message, inventory_ids, quantity, status, statisfied_level, "
+        "created_at, last_updated_at) FROM STDIN WITH (FORMAT csv)",
+        records,
+    )
+    lines.seek(0)
+    cursor.copy_expert(
+        "COPY order_items (delivery_record_id, inventory_item_id, quantity, unit_price, created_at) "
+        "FROM STDIN WITH (FORMAT csv)",
+        lines,
+    )
+    cursor.close()
+
+
+def vacuum():
+    with database.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE delivery_records"))
+        conn.execute(text("VACUUM ANALYZE order_items"))
+
+
+def cleanup(db):
+    db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+    db.execute(text("DELETE FROM delivery_records WHERE message = 'bench'"))     # order_items cascade
+    db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+    db.commit()
+    analytics.refresh(db)
+
+
+def client_side_scan(client):
+    counts, cursor, pages = Counter(), None, 0
+    while True:
+        params = {"limit": 5000, "fields": "robot_id,created_at"}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/deliveryRecord/", params=params)
+        r.raise_for_status()
+        for row in r.json():
+            counts[row["robot_id"], row["created_at"][:10]] += 1
+        pages += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return counts, pages
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    db = database.SessionLocal()
+    try:
+        robot_ids = db.execute(text("SELECT id FROM robots ORDER BY id LIMIT 10")).scalars().all()
+        item_ids = db.execute(text("SELECT id FROM inventory_items ORDER BY id LIMIT 20")).scalars().all()
+        if not robot_ids or not item_ids:
+            print("No robots or inventory items; run python -m app.admin seed first")
+            return 1
+        db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+        t0 = time.perf_counter()
+        seed(db, args.orders, args.days, robot_ids, item_ids)
+        db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+        db.commit()
+        vacuum()
+        print(f"seeded {args.orders:,} orders in {time.perf_counter() - t0:.1f} s")
+
+        ms, (_, pages) = timed(client_side_scan, client)
+        print(f"  scan          {ms:9.1f} ms  ({pages} pages of GET /deliveryRecord/)")
+        ms, _ = timed(analytics.refresh, db)
+        print(f"  full          {ms:9.1f} ms")
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        ms, _ = timed(analytics.refresh, db, {hour})
+        print(f"  incremental   {ms:9.1f} ms  (1 hour)")
+
+        since = (datetime.now() - timedelta(days=args.days + 1)).isoformat()
+        for path in (
+            f"/analytics/orders?granularity=day&since={since}",
+            f"/analytics/orders?granularity=hour&robot_id={robot_ids[0]}&since={since}",
+            f"/analytics/delivery-times?since={since}",
+            f"/analytics/satisfaction?since={since}",
+            "/analytics/depletion?window_hours=168",
+        ):
+            client.get(path).raise_for_status()
+            ms, r = timed(client.get, path)
+            print(f"  {ms:9.1f} ms  {len(r.json()):>6} rows  GET {path.split('since=')[0].rstrip('?&')}")
+    finally:
+        db.rollback()
+        cleanup(db)
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Closed-loop HTTP load test: p50/p99 latency and throughput of the hot endpoints.
+
+--concurrency asyncio workers each send one request at a time for
+--seconds, cycling through the endpoint mix below. Run it once against a
+server in each mode and compare:
+
+    uvicorn app.main:app --port 8000                  # sync routes, threadpool
+    DB_ASYNC=true uvicorn app.main:app --port 8001    # async routes, asyncpg
+
+    python benchmarks/api_load.py --url http://localhost:8000 --concurrency 200
+    python benchmarks/api_load.py --url http://localhost:8001 --concurrency 200
+
+Pool size, overflow, statement timeout and THREADPOOL_SIZE come from the
+server's environment (see README).
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+
+def endpoint_mix(robot_id):
+    return [
+        ("GET", f"/robots/{robot_id}", None),
+        ("GET", "/robots/", None),
+        ("GET", f"/robots/{robot_id}?include=inventory", None),
+        ("GET", f"/deliveryRecord/{robot_id}", None),
+        ("PUT", f"/robots/{robot_id}/position", {"current_pos_x": 1.0, "current_pos_y": 2.0}),
+    ]
+
+
+async def worker(client, requests, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        method, path, body = next(requests)
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, path, json=body)
+            statuses[r.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[int(p * (len(sorted_values) - 1))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--robot-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    args = parser.parse_args()
+
+    requests = itertools.cycle(endpoint_mix(args.robot_id))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        # Warm up connections and the server's pools, then measure
+        await asyncio.gather(*(
+            worker(client, requests, time.perf_counter() + args.warmup, [], Counter())
+            for _ in range(args.concurrency)
+        ))
+        latencies, statuses = [], Counter()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, requests, t0 + args.seconds, latencies, statuses)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    print(f"{args.url}: {args.concurrency} workers, {elapsed:.1f} s")
+    print(f"requests={len(latencies)} ({len(latencies) / elapsed:.0f} req/s)  statuses={dict(statuses)}")
+    if latencies:
+        print(f"latency p50={statistics.median(latencies) * 1000:.1f} ms "
+              f"p99={percentile(latencies, 0.99) * 1000:.1f} ms "
+              f"max={latencies[-1] * 1000:.1f} ms")
+    return 0 if ok == sum(statuses.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,90 @@
+"""
+Bulk import/export throughput: /bulk/logs vs one POST /logs/ per row.
+
+Generates --rows synthetic log rows for --robot-id and streams them to
+POST /bulk/logs/import as CSV and then as NDJSON, each a single COPY. It
+then streams them back out with GET /bulk/logs/export, and posts
+--baseline-rows rows one at a time to POST /logs/ for comparison. The
+client never holds the whole payload. Watch the server's RSS while it runs
+to see that its memory stays flat too.
+
+Run against a live server (uvicorn app.main:app):
+
+    python benchmarks/bulk_io.py --url http://localhost:8000 --rows 1000000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+BATCH = 10_000
+
+
+def rows(n, robot_id):
+    start = datetime(2025, 1, 1)
+    for i in range(n):
+        yield robot_id, f"bulk row {i}", start + timedelta(milliseconds=100 * i)
+
+
+def csv_body(n, robot_id):
+    yield b"robot_id,message,created_at\n"
+    batch = []
+    for robot_id, message, at in rows(n, robot_id):
+        batch.append(f'{robot_id},"{message}",{at.isoformat(" ")}\n')
+        if len(batch) == BATCH:
+            yield "".join(batch).encode()
+            batch = []
+    yield "".join(batch).encode()
+
+
+def ndjson_body(n, robot_id):
+    batch = []
+    for robot_id, message, at in rows(n, robot_id):
+        batch.append(json.dumps({"robot_id": robot_id, "message": message, "created_at": at.isoformat()}) + "\n")
+        if len(batch) == BATCH:
+            yield "".join(batch).encode()
+            batch = []
+    yield "".join(batch).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--robot-id", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=600) as client:
+        t0 = time.perf_counter()
+        for i in range(args.baseline_rows):
+            client.post("/logs/", json={"robot_id": args.robot_id, "message": f"row {i}"}).raise_for_status()
+        elapsed = time.perf_counter() - t0
+        print(f"POST /logs/ per row:  {args.baseline_rows / elapsed:>10,.0f} rows/s ({args.baseline_rows} rows)")
+
+        for fmt, body in (("csv", csv_body), ("ndjson", ndjson_body)):
+            t0 = time.perf_counter()
+            r = client.post(f"/bulk/logs/import?format={fmt}", content=body(args.rows, args.robot_id))
+            r.raise_for_status()
+            elapsed = time.perf_counter() - t0
+            print(f"import {fmt:<6}        {r.json()['rows'] / elapsed:>10,.0f} rows/s ({r.json()['rows']:,} rows)")
+
+        for fmt in ("csv", "ndjson"):
+            t0 = time.perf_counter()
+            lines = size = 0
+            with client.stream("GET", f"/bulk/logs/export?format={fmt}&robot_id={args.robot_id}") as r:
+                r.raise_for_status()
+                for chunk in r.iter_bytes():
+                    lines += chunk.count(b"\n")
+                    size += len(chunk)
+            elapsed = time.perf_counter() - t0
+            print(f"export {fmt:<6}        {lines / elapsed:>10,.0f} lines/s ({lines:,} lines, {size / 1e6:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Worker cold start: time from spawning uvicorn to the first 200 from GET /.
+
+Starts `uvicorn app.main:app` --runs times on a free port, polls / until it
+answers, and reports the spread. The server inherits this process's
+environment, so compare schema setup in the lifespan against setup run
+once on deploy:
+
+    DB_AUTO_SETUP=true python benchmarks/cold_start.py
+    python -m app.admin setup && python benchmarks/cold_start.py
+
+--app-dir points at another checkout (e.g. a `git worktree` of an older
+commit) to measure it with the same harness.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cold_start(app_dir, timeout):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--app-dir", app_dir, "--port", str(port)],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    t0 = time.perf_counter()
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return time.perf_counter() - t0
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout} s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    times = sorted(cold_start(args.app_dir, args.timeout) for _ in range(args.runs))
+    print(f"{args.app_dir} (DB_AUTO_SETUP={os.getenv('DB_AUTO_SETUP', 'false')}): {args.runs} runs")
+    print(f"cold start median={statistics.median(times) * 1000:.0f} ms "
+          f"min={times[0] * 1000:.0f} ms max={times[-1] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Confirmation code allocation: probing loop vs sequence + permutation.
+
+Fills a scratch table with open (WAITING) orders up to several fill ratios
+of the 6-digit space and times allocating a code and inserting the order
+both ways:
+
+  probe     random code + SELECT until unused (the old create_delivery_record loop)
+  sequence  app.confirmation_codes.next_confirmation_code(): one nextval() on
+            confirmation_code_seq + keyed permutation, checked by the partial
+            unique index on the INSERT (as delivery_records does)
+
+The open codes are the ones the sequence issued before its current value,
+as in a live table. The probing loop's round trips grow like 1 / (1 - fill);
+the sequence stays flat and never hits the index. The sequence advances by
+--n per fill ratio.
+
+    DATABASE_URL=postgresql://... python benchmarks/confirmation_codes.py
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.confirmation_codes import code_for, next_confirmation_code  # noqa: E402
+
+SPACE = 1_000_000
+
+
+def probe(conn, inserted):
+    probes = 0
+    while True:
+        probes += 1
+        code = f"{random.randint(0, 999999):06d}"
+        hit = conn.execute(
+            text("SELECT 1 FROM bench_codes WHERE code = :code AND status = 'WAITING' LIMIT 1"),
+            {"code": code},
+        ).first()
+        if not hit:
+            insert(conn, code)
+            inserted.append(code)
+            return probes
+
+
+def sequence(conn):
+    insert(conn, next_confirmation_code(conn))
+    return 1
+
+
+def insert(conn, code):
+    conn.execute(text("INSERT INTO bench_codes VALUES (:code, 'WAITING')"), {"code": code})
+
+
+def run(conn, fn, n):
+    times, probes = [], []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        probes.append(fn(conn))
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return statistics.mean(times), times[int(0.95 * (n - 1))], statistics.mean(probes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fills", default="0,0.5,0.9,0.99")
+    parser.add_argument("--n", type=int, default=300, help="allocations per method and fill ratio")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TEMP TABLE bench_codes (code varchar(6), status text)"))
+        conn.execute(text("CREATE UNIQUE INDEX ON bench_codes (code) WHERE status IN ('WAITING', 'IN_PROGRESS')"))
+        # Codes the sequence issued before now, most recent first
+        issued = conn.execute(text("SELECT nextval('confirmation_code_seq')")).scalar_one()
+
+        filled = 0
+        print(f"{'fill':>6} {'method':>9} {'mean ms':>8} {'p95 ms':>8} {'probes':>7}")
+        for fill in sorted(float(f) for f in args.fills.split(",")):
+            target = int(fill * SPACE)
+            if target > filled:
+                conn.execute(text("""
+                    INSERT INTO bench_codes
+                    SELECT code, 'WAITING' FROM unnest(CAST(:codes AS varchar[])) AS code
+                """), {"codes": [code_for(issued - k) for k in range(filled + 1, target + 1)]})
+                conn.execute(text("ANALYZE bench_codes"))
+                filled = target
+
+            probed = []
+            for name, fn in (("probe", lambda c: probe(c, probed)), ("sequence", sequence)):
+                mean, p95, probes = run(conn, fn, args.n)
+                print(f"{fill:>6.2f} {name:>9} {mean * 1000:>8.3f} {p95 * 1000:>8.3f} {probes:>7.1f}")
+                # The probe's random codes are removed again: a live table
+                # only holds codes the sequence issued
+                conn.execute(text("DELETE FROM bench_codes WHERE code = ANY(CAST(:codes AS varchar[]))"),
+                             {"codes": probed})
+                probed.clear()
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
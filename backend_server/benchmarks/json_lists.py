@@ -0,0 +1,157 @@
+"""
+List pages: ORM + response_model serialization vs the FAST_JSON path.
+
+Creates a robot named 'bench', COPYs --rows synthetic delivery records
+and as many robot logs for it, commits them, and for each page size in
+--sizes builds the body of GET /deliveryRecord/?robot_id= and
+GET /logs/?robot_id= both ways:
+
+  current   pagination.paginate() -> ORM objects, then FastAPI's own
+            serialize_response() for the route's response_model
+            (validation + Pydantic dump_json, as for a real request)
+  fast      pagination.paginate(..., schema) with FAST_JSON: Core row
+            tuples written with orjson
+
+Page sizes above MAX_LIMIT are not reachable over HTTP. They show how each
+path scales. Each timing is the best of --repeat runs. The two bodies are
+checked for the same JSON, and the script reports whether they are also
+byte-identical. The robot and its rows are deleted at the end, with the
+NOTIFY trigger disabled, which locks delivery_records for that time. Use a
+development database.
+
+    DATABASE_URL=postgresql://... python benchmarks/json_lists.py --rows 100000
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["FAST_JSON"] = "true"
+
+from fastapi import Response  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import database, models, schemas  # noqa: E402
+from app.pagination import PageParams, paginate  # noqa: E402
+from app.routers import deliveryRecord, logs  # noqa: E402
+
+ENDPOINTS = [
+    ("/deliveryRecord/", models.deliveryRecords, schemas.DeliveryRecord,
+     (models.deliveryRecords.created_at, models.deliveryRecords.id), models.deliveryRecords.robot_id),
+    ("/logs/", models.RobotLog, schemas.RobotLog,
+     (models.RobotLog.created_at, models.RobotLog.id), models.RobotLog.robot_id),
+]
+
+
+def seed(db, rows):
+    rng = random.Random(0)
+    robot_id = db.execute(text("INSERT INTO robots (name) VALUES ('bench') RETURNING id")).scalar()
+    start = datetime.now() - timedelta(days=30)
+    records, logs = io.StringIO(), io.StringIO()
+    for n in range(rows):
+        at = start + timedelta(seconds=rng.random() * 30 * 86400)
+        records.write(
+            f'{robot_id},bench,"{n} Main St",/recordings/{n}.mp4,"1, 4","2, 1",DELIVERIED,'
+            f'"{{\'Satisfaction\': \'{rng.uniform(0, 100):.1f}%\'}}",'
+            f"{rng.uniform(-50, 50):.4f},{rng.uniform(-50, 50):.4f},{rng.uniform(-50, 50):.4f},"
+            f"{rng.uniform(-50, 50):.4f},,{at},{at + timedelta(minutes=9)}\n"
+        )
+        logs.write(f"{robot_id},bench,{at}\n")
+    cursor = db.connection().connection.cursor()
+    records.seek(0)
+    cursor.copy_expert(
+        "COPY delivery_records (robot_id, message, address, videourl, inventory_ids, quantity, status, "
+        "statisfied_level, start_pos_x, start_pos_y, dest_pos_x, dest_pos_y, confirmation_code, created_at, "
+        "last_updated_at) FROM STDIN WITH (FORMAT csv)",
+        records,
+    )
+    logs.seek(0)
+    cursor.copy_expert("COPY robot_logs (robot_id, message, created_at) FROM STDIN WITH (FORMAT csv)", logs)
+    cursor.close()
+    return robot_id
+
+
+def cleanup(db):
+    bench = "(SELECT id FROM robots WHERE name = 'bench')"
+    db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+    db.execute(text(f"DELETE FROM delivery_records WHERE robot_id IN {bench}"))
+    db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+    db.execute(text(f"DELETE FROM robot_logs WHERE robot_id IN {bench}"))
+    db.execute(text("DELETE FROM robots WHERE name = 'bench'"))
+    db.commit()
+
+
+def response_field(path):
+    for route in deliveryRecord.router.routes + logs.router.routes:
+        if isinstance(route, APIRoute) and route.path == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def current(db, path, model, sort_cols, filters, size) -> bytes:
+    page = PageParams(limit=size, cursor=None, order="asc", fields=None)
+    rows = paginate(db, model, sort_cols, filters, page, Response())
+    return asyncio.run(serialize_response(field=response_field(path), response_content=rows, dump_json=True))
+
+
+def fast(db, model, schema, sort_cols, filters, size) -> bytes:
+    page = PageParams(limit=size, cursor=None, order="asc", fields=None)
+    return paginate(db, model, sort_cols, filters, page, Response(), schema).body
+
+
+def best_ms(repeat, fn, *args):
+    best, result = None, None
+    for _ in range(repeat):
+        db = args[0]
+        db.expunge_all()
+        t0 = time.perf_counter()
+        result = fn(*args)
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    db = database.SessionLocal()
+    try:
+        db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+        robot_id = seed(db, max(args.rows, max(sizes)))
+        db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+        db.commit()
+        db.execute(text("ANALYZE delivery_records"))
+        db.execute(text("ANALYZE robot_logs"))
+        db.commit()
+
+        for path, model, schema, sort_cols, robot_column in ENDPOINTS:
+            filters = [robot_column == robot_id]
+            for size in sizes:
+                ms_current, body_current = best_ms(args.repeat, current, db, path, model, sort_cols, filters, size)
+                ms_fast, body_fast = best_ms(args.repeat, fast, db, model, schema, sort_cols, filters, size)
+                assert json.loads(body_current) == json.loads(body_fast), path
+                same = "identical" if body_current == body_fast else "same JSON"
+                print(f"GET {path:<17} {size:>7,} rows {len(body_fast) / 2**20:7.2f} MiB  current {ms_current:8.1f} ms"
+                      f"  fast {ms_fast:7.1f} ms  {ms_current / ms_fast:4.1f}x  ({same})")
+    finally:
+        db.rollback()
+        cleanup(db)
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Fan-out latency of the /live WebSocket with many viewers.
+
+Opens --clients WebSocket connections to /live/ws, waits for every
+snapshot, then moves a robot --updates times with PUT /robots/{id}/position.
+Each PUT is one UPDATE, and its NOTIFY reaches all viewers through the
+server's single LISTEN connection. Reports the PUT -> delta latency seen
+by the viewers. With polling, the same viewers would cost --clients
+queries per polling interval.
+
+Run against a live server (uvicorn app.main:app):
+
+    python benchmarks/live_fanout.py --url http://localhost:8000 --clients 200 --updates 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import httpx
+import websockets
+
+
+async def viewer(url, robot_id, ready, sent, latencies, expected):
+    async with websockets.connect(f"{url}/live/ws?robot_id={robot_id}", max_size=None) as ws:
+        snapshot = json.loads(await ws.recv())
+        assert snapshot["type"] == "snapshot"
+        ready.release()
+        seen = 0
+        while seen < expected:
+            event = json.loads(await ws.recv())
+            if event["type"] != "robot":
+                continue
+            x = round(float(event["data"]["current_pos_x"]), 4)
+            if x in sent:
+                latencies.append(time.perf_counter() - sent[x])
+                seen += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--robot-id", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between updates")
+    args = parser.parse_args()
+
+    ws_url = args.url.replace("http", "ws", 1)
+    ready = asyncio.Semaphore(0)
+    sent, latencies = {}, []
+    viewers = [
+        asyncio.ensure_future(viewer(ws_url, args.robot_id, ready, sent, latencies, args.updates))
+        for _ in range(args.clients)
+    ]
+    t0 = time.perf_counter()
+
+    async def all_ready():
+        for _ in range(args.clients):
+            await ready.acquire()
+
+    await asyncio.wait_for(all_ready(), timeout=60)
+    print(f"{args.clients} viewers subscribed in {time.perf_counter() - t0:.2f} s")
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=10) as client:
+        for i in range(args.updates):
+            x = round(1000 + i * 0.125, 4)
+            sent[x] = time.perf_counter()
+            r = await client.put(f"/robots/{args.robot_id}/position", json={"current_pos_x": x, "current_pos_y": 0})
+            r.raise_for_status()
+            await asyncio.sleep(args.interval)
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*viewers), timeout=30)
+    except asyncio.TimeoutError:
+        pass
+
+    expected = args.clients * args.updates
+    latencies.sort()
+    print(f"deltas received {len(latencies)}/{expected}")
+    if latencies:
+        print(f"PUT -> delta latency p50={statistics.median(latencies) * 1000:.1f} ms "
+              f"p95={latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms "
+              f"max={latencies[-1] * 1000:.1f} ms")
+    return 0 if len(latencies) == expected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
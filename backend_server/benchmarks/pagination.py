@@ -0,0 +1,126 @@
+"""
+GET /logs/ with a million rows: unbounded list vs keyset pages.
+
+Seeds robot_logs with --rows synthetic entries (message 'bench-pagination',
+created_at spread over the last year), makes sure the composite indexes
+from models.py exist, then times through the real app (TestClient):
+
+  legacy    the old endpoint body: query(...).all() serialised as one list
+  first     first keyset page
+  deep      keyset page ~90% into the table (cursor)
+  offset    the same depth with LIMIT/OFFSET, for comparison
+  filtered  robot_id + time range page
+  sparse    first page with ?fields=id,created_at
+
+    DATABASE_URL=postgresql://... python benchmarks/pagination.py --rows 1000000
+    DATABASE_URL=postgresql://... python benchmarks/pagination.py --cleanup
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import database, models, schemas  # noqa: E402
+from app.main import app  # noqa: E402
+from app.pagination import encode_cursor  # noqa: E402
+
+TAG = "bench-pagination"
+
+
+def seed(rows):
+    with database.engine.begin() as conn:
+        have = conn.execute(text("SELECT count(*) FROM robot_logs WHERE message = :m"), {"m": TAG}).scalar()
+        if have >= rows:
+            return
+        robot_ids = conn.execute(text("SELECT id FROM robots ORDER BY id")).scalars().all()
+        print(f"Seeding {rows - have} rows ...")
+        conn.execute(text("""
+            INSERT INTO robot_logs (robot_id, message, created_at)
+            SELECT (CAST(:robots AS integer[]))[1 + g % cardinality(CAST(:robots AS integer[]))],
+                   :m,
+                   now() - interval '365 days' * random()
+            FROM generate_series(1, :n) g
+        """), {"robots": robot_ids, "m": TAG, "n": rows - have})
+    for index in models.RobotLog.__table__.indexes:
+        index.create(database.engine, checkfirst=True)
+    with database.engine.begin() as conn:
+        conn.execute(text("ANALYZE robot_logs"))
+
+
+def timed(label, fn, repeat=5):
+    best, size = None, 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    print(f"{label:>9}: {best * 1000:9.1f} ms  {size / 1024:10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--cleanup", action="store_true", help="delete the seeded rows and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        with database.engine.begin() as conn:
+            n = conn.execute(text("DELETE FROM robot_logs WHERE message = :m"), {"m": TAG}).rowcount
+        print(f"Deleted {n} rows.")
+        return
+
+    seed(args.rows)
+    client = TestClient(app)
+
+    with database.engine.connect() as conn:
+        total = conn.execute(text("SELECT count(*) FROM robot_logs")).scalar()
+        depth = int(total * 0.9)
+        deep_key = conn.execute(
+            text("SELECT created_at, id FROM robot_logs ORDER BY created_at, id OFFSET :d LIMIT 1"), {"d": depth}
+        ).one()
+        robot_id = conn.execute(text("SELECT min(robot_id) FROM robot_logs")).scalar()
+        since = conn.execute(text("SELECT now() - interval '30 days'")).scalar()
+
+    print(f"robot_logs: {total} rows, page size {args.limit}")
+
+    def legacy():
+        db = database.SessionLocal()
+        try:
+            rows = db.query(models.RobotLog).all()
+            return len(TypeAdapter(list[schemas.RobotLog]).dump_json(rows))
+        finally:
+            db.close()
+
+    def get(params):
+        r = client.get("/logs/", params=params)
+        r.raise_for_status()
+        return len(r.content)
+
+    def offset():
+        db = database.SessionLocal()
+        try:
+            rows = (db.query(models.RobotLog)
+                    .order_by(models.RobotLog.created_at, models.RobotLog.id)
+                    .offset(depth).limit(args.limit).all())
+            return len(TypeAdapter(list[schemas.RobotLog]).dump_json(rows))
+        finally:
+            db.close()
+
+    timed("legacy", legacy, repeat=1)
+    timed("first", lambda: get({"limit": args.limit}))
+    timed("deep", lambda: get({"limit": args.limit, "cursor": encode_cursor(deep_key)}))
+    timed("offset", offset)
+    timed("filtered", lambda: get({"limit": args.limit, "robot_id": robot_id, "since": since.isoformat()}))
+    timed("sparse", lambda: get({"limit": args.limit, "fields": "id,created_at"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Pose history: COPY ingestion and downsampled trajectory queries.
+
+Ingestion: writes --ingest samples with pose_history.copy_samples (one
+COPY, the flush path) and with executemany INSERT for comparison.
+
+Queries: seeds --rows samples for a scratch robot id (one 10 Hz day by
+default, a wandering path with stops), then times GET
+/robots/{id}/trajectory through the real app for each mode and format:
+
+  raw     every sample
+  bucket  --points fixed-width buckets averaged in SQL
+  lttb    --points LTTB-selected samples
+
+    DATABASE_URL=postgresql://... python benchmarks/pose_history.py --rows 864000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import database, pose_history  # noqa: E402
+from app.main import app  # noqa: E402
+
+BENCH_ROBOT = -16       # not a real robot; the history table has no FK
+
+
+def path(n, start, hz):
+    """Random walk with heading changes and occasional stops."""
+    rng = random.Random(0)
+    x = y = heading = 0.0
+    stop = 0
+    for i in range(n):
+        if stop:
+            stop -= 1
+        else:
+            if rng.random() < 0.0005:
+                stop = rng.randint(50, 3000)
+            heading += rng.gauss(0, 0.05)
+            x += 0.05 * math.cos(heading)
+            y += 0.05 * math.sin(heading)
+        yield BENCH_ROBOT, start + timedelta(seconds=i / hz), x, y
+
+
+def cleanup():
+    with database.engine.begin() as conn:
+        conn.execute(text("DELETE FROM robot_pose_history WHERE robot_id = :r"), {"r": BENCH_ROBOT})
+
+
+def ingest(n):
+    samples = list(path(n, datetime.now() - timedelta(minutes=10), 100))
+    db = database.SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        pose_history.copy_samples(db, samples)
+        copy_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        db.execute(
+            text("INSERT INTO robot_pose_history (robot_id, recorded_at, x, y) VALUES (:r, :t, :x, :y)"),
+            [{"r": r, "t": t, "x": x, "y": y} for r, t, x, y in samples],
+        )
+        db.commit()
+        insert_s = time.perf_counter() - t0
+    finally:
+        db.close()
+    cleanup()
+    print(f"ingest {n} samples: COPY {n / copy_s:,.0f} rows/s, executemany INSERT {n / insert_s:,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=864_000)
+    parser.add_argument("--hz", type=float, default=10.0)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--ingest", type=int, default=50_000)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    cleanup()
+    ingest(args.ingest)
+
+    start = datetime.now().replace(microsecond=0) - timedelta(seconds=args.rows / args.hz + 60)
+    samples = list(path(args.rows, start, args.hz))
+    db = database.SessionLocal()
+    try:
+        for i in range(0, len(samples), 100_000):
+            pose_history.copy_samples(db, samples[i:i + 100_000])
+        db.execute(text("ANALYZE robot_pose_history"))
+        db.commit()
+    finally:
+        db.close()
+
+    since, until = samples[0][1], samples[-1][1] + timedelta(seconds=1)
+    print(f"{args.rows} samples over {(until - since).total_seconds() / 3600:.1f} h, target {args.points} points")
+    print(f"{'mode':>7} {'format':>7} {'ms':>9} {'points':>8} {'KiB':>9}")
+    try:
+        for mode in ("raw", "bucket", "lttb"):
+            for fmt in ("json", "binary"):
+                params = {"since": since.isoformat(), "until": until.isoformat(),
+                          "points": args.points, "mode": mode, "format": fmt}
+                best = None
+                for _ in range(1 if mode == "raw" else 3):
+                    t0 = time.perf_counter()
+                    r = client.get(f"/robots/{BENCH_ROBOT}/trajectory", params=params)
+                    r.raise_for_status()
+                    dt = time.perf_counter() - t0
+                    best = dt if best is None else min(best, dt)
+                if fmt == "json":
+                    count = len(r.json()["t"])
+                else:
+                    count = int.from_bytes(r.content[4:8], "little")
+                print(f"{mode:>7} {fmt:>7} {best * 1000:>9.1f} {count:>8} {len(r.content) / 1024:>9.1f}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Database write load of robot position reports vs report rate.
+
+Streams pose samples for --robots robots at several rates over the
+/robots/positions/ws WebSocket, through the real app with its lifespan
+(so the background flusher runs), and counts the UPDATE statements that
+reach the database. With coalescing, the statement count is set by
+POSE_FLUSH_INTERVAL_S and not by the report rate. Each PUT
+/robots/{id}/position costs one UPDATE plus a commit per sample.
+
+    DATABASE_URL=postgresql://... python benchmarks/pose_ingest.py --rates 1,10,100 --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("POSE_FLUSH_INTERVAL_S", "1.0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from app.pose_buffer import POSE_FLUSH_INTERVAL_S, pose_buffer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=5, help="uses the first N existing robots")
+    parser.add_argument("--rates", default="1,10,100", help="reports per second per robot")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with database.engine.connect() as conn:
+        robot_ids = conn.execute(text("SELECT id FROM robots ORDER BY id LIMIT :n"), {"n": args.robots}).scalars().all()
+
+    updates = []
+    event.listen(database.engine, "before_cursor_execute",
+                 lambda conn, cur, statement, *a: updates.append(1) if "UPDATE robots" in statement else None)
+
+    print(f"{len(robot_ids)} robots, flush every {POSE_FLUSH_INTERVAL_S} s, {args.seconds} s per rate")
+    print(f"{'rate Hz':>8} {'samples':>8} {'UPDATEs':>8} {'rows':>6} {'legacy UPDATEs':>15}")
+    with TestClient(app) as client, client.websocket_connect("/robots/positions/ws") as ws:
+        for rate in (float(r) for r in args.rates.split(",")):
+            updates.clear()
+            rows_before = pose_buffer.rows_written
+            sent = 0
+            t0 = time.perf_counter()
+            tick = 0
+            while time.perf_counter() - t0 < args.seconds:
+                ws.send_json([
+                    {"robot_id": rid, "current_pos_x": tick * 0.01, "current_pos_y": rid}
+                    for rid in robot_ids
+                ])
+                sent += len(robot_ids)
+                tick += 1
+                time.sleep(max(0.0, t0 + tick / rate - time.perf_counter()))
+            time.sleep(POSE_FLUSH_INTERVAL_S * 1.5)      # let the last flush land
+            print(f"{rate:>8g} {sent:>8} {len(updates):>8} {pose_buffer.rows_written - rows_before:>6} {sent:>15}")
+
+        state = client.get("/robots/positions").json()
+    print(f"in-memory poses: {len(state)} robots")
+
+
+if __name__ == "__main__":
+    main()
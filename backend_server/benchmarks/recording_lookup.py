@@ -0,0 +1,100 @@
+"""
+Stop-record lookups: delivery record by recording session id or video path.
+
+Inside one transaction that is rolled back at the end, COPYs --rows
+synthetic delivery_records and then times the lookups behind
+POST /deliveryRecord/updateVideoURL (by recording_session_id) and
+/updateSatistifiedResult (by videourl). Each lookup is timed with its
+index and with index scans disabled, which is the sequential scan the
+old `videourl == text` lookup did on an unindexed column.
+
+The NOTIFY trigger is disabled for the transaction, which locks
+delivery_records until the script ends. Use a development database.
+
+    DATABASE_URL=postgresql://... python benchmarks/recording_lookup.py --rows 1000000
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import crud, database, models  # noqa: E402
+
+
+def seed(db, n):
+    buf = io.StringIO()
+    for i in range(n):
+        buf.write(f"bench,,{uuid.uuid4().hex},/recordings/transaction{i}.mp4\n")
+    buf.seek(0)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        "COPY delivery_records (message, robot_id, recording_session_id, videourl) FROM STDIN WITH (FORMAT csv)", buf
+    )
+    cursor.close()
+    db.execute(text("ANALYZE delivery_records"))
+
+
+def by_videourl(db, video_url):
+    return (db.query(models.deliveryRecords)
+            .filter(models.deliveryRecords.videourl == video_url)
+            .order_by(models.deliveryRecords.id.desc())
+            .first())
+
+
+def timed(db, lookup, keys):
+    t0 = time.perf_counter()
+    for key in keys:
+        assert lookup(db, key) is not None
+    return (time.perf_counter() - t0) / len(keys) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+        t0 = time.perf_counter()
+        seed(db, args.rows)
+        print(f"seeded {args.rows:,} rows in {time.perf_counter() - t0:.1f} s")
+
+        rows = db.execute(text(
+            "SELECT recording_session_id, videourl FROM delivery_records WHERE message = 'bench'"
+        )).all()
+        sample = random.Random(0).sample(rows, args.lookups)
+        sessions = [r[0] for r in sample]
+        paths = [r[1] for r in sample]
+
+        results = {}
+        for label, lookup, keys in (
+            ("recording_session_id", crud.get_delivery_record_by_recording_session, sessions),
+            ("videourl", by_videourl, paths),
+        ):
+            results[label, "index"] = timed(db, lookup, keys)
+            db.execute(text("SET LOCAL enable_indexscan = off"))
+            db.execute(text("SET LOCAL enable_bitmapscan = off"))
+            results[label, "seq scan"] = timed(db, lookup, keys[:max(1, args.lookups // 20)])
+            db.execute(text("SET LOCAL enable_indexscan = on"))
+            db.execute(text("SET LOCAL enable_bitmapscan = on"))
+
+        for (label, mode), ms in results.items():
+            print(f"{label:>22} {mode:<9} {ms:9.3f} ms/lookup")
+    finally:
+        db.rollback()
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
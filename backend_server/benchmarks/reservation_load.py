@@ -0,0 +1,100 @@
+"""
+Concurrency load test for inventory reservation on POST /deliveryRecord/.
+
+Creates two fresh inventory items, then fires many orders for both of them
+from a pool of workers at once and checks that the books balance:
+
+  - every accepted order decremented both items exactly once
+  - no item went below zero
+  - the number of accepted orders is exactly what the stock allows,
+    everything else was rejected with 409
+
+Run against a live server (uvicorn app.main:app):
+
+    python benchmarks/reservation_load.py --url http://localhost:8000 --workers 32 --orders 400
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def create_item(client, name, quantity):
+    r = client.post("/inventory/", json={"name": name, "price": 1.0, "quantity": quantity, "category": "loadtest"})
+    r.raise_for_status()
+    return r.json()["id"]
+
+
+def quantities(client, ids):
+    items = {item["id"]: item["quantity"] for item in client.get("/inventory/").json()}
+    return [items[i] for i in ids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--robot-id", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=400)
+    parser.add_argument("--stock", type=int, default=300, help="initial quantity of each test item")
+    parser.add_argument("--qty", default="2,3", help="quantity ordered of each item per order")
+    args = parser.parse_args()
+
+    qty = [int(q) for q in args.qty.split(",")]
+    tag = uuid.uuid4().hex[:8]
+
+    with httpx.Client(base_url=args.url, timeout=30) as client:
+        ids = [create_item(client, f"loadtest-{tag}-{i}", args.stock) for i in range(len(qty))]
+
+        order = {
+            "robot_id": args.robot_id,
+            "message": f"loadtest {tag}",
+            "address": "loadtest",
+            "inventory_ids": str(ids),          # "[12, 13]", like the mobile app
+            "quantity": str(qty),
+            "status": "WAITING",
+        }
+
+        def place(_):
+            t0 = time.perf_counter()
+            r = client.post("/deliveryRecord/", json=order)
+            return r.status_code, time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(place, range(args.orders)))
+        elapsed = time.perf_counter() - t0
+
+        final = quantities(client, ids)
+
+    codes = [code for code, _ in results]
+    latencies = sorted(t for _, t in results)
+    accepted = codes.count(200)
+    rejected = codes.count(409)
+    other = len(codes) - accepted - rejected
+    expected = min(args.orders, min(args.stock // q for q in qty))
+
+    print(f"{args.orders} orders, {args.workers} workers: {elapsed:.2f} s ({args.orders / elapsed:.0f} req/s)")
+    print(f"latency p50={statistics.median(latencies) * 1000:.1f} ms "
+          f"p95={latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms "
+          f"max={latencies[-1] * 1000:.1f} ms")
+    print(f"accepted={accepted} rejected(409)={rejected} other={other}; expected accepted={expected}")
+    print(f"final quantities {final} (started at {args.stock})")
+
+    ok = (
+        other == 0
+        and accepted == expected
+        and all(f == args.stock - accepted * q for f, q in zip(final, qty))
+        and all(f >= 0 for f in final)
+    )
+    print("OK" if ok else "FAILED: inventory totals do not balance")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+GET /inventory/ and GET /robots/ with and without the response cache.
+
+Inserts --items inventory items (category 'bench') spread over the robots,
+starts the app with its lifespan (LISTEN, cache invalidation) and times
+--requests calls of each route:
+
+  uncached   the cache turned off (TTL 0): query + Pydantic + JSON per call
+  cached     served from app/response_cache.py
+  304        cached, with If-None-Match of the current ETag
+
+It then measures how long an UPDATE to one item takes to invalidate the
+cached pages (commit -> NOTIFY -> entry dropped), and prints the cache's
+hit-rate counters. The bench items are deleted at the end. Use a
+development database.
+
+    DATABASE_URL=postgresql://... python benchmarks/response_cache.py --items 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from app.response_cache import response_cache  # noqa: E402
+
+
+def seed(db, items):
+    robot_ids = db.execute(text("SELECT id FROM robots ORDER BY id")).scalars().all()
+    db.execute(text(
+        "INSERT INTO inventory_items (name, price, quantity, category, robot_id) "
+        "SELECT 'bench-' || n, 1.0, 100, 'bench', (CAST(:robots AS int[]))[1 + n % cardinality(CAST(:robots AS int[]))] "
+        "FROM generate_series(1, :items) AS n"
+    ), {"robots": robot_ids, "items": items})
+    db.commit()
+
+
+def cleanup(db):
+    db.execute(text("DELETE FROM inventory_items WHERE category = 'bench'"))
+    db.commit()
+
+
+def per_request_ms(client, path, params, n, headers=None, status=200):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == status, r.status_code
+    return (time.perf_counter() - t0) / n * 1000, r
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        if not db.execute(text("SELECT count(*) FROM robots")).scalar():
+            print("No robots; run python -m app.admin seed first")
+            return 1
+        seed(db, args.items)
+
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 10
+            while not response_cache.enabled and time.monotonic() < deadline:
+                time.sleep(0.05)
+            if not response_cache.enabled:
+                print("Response cache did not start (is LISTEN working?)")
+                return 1
+
+            routes = [
+                ("/inventory/", {"limit": 500}),
+                ("/inventory/", {"limit": 5000, "category": "bench"}),
+                ("/robots/", {}),
+                ("/robots/", {"include": "inventory"}),
+            ]
+            ttl = response_cache.ttl
+            for path, params in routes:
+                response_cache.ttl = 0
+                uncached, r = per_request_ms(client, path, params, args.requests)
+                response_cache.ttl = ttl
+                client.get(path, params=params)
+                cached, r = per_request_ms(client, path, params, args.requests)
+                assert r.headers["X-Cache"] == "HIT"
+                not_modified, _ = per_request_ms(
+                    client, path, params, args.requests, headers={"If-None-Match": r.headers["ETag"]}, status=304,
+                )
+                label = f"GET {path}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+                print(f"{label:<42} {len(r.content) / 1024:8.1f} KiB  uncached {uncached:7.2f} ms"
+                      f"  cached {cached:6.2f} ms  304 {not_modified:6.2f} ms")
+
+            # Invalidation latency: commit of an UPDATE -> the cached page is gone
+            path, params = routes[0]
+            item_id = client.get(path, params=params).json()[0]["id"]
+            assert client.get(path, params=params).headers["X-Cache"] == "HIT"
+            t0 = time.perf_counter()
+            db.execute(text("UPDATE inventory_items SET quantity = quantity + 1 WHERE id = :id"), {"id": item_id})
+            db.commit()
+            t_commit = time.perf_counter()
+            while client.get(path, params=params).headers["X-Cache"] == "HIT":
+                time.sleep(0.0005)
+            print(f"invalidation: commit {1000 * (t_commit - t0):.2f} ms, "
+                  f"then {1000 * (time.perf_counter() - t_commit):.2f} ms until a request missed")
+            db.execute(text("UPDATE inventory_items SET quantity = quantity - 1 WHERE id = :id"), {"id": item_id})
+            db.commit()
+
+            print(client.get("/cache/status").json())
+    finally:
+        db.rollback()
+        cleanup(db)
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+SQL statement counts for the /robots endpoints.
+
+Creates --robots robots with --items inventory items each, then calls every
+robot endpoint through the real app (TestClient) and counts the statements
+sent to the database. The counts must not depend on how many robots or
+items exist:
+
+  GET /robots/                              1   (robots)
+  GET /robots/?include=inventory            2   (robots + one IN query for items)
+  GET /robots/{id}                          1   (primary-key lookup)
+  GET /robots/{id}?include=inventory        2
+  PUT /robots/{id}/position                 1   (UPDATE ... RETURNING)
+
+Also times GET /robots/{id} against the old load-every-robot-and-scan body.
+Exits non-zero if any count is off.
+
+    DATABASE_URL=postgresql://... python benchmarks/robot_query_counts.py --robots 200 --items 10
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app import database, models  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements.clear()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def seed(n_robots, n_items, tag):
+    with database.engine.begin() as conn:
+        robot_ids = conn.execute(text("""
+            INSERT INTO robots (name, status, battery_level, current_pos_x, current_pos_y)
+            SELECT :tag || '-' || g, 'idle', 100, 0, 0 FROM generate_series(1, :n) g
+            RETURNING id
+        """), {"tag": tag, "n": n_robots}).scalars().all()
+        conn.execute(text("""
+            INSERT INTO inventory_items (name, price, quantity, category, robot_id)
+            SELECT :tag || '-item', 1.0, 10, 'bench', r
+            FROM unnest(CAST(:ids AS integer[])) r, generate_series(1, :k)
+        """), {"tag": tag, "ids": robot_ids, "k": n_items})
+    return robot_ids
+
+
+def cleanup(tag):
+    with database.engine.begin() as conn:
+        conn.execute(text("DELETE FROM inventory_items WHERE name = :n"), {"n": f"{tag}-item"})
+        conn.execute(text("DELETE FROM robots WHERE name LIKE :p"), {"p": f"{tag}-%"})
+
+
+def legacy_get(robot_id):
+    """The old GET /robots/{id}: load every robot (and lazily its items), scan for the id."""
+    db = database.SessionLocal()
+    try:
+        for robot in db.query(models.Robot).all():
+            robot.inventory_items
+            if robot.id == robot_id:
+                return robot
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=200)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tag = f"bench-robots-{uuid.uuid4().hex[:8]}"
+    robot_ids = seed(args.robots, args.items, tag)
+    target = robot_ids[len(robot_ids) // 2]
+    client = TestClient(app)
+    counter = StatementCounter(database.engine)
+    failures = 0
+
+    try:
+        client.get("/robots/1")     # open the pooled connection outside the counts
+
+        cases = [
+            ("GET", "/robots/", None, 1),
+            ("GET", "/robots/?include=inventory", None, 2),
+            ("GET", f"/robots/{target}", None, 1),
+            ("GET", f"/robots/{target}?include=inventory", None, 2),
+            ("PUT", f"/robots/{target}/position", {"current_pos_x": 1.0, "current_pos_y": 2.0}, 1),
+        ]
+        for method, url, body, expected in cases:
+            with counter:
+                r = client.request(method, url, json=body)
+            r.raise_for_status()
+            got = len(counter.statements)
+            ok = got == expected
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':>4}  {method} {url:<40} {got} statement(s), expected {expected}")
+            if not ok:
+                for s in counter.statements:
+                    print("        " + " ".join(s.split())[:100])
+
+        with_items = client.get(f"/robots/{target}?include=inventory").json()
+        if len(with_items["inventory_items"]) != args.items:
+            failures += 1
+            print(f"FAIL  expected {args.items} inventory items, got {len(with_items['inventory_items'])}")
+        if "inventory_items" in client.get(f"/robots/{target}").json():
+            failures += 1
+            print("FAIL  inventory_items returned without ?include=inventory")
+
+        for label, fn in (
+            ("legacy", lambda: legacy_get(target)),
+            ("pk", lambda: client.get(f"/robots/{target}").raise_for_status()),
+            ("pk+items", lambda: client.get(f"/robots/{target}?include=inventory").raise_for_status()),
+        ):
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                fn()
+            print(f"{label:>9}: {(time.perf_counter() - t0) / args.repeat * 1000:8.2f} ms  "
+                  f"GET one robot of {len(robot_ids)}")
+    finally:
+        cleanup(tag)
+
+    print("OK" if not failures else f"FAILED: {failures} check(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
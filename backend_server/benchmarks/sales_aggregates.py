@@ -0,0 +1,142 @@
+"""
+Units of an item sold per hour: order_items index vs parsing the strings.
+
+COPYs --orders synthetic delivery records (message 'bench') spread over
+--days, each with 1-4 lines over the first 20 inventory items. Every line
+is written twice: as the old comma-separated strings and as order_items
+rows. The rows are committed and VACUUMed so that index-only scans work
+as they would on a live table. Then it times three queries:
+
+  strings     read inventory_ids / quantity / created_at for the window,
+              parse and aggregate in Python (the only way before order_items)
+  hourly      sales.item_sales_by_hour, GROUP BY over the covering index
+  top         sales.top_items over the same window
+
+The bench rows are deleted at the end. The NOTIFY trigger is disabled
+while they are written and deleted, which locks delivery_records for that
+time. Use a development database.
+
+    DATABASE_URL=postgresql://... python benchmarks/sales_aggregates.py --orders 1000000
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import crud, database, sales  # noqa: E402
+
+
+def seed(db, orders, days, item_ids):
+    rng = random.Random(0)
+    start = datetime.now() - timedelta(days=days)
+    first_id = db.execute(text("SELECT COALESCE(max(id), 0) + 1 FROM delivery_records")).scalar()
+    records, lines = io.StringIO(), io.StringIO()
+    for n in range(orders):
+        record_id = first_id + n
+        at = start + timedelta(seconds=rng.random() * days * 86400)
+        items = rng.sample(item_ids, rng.randint(1, min(4, len(item_ids))))
+        qtys = [rng.randint(1, 3) for _ in items]
+        records.write(f'{record_id},bench,"{items}","{qtys}",DELIVERIED,{at}\n')
+        for item_id, qty in zip(items, qtys):
+            lines.write(f"{record_id},{item_id},{qty},1.00,{at}\n")
+    cursor = db.connection().connection.cursor()
+    records.seek(0)
+    cursor.copy_expert(
+        "COPY delivery_records (id, message, inventory_ids, quantity, status, created_at) FROM STDIN WITH (FORMAT csv)",
+        records,
+    )
+    lines.seek(0)
+    cursor.copy_expert(
+        "COPY order_items (delivery_record_id, inventory_item_id, quantity, unit_price, created_at) "
+        "FROM STDIN WITH (FORMAT csv)",
+        lines,
+    )
+    cursor.close()
+
+
+def vacuum():
+    with database.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE delivery_records"))
+        conn.execute(text("VACUUM ANALYZE order_items"))
+
+
+def cleanup(db):
+    db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+    db.execute(text("DELETE FROM delivery_records WHERE message = 'bench'"))     # order_items cascade
+    db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+    db.commit()
+
+
+def from_strings(db, item_id, since, until):
+    units = Counter()
+    rows = db.execute(text(
+        "SELECT inventory_ids, quantity, created_at FROM delivery_records "
+        "WHERE created_at >= :since AND created_at < :until"
+    ), {"since": since, "until": until})
+    for inventory_ids, quantity, created_at in rows:
+        try:
+            lines = crud.parse_order_lines(inventory_ids, quantity)
+        except crud.InvalidOrderError:
+            continue
+        if item_id in lines:
+            units[created_at.replace(minute=0, second=0, microsecond=0)] += lines[item_id]
+    return sorted(units.items())
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--window-days", type=int, default=7)
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        item_ids = db.execute(text("SELECT id FROM inventory_items ORDER BY id LIMIT 20")).scalars().all()
+        if not item_ids:
+            print("No inventory items; run python -m app.admin seed first")
+            return 1
+        db.execute(text("ALTER TABLE delivery_records DISABLE TRIGGER delivery_insert_trigger"))
+        t0 = time.perf_counter()
+        seed(db, args.orders, args.days, item_ids)
+        db.execute(text("ALTER TABLE delivery_records ENABLE TRIGGER delivery_insert_trigger"))
+        db.commit()
+        vacuum()
+        print(f"seeded {args.orders:,} orders in {time.perf_counter() - t0:.1f} s")
+
+        until = datetime.now()
+        since = until - timedelta(days=args.window_days)
+        item_id = item_ids[0]
+        ms_strings, legacy = timed(from_strings, db, item_id, since, until)
+        ms_hourly, hourly = timed(sales.item_sales_by_hour, db, item_id, since, until)
+        ms_top, _ = timed(sales.top_items, db, since, until, 10)
+        assert sum(u for _, u in legacy) == sum(r["units"] for r in hourly)
+
+        print(f"item {item_id}, last {args.window_days} days, {len(hourly)} hours:")
+        print(f"  strings  {ms_strings:9.1f} ms")
+        print(f"  hourly   {ms_hourly:9.1f} ms")
+        print(f"  top 10   {ms_top:9.1f} ms")
+    finally:
+        db.rollback()
+        cleanup(db)
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Off-GUI-thread PostgreSQL access for the base station UI.
+
+All queries run on a small thread pool backed by a psycopg2
+ThreadedConnectionPool; results come back on the Qt GUI thread through a
+queued signal, so a slow or unreachable database never blocks teleop,
+video or the map.
+
+Timeout / cancellation policy:
+ - connecting gives up after `connect_timeout_s`
+ - every statement is bounded server-side by `statement_timeout_ms`
+ - at most `max_pending` jobs may be queued; beyond that new jobs fail
+   immediately with DbBusyError instead of piling up behind a dead DB
+ - close() cancels in-flight statements and drops queued jobs
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class DbBusyError(RuntimeError):
+    pass
+
+
+class DbWorker(QObject):
+    _done = pyqtSignal(object, object, object)    # callback, result, error
+
+    def __init__(self, connect_kwargs, max_connections=3, statement_timeout_ms=3000,
+                 connect_timeout_s=3, max_pending=20, parent=None):
+        super().__init__(parent)
+
+        # minconn=0: nothing connects until the first job, off the GUI thread
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            0, max_connections,
+            connect_timeout=connect_timeout_s,
+            options=f"-c statement_timeout={int(statement_timeout_ms)}",
+            **connect_kwargs
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="db")
+        self._max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = set()
+        self._closed = False
+
+        # Emitted from worker threads, delivered on the thread owning this object
+        self._done.connect(self._deliver)
+
+    # ---------------- public API ----------------
+
+    def submit(self, fn, on_result=None, on_error=None):
+        """
+        Run fn(cursor) on a pooled connection (autocommit) in a worker thread.
+        on_result(value) / on_error(exc) are called on the GUI thread.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            if self._pending >= self._max_pending:
+                busy = DbBusyError(f"database busy ({self._pending} queries pending)")
+                if on_error is not None:
+                    on_error(busy)
+                return
+            self._pending += 1
+
+        self._executor.submit(self._run, fn, on_result, on_error)
+
+    def execute(self, sql, params=None, fetch=None, on_result=None, on_error=None):
+        """
+        Convenience wrapper: fetch=None -> rowcount, "one" -> dict (or None),
+        "all" -> list of dicts.
+        """
+        def job(cur):
+            cur.execute(sql, params)
+            if fetch == "one":
+                row = cur.fetchone()
+                return dict(row) if row is not None else None
+            if fetch == "all":
+                return [dict(row) for row in cur.fetchall()]
+            return cur.rowcount
+
+        self.submit(job, on_result, on_error)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            active = list(self._active)
+        for conn in active:
+            try:
+                conn.cancel()
+            except Exception:
+                pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.closeall()
+
+    # ---------------- worker side ----------------
+
+    def _run(self, fn, on_result, on_error):
+        conn = None
+        broken = False
+        try:
+            conn = self._pool.getconn()
+            conn.autocommit = True
+            with self._lock:
+                self._active.add(conn)
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                result = fn(cur)
+            self._done.emit(on_result, result, None)
+        except Exception as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            self._done.emit(on_error, None, e)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(conn)
+            if conn is not None and not self._closed:
+                self._pool.putconn(conn, close=broken)
+
+    def _deliver(self, callback, result, error):
+        if callback is None:
+            if error is not None:
+                print(f"[DB] Unhandled error: {error}")
+            return
+        callback(error if error is not None else result)
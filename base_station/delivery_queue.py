@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Delivery Queue model, action delegate and NOTIFY listener for the base station UI.
+
+The queue tab is driven by the same `delivery_records_channel` NOTIFY stream
+that delivery_watcher.py listens to (see "README_delivery watcher.md" for the
+trigger). Every notification carries the full row, so a status change is
+applied to exactly one row of DeliveryQueueModel; a full SELECT is only
+needed at startup and after the listener reconnects.
+"""
+
+import bisect
+import json
+import select
+import threading
+import time
+
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QEvent, QRect, pyqtSignal
+)
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QPushButton
+
+NOTIFY_CHANNEL = "delivery_records_channel"
+
+# Statuses shown in the queue, and the action offered for each:
+# status -> (button label, next status)
+QUEUE_STATUSES = ("NEW", "LOADING", "READY", "IN_PROGRESS")
+QUEUE_ACTIONS = {
+    "NEW": ("Start Loading", "LOADING"),
+    "LOADING": ("Mark Loaded", "READY"),
+    "READY": ("Dispatch", "IN_PROGRESS"),
+    "IN_PROGRESS": ("Mark Delivered", "DELIVERED"),
+}
+
+COLUMNS = ["Order ID", "Address", "Location", "Status", "Created At", "Actions"]
+ACTIONS_COLUMN = 5
+
+
+def _created_key(value):
+    """Normalise created_at from a DB datetime or a row_to_json string."""
+    if value is None:
+        return ""
+    return str(value).replace("T", " ")
+
+
+def _location(record):
+    """Address preferred, else coords, else Unknown."""
+    address = record.get("address")
+    if address and address.strip():
+        return address.strip()
+    try:
+        if record.get("dest_pos_x") is not None and record.get("dest_pos_y") is not None:
+            return f"{float(record['dest_pos_x']):.2f}, {float(record['dest_pos_y']):.2f}"
+    except (TypeError, ValueError):
+        pass
+    return "Unknown"
+
+
+# ---------------------- Model ----------------------
+
+class DeliveryQueueModel(QAbstractTableModel):
+    def __init__(self, robot_id, parent=None):
+        super().__init__(parent)
+        self.robot_id = robot_id
+        self._rows = []        # records (dicts), ordered by created_at
+        self._keys = []        # (created_at, id) per row, for bisect
+        self._index = {}       # order id -> row number
+
+    # ---------------- Qt model API ----------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        record = self._rows[index.row()]
+        col = index.column()
+        if col == 0:
+            return str(record["id"])
+        if col == 1:
+            return record.get("address") or ""
+        if col == 2:
+            return _location(record)
+        if col == 3:
+            return record.get("status") or ""
+        if col == 4:
+            return _created_key(record.get("created_at"))
+        return None
+
+    def record(self, row):
+        return self._rows[row]
+
+    # ---------------- row-level diffs ----------------
+
+    def _belongs(self, record):
+        return record.get("robot_id") == self.robot_id and record.get("status") in QUEUE_STATUSES
+
+    def apply_record(self, record):
+        """Insert, update or remove a single delivery record."""
+        order_id = record["id"]
+        row = self._index.get(order_id)
+
+        if not self._belongs(record):
+            if row is not None:
+                self._remove_row(row)
+            return
+
+        if row is not None:
+            if self._keys[row] == (_created_key(record.get("created_at")), order_id):
+                self._rows[row] = record
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+                return
+            self._remove_row(row)
+
+        self._insert_row(record)
+
+    def remove_record(self, order_id):
+        row = self._index.get(order_id)
+        if row is not None:
+            self._remove_row(row)
+
+    def sync(self, records):
+        """Reconcile with a full snapshot (startup / after reconnect)."""
+        fresh = {r["id"] for r in records}
+        for order_id in [oid for oid in self._index if oid not in fresh]:
+            self.remove_record(order_id)
+        for record in records:
+            self.apply_record(record)
+
+    def _insert_row(self, record):
+        key = (_created_key(record.get("created_at")), record["id"])
+        row = bisect.bisect(self._keys, key)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, record)
+        self._keys.insert(row, key)
+        self._reindex_from(row)
+        self.endInsertRows()
+
+    def _remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._index[self._rows[row]["id"]]
+        del self._rows[row]
+        del self._keys[row]
+        self._reindex_from(row)
+        self.endRemoveRows()
+
+    def _reindex_from(self, row):
+        # New orders are appended at the end, so this is usually a no-op
+        for i in range(row, len(self._rows)):
+            self._index[self._rows[i]["id"]] = i
+
+
+# ---------------------- Actions delegate ----------------------
+
+class QueueActionDelegate(QStyledItemDelegate):
+    """Paints the per-row action button instead of a real widget per row."""
+    action_clicked = pyqtSignal(dict, str)    # record, next status
+
+    BUTTON_HEIGHT = 30
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Never shown; lets the app stylesheet (#QueueButton) style the painted button
+        self._style_button = QPushButton()
+        self._style_button.setObjectName("QueueButton")
+        self._pressed = None
+
+    def _button_rect(self, option, label):
+        fm = option.fontMetrics
+        w = fm.horizontalAdvance(label) + 28
+        h = min(self.BUTTON_HEIGHT, option.rect.height() - 4)
+        r = option.rect
+        return QRect(r.x() + (r.width() - w) // 2, r.y() + (r.height() - h) // 2, w, h)
+
+    def paint(self, painter, option, index):
+        record = index.model().record(index.row())
+        action = QUEUE_ACTIONS.get(record.get("status"))
+        if action is None:
+            return super().paint(painter, option, index)
+
+        btn = QStyleOptionButton()
+        btn.rect = self._button_rect(option, action[0])
+        btn.text = action[0]
+        btn.state = QStyle.State_Enabled
+        if self._pressed == (index.row(), record["id"]):
+            btn.state |= QStyle.State_Sunken
+
+        style = self._style_button.style()
+        style.drawControl(QStyle.CE_PushButton, btn, painter, self._style_button)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        record = index.model().record(index.row())
+        action = QUEUE_ACTIONS.get(record.get("status"))
+        if action is not None:
+            size.setWidth(option.fontMetrics.horizontalAdvance(action[0]) + 40)
+            size.setHeight(max(size.height(), self.BUTTON_HEIGHT + 4))
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+
+        record = model.record(index.row())
+        action = QUEUE_ACTIONS.get(record.get("status"))
+        if action is None or not self._button_rect(option, action[0]).contains(event.pos()):
+            self._pressed = None
+            return False
+
+        key = (index.row(), record["id"])
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = key
+            return True
+
+        if self._pressed == key:
+            self._pressed = None
+            self.action_clicked.emit(record, action[1])
+        return True
+
+
+# ---------------------- NOTIFY listener ----------------------
+
+class DeliveryNotifyListener(QObject):
+    """
+    LISTENs on delivery_records_channel in a background thread with its own
+    connection and re-emits each payload on the GUI thread.
+    """
+    record_changed = pyqtSignal(dict)
+    record_deleted = pyqtSignal(int)
+    resync_needed = pyqtSignal()
+    log_message = pyqtSignal(str)
+
+    RECONNECT_DELAY = 3.0
+
+    def __init__(self, connect, parent=None):
+        """`connect` is a zero-argument callable returning a new psycopg2 connection."""
+        super().__init__(parent)
+        self._connect = connect
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+                cur.close()
+            except Exception as e:
+                self.log_message.emit(f"[Queue] NOTIFY listener cannot connect: {e}")
+                time.sleep(self.RECONNECT_DELAY)
+                continue
+
+            self.log_message.emit(f"[Queue] Listening on {NOTIFY_CHANNEL}.")
+            # Anything that changed while we were not listening
+            self.resync_needed.emit()
+
+            try:
+                self._listen(conn)
+            except Exception as e:
+                self.log_message.emit(f"[Queue] NOTIFY listener lost connection: {e}")
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+            if self._running:
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _listen(self, conn):
+        while self._running:
+            if select.select([conn], [], [], 5) == ([], [], []):
+                continue
+
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    data = json.loads(notify.payload)
+                except ValueError:
+                    self.log_message.emit(f"[Queue] Invalid NOTIFY payload: {notify.payload[:80]}")
+                    continue
+                if "id" not in data:
+                    continue
+
+                if data.get("op") == "DELETE":
+                    self.record_deleted.emit(int(data["id"]))
+                else:
+                    self.record_changed.emit(data)
@@ -1,9 +1,29 @@
 #!/usr/bin/env python3
-import psycopg2
-import select
+"""
+Delivery dispatcher: PostgreSQL NOTIFY -> move_base goal, for a fleet.
+
+Listens on delivery_records_channel with asyncio (the LISTEN connection's
+socket is watched with loop.add_reader), routes each new delivery to its
+robot by robot_id and publishes the goal over that robot's persistent
+rosbridge connection. Robots are dispatched concurrently; goals for the same
+robot are sent in order. The trigger payload already carries dest_pos_x /
+dest_pos_y, so no extra query is needed per delivery.
+
+    python3 delivery_watcher.py --robot 1=192.168.2.115:9090 --robot 2=192.168.2.116:9090
+"""
+
+import argparse
+import asyncio
 import json
-from decimal import Decimal
-from send_goal import send_goal  # import fixed-IP goal sender
+import time
+from collections import Counter
+
+import psycopg2
+import psycopg2.extensions
+
+from goal_msg import make_goal_msg
+from latency_stats import LatencyStats
+from rosbridge_async import RosbridgeClient
 
 
 # -----------------------------
@@ -17,85 +37,221 @@ DB_CONFIG = {
     "password": "102403"
 }
 
+NOTIFY_CHANNEL = "delivery_records_channel"
 
-# -----------------------------
-# Start Watching for new orders
-# -----------------------------
-def start_watcher():
-    print("Starting PostgreSQL delivery watcher...")
+# robot_id -> (rosbridge host, port); override with --robot ID=HOST:PORT
+ROBOTS = {
+    1: ("192.168.2.115", 9090),
+}
+
+GOAL_TOPIC = ("/move_base/goal", "move_base_msgs/MoveBaseActionGoal")
+CANCEL_TOPIC = ("/move_base/cancel", "actionlib_msgs/GoalID")
 
-    # Connect to PostgreSQL
-    conn = psycopg2.connect(**DB_CONFIG)
-    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+RECONNECT_DELAY = 3.0
+SEND_TIMEOUT = 5.0
 
-    cur = conn.cursor()
-    cur.execute("LISTEN delivery_records_channel;")
 
-    print("Listening on channel: delivery_records_channel ...")
+class DeliveryDispatcher:
+    def __init__(self, db_config, robots, stats_interval=30.0):
+        self.db_config = db_config
+        self.stats_interval = stats_interval
 
-    while True:
-        # Wait for NOTIFY events
-        if select.select([conn], [], [], 5) == ([], [], []):
-            continue
+        self.clients = {
+            robot_id: RosbridgeClient(host, port, name=f"robot {robot_id} ({host}:{port})")
+            for robot_id, (host, port) in robots.items()
+        }
+        self._queues = {}
 
-        conn.poll()
+        # Throughput / latency counters
+        self.counters = Counter()
+        self.latency = LatencyStats()          # NOTIFY received -> goal written to rosbridge
+        self._started = time.monotonic()
 
-        while conn.notifies:
-            notify = conn.notifies.pop(0)
-            print("\nNew delivery notify received!")
-            print("Raw payload:", notify.payload)
+        self._conn = None
+        self._lost = None
 
-            # Parse JSON payload from trigger
+    # ---------------- main loop ----------------
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        for robot_id, client in self.clients.items():
+            await client.advertise(*CANCEL_TOPIC)
+            await client.advertise(*GOAL_TOPIC)
+            client.start()
+            self._queues[robot_id] = asyncio.Queue()
+            asyncio.ensure_future(self._robot_worker(robot_id, client, self._queues[robot_id]))
+
+        if self.stats_interval:
+            asyncio.ensure_future(self._report_stats())
+
+        while True:
             try:
-                data = json.loads(notify.payload)
-            except:
-                print("Invalid JSON payload.")
+                self._conn = await loop.run_in_executor(None, self._listen_connection)
+            except Exception as e:
+                print(f"[Watcher] Cannot connect to PostgreSQL: {e}")
+                await asyncio.sleep(RECONNECT_DELAY)
                 continue
 
-            delivery_id = data.get("id")
-            if not delivery_id:
-                print("No delivery ID in payload.")
-                continue
+            print(f"[Watcher] Listening on channel: {NOTIFY_CHANNEL} ...")
+            self._lost = asyncio.Event()
+            # psycopg2 closes a connection the server dropped, after which
+            # fileno() raises: keep the fd to remove the reader by
+            fd = self._conn.fileno()
+            loop.add_reader(fd, self._on_readable)
+            try:
+                await self._lost.wait()
+            finally:
+                for cleanup in (lambda: loop.remove_reader(fd), self._conn.close):
+                    try:
+                        cleanup()
+                    except Exception as e:
+                        print(f"[Watcher] Cleanup after lost connection: {e}")
 
-            print(f"Delivery ID = {delivery_id}")
+            print("[Watcher] Lost PostgreSQL connection; reconnecting ...")
+            await asyncio.sleep(RECONNECT_DELAY)
 
-            # Fetch coordinates from DB
-            cur2 = conn.cursor()
-            cur2.execute("""
-                SELECT dest_pos_x, dest_pos_y
-                FROM delivery_records
-                WHERE id=%s
-            """, (delivery_id,))
-            row = cur2.fetchone()
-            cur2.close()
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
 
-            if not row:
-                print("Delivery record not found.")
-                continue
+    def _listen_connection(self):
+        conn = psycopg2.connect(**self.db_config)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cur = conn.cursor()
+        cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+        cur.close()
+        return conn
+
+    # ---------------- NOTIFY handling ----------------
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except Exception as e:
+            print(f"[Watcher] PostgreSQL error: {e}")
+            self._lost.set()
+            return
+
+        received = time.monotonic()
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            self._handle(notify.payload, received)
+
+    def _handle(self, payload, received):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            self.counters["invalid"] += 1
+            print(f"[Watcher] Invalid JSON payload: {payload[:80]}")
+            return
+
+        # The trigger also fires on UPDATE/DELETE (for the UI queue);
+        # only new deliveries are dispatched here.
+        if data.get("op", "INSERT") != "INSERT":
+            return
+
+        self.counters["received"] += 1
+        delivery_id = data.get("id")
+        robot_id = data.get("robot_id")
+
+        queue = self._queues.get(robot_id)
+        if delivery_id is None or queue is None:
+            self.counters["unrouted"] += 1
+            print(f"[Watcher] Delivery {delivery_id}: no robot configured for robot_id={robot_id}")
+            return
+
+        queue.put_nowait((data, received))
+
+    # ---------------- dispatch ----------------
+
+    async def _robot_worker(self, robot_id, client, queue):
+        while True:
+            data, received = await queue.get()
+            delivery_id = data["id"]
 
-            # Convert Decimal to float
             try:
-                x = float(row[0]) if isinstance(row[0], Decimal) else row[0]
-                y = float(row[1]) if isinstance(row[1], Decimal) else row[1]
-            except Exception as e:
-                print("Error converting DB values:", e)
+                x = float(data["dest_pos_x"])
+                y = float(data["dest_pos_y"])
+            except (KeyError, TypeError, ValueError):
+                self.counters["failed"] += 1
+                print(f"[Watcher] Delivery {delivery_id}: payload has no destination "
+                      f"(is the trigger sending row_to_json?)")
                 continue
 
             yaw = 0  # Default yaw (modify if you add yaw column)
 
-            print(f"New Goal -> X={x:.4f}, Y={y:.4f}, Yaw={yaw}")
-
-            # Send goal to robot
             try:
-                send_goal(x, y, yaw)
+                await client.publish(CANCEL_TOPIC[0], {"id": ""}, timeout=SEND_TIMEOUT)
+                await client.publish(GOAL_TOPIC[0], make_goal_msg(x, y, yaw), timeout=SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.counters["failed"] += 1
+                print(f"[Watcher] Delivery {delivery_id}: {client.name} not connected; goal dropped")
+                continue
             except Exception as e:
-                print("Error sending goal to robot:", e)
+                self.counters["failed"] += 1
+                print(f"[Watcher] Delivery {delivery_id}: error sending goal to {client.name}: {e}")
                 continue
 
-            print(f"Goal sent for delivery {delivery_id}")
-            print("-----------------------------------")
+            self.counters["dispatched"] += 1
+            self.latency.add(time.monotonic() - received)
+            print(f"[Watcher] Goal sent for delivery {delivery_id} -> robot {robot_id} "
+                  f"X={x:.4f}, Y={y:.4f}, Yaw={yaw}")
 
+    # ---------------- stats ----------------
 
-if __name__ == "__main__":
-    start_watcher()
+    def stats_line(self):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        c = self.counters
+        return (f"received={c['received']} dispatched={c['dispatched']} failed={c['failed']} "
+                f"unrouted={c['unrouted']} ({c['dispatched'] / elapsed:.2f}/s); "
+                f"dispatch latency {self.latency.summary()}")
 
+    async def _report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            print(f"[Watcher] {self.stats_line()}")
+
+
+def parse_robot(value):
+    """'1=192.168.2.115:9090' -> (1, ('192.168.2.115', 9090))"""
+    try:
+        robot_id, addr = value.split("=", 1)
+        host, _, port = addr.partition(":")
+        return int(robot_id), (host, int(port or 9090))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ID=HOST[:PORT], got {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch new deliveries to robots via rosbridge.")
+    parser.add_argument("--robot", type=parse_robot, action="append",
+                        help="robot route ID=HOST[:PORT] (repeatable; default: ROBOTS table)")
+    parser.add_argument("--db-host", default=DB_CONFIG["host"])
+    parser.add_argument("--db-port", type=int, default=DB_CONFIG["port"])
+    parser.add_argument("--stats-interval", type=float, default=30.0,
+                        help="seconds between counter reports (0 = off)")
+    args = parser.parse_args()
+
+    robots = dict(args.robot) if args.robot else ROBOTS
+    db_config = dict(DB_CONFIG, host=args.db_host, port=args.db_port)
+
+    print("Starting PostgreSQL delivery watcher...")
+    for robot_id, (host, port) in robots.items():
+        print(f"  robot {robot_id} -> {host}:{port}")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    dispatcher = DeliveryDispatcher(db_config, robots, stats_interval=args.stats_interval)
+    try:
+        loop.run_until_complete(dispatcher.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(dispatcher.close())
+        print(f"[Watcher] {dispatcher.stats_line()}")
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Fake rosbridge server for testing delivery_watcher.py without a robot.
+
+Accepts rosbridge websocket clients, acknowledges nothing, and just counts
+advertise / publish ops per topic, printing every goal it receives:
+
+    python3 fake_rosbridge.py --port 9091 &
+    python3 fake_rosbridge.py --port 9092 &
+    python3 delivery_watcher.py --robot 1=127.0.0.1:9091 --robot 2=127.0.0.1:9092
+"""
+
+import argparse
+import asyncio
+import json
+from collections import Counter
+
+import websockets
+
+counts = Counter()
+
+
+async def handle(ws, path=None):
+    peer = ws.remote_address
+    print(f"[FakeRos] Client connected: {peer}")
+    try:
+        async for raw in ws:
+            data = json.loads(raw)
+            op, topic = data.get("op"), data.get("topic")
+            counts[(op, topic)] += 1
+
+            if op == "publish" and topic == "/move_base/goal":
+                goal = data["msg"]
+                pos = goal["goal"]["target_pose"]["pose"]["position"]
+                print(f"[FakeRos] goal #{counts[(op, topic)]} id={goal['goal_id']['id']} "
+                      f"x={pos['x']:.2f} y={pos['y']:.2f}")
+            elif op != "publish":
+                print(f"[FakeRos] {op} {topic}")
+    except websockets.ConnectionClosed:
+        pass
+    print(f"[FakeRos] Client disconnected: {peer} totals={dict(counts)}")
+
+
+async def serve(host, port):
+    async with websockets.serve(handle, host, port):
+        print(f"[FakeRos] Listening on ws://{host}:{port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake rosbridge websocket server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
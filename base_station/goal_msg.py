@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+move_base goal messages as plain dicts, shared by send_goal.py (roslibpy)
+and the headless dispatcher (delivery_watcher.py). No third-party imports.
+"""
+
+import math
+import uuid
+
+
+def yaw_to_quaternion(yaw_deg: float):
+    """Convert yaw in degrees to a simple quaternion around Z."""
+    yaw_rad = math.radians(yaw_deg)
+    return {
+        'x': 0.0,
+        'y': 0.0,
+        'z': math.sin(yaw_rad / 2.0),
+        'w': math.cos(yaw_rad / 2.0),
+    }
+
+
+def make_goal_msg(x: float, y: float, yaw_deg: float, goal_id: str = None):
+    """Build a move_base_msgs/MoveBaseActionGoal dict for a goal in the map frame."""
+    return {
+        'header': {
+            'seq': 0,
+            'stamp': {'secs': 0, 'nsecs': 0},
+            'frame_id': ''
+        },
+        'goal_id': {
+            'stamp': {'secs': 0, 'nsecs': 0},
+            'id': goal_id or str(uuid.uuid4())
+        },
+        'goal': {
+            'target_pose': {
+                'header': {'frame_id': 'map'},
+                'pose': {
+                    'position': {
+                        'x': float(x),
+                        'y': float(y),
+                        'z': 0.0
+                    },
+                    'orientation': yaw_to_quaternion(yaw_deg)
+                }
+            }
+        }
+    }
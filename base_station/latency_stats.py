@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Rolling latency samples, shared by the Qt UI (telemetry.py, main_int.py)
+and the headless dispatcher (delivery_watcher.py). No third-party imports.
+"""
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) with percentile summary."""
+
+    def __init__(self, window=500):
+        self._window = window
+        self._samples = []
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+        if len(self._samples) > self._window:
+            del self._samples[0]
+
+    def __len__(self):
+        return len(self._samples)
+
+    def summary(self):
+        if not self._samples:
+            return "no samples"
+        s = sorted(self._samples)
+        pct = lambda p: s[min(len(s) - 1, int(p * len(s)))] * 1000
+        return f"p50={pct(0.50):.1f} ms, p95={pct(0.95):.1f} ms, max={s[-1] * 1000:.1f} ms (n={len(s)})"
@@ -1,19 +1,29 @@
 import sys
+import time
 from datetime import datetime
 
 from PyQt5.QtGui import (
-    QPixmap, QPainter, QColor, QIcon, QPolygonF,
-    QTransform, QImage, QPainterPath
+    QPixmap, QPainter, QColor, QIcon, QPolygonF, QImage
 )
-from PyQt5.QtCore import QSize, Qt, QTimer, QPointF, pyqtSignal
+from PyQt5.QtCore import QSize, Qt, QTimer, QPointF, QRect, QObject, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QToolButton, QTextEdit,
     QVBoxLayout, QHBoxLayout, QSlider, QFrame,
     QLineEdit, QGraphicsDropShadowEffect, QSizePolicy,
-    QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+    QTabWidget, QTableView, QHeaderView, QMessageBox
 )
 
 from send_movement import init_connection, send_cmd_vel, stop_robot
+from map_raster import (
+    rasterize_occupancy, grid_to_gray, orient_for_display, grid_rect_to_display
+)
+from map_tiles import MapTilePyramid
+from video_frames import FrameRing, GstBusWatcher, rounded_corner_mask, FRAME_FORMAT
+from latency_stats import LatencyStats
+from telemetry import Telemetry, CONNECTED, POSE, MAP, NAV_STATUS
+from delivery_queue import (
+    DeliveryQueueModel, QueueActionDelegate, DeliveryNotifyListener, ACTIONS_COLUMN
+)
 
 # Database & robot config ------------------------
 DB_HOST = "192.168.2.129"
@@ -21,22 +31,41 @@ DB_PORT = 5432
 DB_NAME = "vendor_bot"
 DB_USER = "postgres"
 DB_PASSWORD = "102403"
+DB_CONNECT_KWARGS = dict(host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
+
+DB_POOL_SIZE = 3                  # worker threads / pooled connections
+DB_STATEMENT_TIMEOUT_MS = 3000    # server-side cap per query
+DB_CONNECT_TIMEOUT_S = 3
 
 ROBOT_ID = 1          # which robot_id this UI controls
 ROBOT_IP = "192.168.2.115"  # IP of the robot's ROS bridge (for CLI send_goal if needed)
 
+# Telemetry delivery: "push" = event-driven from Telemetry.bus,
+# "poll" = legacy 100 ms QTimer (kept to compare odom->pixel latency)
+TELEMETRY_MODE = "push"
+TELEMETRY_MAX_UI_HZ = 20      # max pose/map/nav events per second into the UI
+LATENCY_REPORT_EVERY = 200    # log odom->pixel latency every N painted poses
+VIDEO_STATS_EVERY = 300       # log video copy/paint frame times every N frames
+VIDEO_STALL_TIMEOUT_S = 3     # no UDP packets for this long = stream dropped
+VIDEO_RESTART_MS = 2000       # delay before restarting the pipeline after an error
+
+QUEUE_RESYNC_MS = 60000       # full queue resync as a safety net for missed NOTIFYs
+GOAL_ACK_TIMEOUT_S = 10.0     # wait this long for move_base to report a dispatched goal
+
 # Try to import psycopg2 (PostgreSQL)
 try:
     import psycopg2
+    from db_worker import DbWorker
 except ImportError:
     psycopg2 = None
     print("[Queue] WARNING: psycopg2 not installed. Delivery Queue will be disabled.")
 
 # Try to import RosGoalSender for navigation goals
 try:
-    from send_goal import RosGoalSender
+    from send_goal import RosGoalSender, STATUS_NAMES as GOAL_STATUS_NAMES
 except ImportError:
     RosGoalSender = None
+    GOAL_STATUS_NAMES = {}
     print("[Queue] WARNING: send_goal.py (RosGoalSender) not found. Dispatch will only update DB, no nav goal will be sent.")
 
 
@@ -61,56 +90,112 @@ class Card(QFrame):
 # ---------------------- Live Feed -------------------------
 
 class LiveFeedWidget(QWidget):
-    new_frame = pyqtSignal(QImage)   # Qt-safe signal
+    frame_ready = pyqtSignal()       # Qt-safe signal; the frame itself is in self.ring
+
+    CORNER_RADIUS = 24
+    CORNER_COLOR = QColor("white")   # #Card background behind the rounded corners
 
     def __init__(self):
         super().__init__()
 
         import gi
         gi.require_version("Gst", "1.0")
-        from gi.repository import Gst, GLib
-        import numpy as np
+        from gi.repository import Gst
 
         self.Gst = Gst
-        self.GLib = GLib
-        self.np = np
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.video_label = QLabel("Connecting...")
-        self.video_label.setAlignment(Qt.AlignCenter)
-        self.video_label.setScaledContents(True)
-        layout.addWidget(self.video_label)
+        self.status = QLabel("Connecting...")
+        self.status.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status)
+
+        # One copy per frame into a reusable slot; painted straight from there
+        self.ring = FrameRing()
+        self._has_frame = False
+        self._mask = None
+
+        self.copy_stats = LatencyStats()
+        self.paint_stats = LatencyStats()
+        self._frames = 0
 
         # Connect signal to Qt GUI slot
-        self.new_frame.connect(self.update_gui_frame)
+        self.frame_ready.connect(self.update)
 
         Gst.init(None)
 
+        # videoscale brings frames to the widget size before they reach Python
         pipeline_str = (
-            "udpsrc port=5000 caps=\"application/x-rtp, media=video, encoding-name=H264, payload=96\" ! "
-            "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! "
-            "video/x-raw,format=RGB ! appsink name=appsink emit-signals=true sync=false max-buffers=1 drop=true"
+            f"udpsrc port=5000 timeout={VIDEO_STALL_TIMEOUT_S * 1_000_000_000} "
+            "caps=\"application/x-rtp, media=video, encoding-name=H264, payload=96\" ! "
+            "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! videoscale add-borders=false ! "
+            f"capsfilter name=scalecaps caps=video/x-raw,format={FRAME_FORMAT} ! "
+            "appsink name=appsink emit-signals=true sync=false max-buffers=1 drop=true"
         )
 
         self.pipeline = Gst.parse_launch(pipeline_str)
+        self.scalecaps = self.pipeline.get_by_name("scalecaps")
         self.appsink = self.pipeline.get_by_name("appsink")
         self.appsink.connect("new-sample", self.on_new_sample)
 
+        # Bus messages arrive from a GLib thread as queued Qt signals
+        self.bus_watcher = GstBusWatcher(self.pipeline, self)
+        self.bus_watcher.error.connect(self.on_stream_error)
+        self.bus_watcher.eos.connect(lambda: self.on_stream_error("end of stream"))
+        self.bus_watcher.stalled.connect(self.on_stream_stalled)
+
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.timeout.connect(self.restart_pipeline)
+
         self.pipeline.set_state(Gst.State.PLAYING)
 
-        # Keep GStreamer pumping
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.gst_step)
-        self.timer.start(5)
+        # Renegotiate the output size once resizing settles
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.apply_output_size)
+
+    def on_stream_error(self, reason):
+        print(f"[Video] Pipeline stopped ({reason}); restarting in {VIDEO_RESTART_MS} ms")
+        self.show_status("Video stream lost. Reconnecting...")
+        self._restart_timer.start(VIDEO_RESTART_MS)
+
+    def on_stream_stalled(self):
+        # udpsrc keeps posting timeouts while idle; restart once per drop only
+        if not self._has_frame:
+            return
+        print(f"[Video] No packets for {VIDEO_STALL_TIMEOUT_S} s; restarting pipeline")
+        self.show_status("No video signal. Waiting for stream...")
+        self.restart_pipeline()
+
+    def restart_pipeline(self):
+        # A fresh decoder also recovers from a sender that restarted mid-GOP
+        self.pipeline.set_state(self.Gst.State.NULL)
+        self.pipeline.set_state(self.Gst.State.PLAYING)
 
-    def gst_step(self):
-        bus = self.pipeline.get_bus()
-        _ = bus.poll(self.Gst.MessageType.ANY, 0)
+    def show_status(self, text):
+        self._has_frame = False
+        self.ring.clear()
+        self.status.setText(text)
+        self.status.show()
+        self.update()
+
+    def apply_output_size(self):
+        w, h = max(2, self.width()), max(2, self.height())
+        caps = self.Gst.Caps.from_string(
+            f"video/x-raw,format={FRAME_FORMAT},width={w},height={h},pixel-aspect-ratio=1/1"
+        )
+        self.scalecaps.set_property("caps", caps)
+
+    def resizeEvent(self, event):
+        self._mask = None
+        self._resize_timer.start(150)
+        super().resizeEvent(event)
 
     def on_new_sample(self, sink):
         # This is running on GStreamer thread
+        t0 = time.perf_counter()
         sample = sink.emit("pull-sample")
         buf = sample.get_buffer()
         caps = sample.get_caps()
@@ -121,54 +206,91 @@ class LiveFeedWidget(QWidget):
         if not success:
             return self.Gst.FlowReturn.ERROR
 
-        frame = self.np.ndarray(
-            shape=(h, w, 3),
-            dtype=self.np.uint8,
-            buffer=map_info.data
-        )
+        try:
+            # Copy out while the buffer is mapped; nothing references it afterwards
+            self.ring.write(map_info.data, w, h, map_info.size // h)
+        finally:
+            buf.unmap(map_info)
 
-        qimg = QImage(frame.data, w, h, 3 * w, QImage.Format_RGB888)
-        buf.unmap(map_info)
+        self.copy_stats.add(time.perf_counter() - t0)
 
         # Emit Qt signal (safe) → handled in main thread
-        self.new_frame.emit(qimg)
+        self.frame_ready.emit()
 
         return self.Gst.FlowReturn.OK
 
-    def update_gui_frame(self, qimg):
-        # Rounded corners
-        pix = QPixmap.fromImage(qimg)
-        rounded = QPixmap(pix.size())
-        rounded.fill(Qt.transparent)
-
-        p = QPainter(rounded)
-        p.setRenderHint(QPainter.Antialiasing)
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, pix.width(), pix.height(), 24, 24)
-        p.setClipPath(path)
-        p.drawPixmap(0, 0, pix)
-        p.end()
+    def paintEvent(self, event):
+        img = self.ring.acquire()
+        if img is None:
+            return
 
-        self.video_label.setPixmap(rounded)
+        t0 = time.perf_counter()
+        if not self._has_frame:
+            self._has_frame = True
+            self.status.hide()
+
+        if self._mask is None:
+            self._mask = rounded_corner_mask(self.width(), self.height(), self.CORNER_RADIUS, self.CORNER_COLOR)
+
+        p = QPainter(self)
+        try:
+            if img.width() == self.width() and img.height() == self.height():
+                p.drawImage(0, 0, img)
+            else:
+                # Only until videoscale picks up the new size
+                p.drawImage(self.rect(), img)
+            p.drawPixmap(0, 0, self._mask)
+        finally:
+            p.end()
+            self.ring.release()
+
+        self.paint_stats.add(time.perf_counter() - t0)
+        self._frames += 1
+        if self._frames % VIDEO_STATS_EVERY == 0:
+            print(f"[Video] copy {self.copy_stats.summary()}; paint {self.paint_stats.summary()}")
 
     def closeEvent(self, event):
+        self._restart_timer.stop()
         self.pipeline.set_state(self.Gst.State.NULL)
+        self.bus_watcher.stop()
         super().closeEvent(event)
 
 
 # ---------------------- Map Widget ------------------------
 
 class MapViewWidget(QWidget):
+    pose_painted = pyqtSignal(float)   # seconds from /odom receipt to arrow on screen
+
+    MIN_ZOOM = 1.0
+    MAX_ZOOM = 32.0
+    ARROW_RADIUS = 12    # px, bounding radius of the robot arrow
+
     def __init__(self):
         super().__init__()
 
-        self.rotated_pixmap = None
+        self._pyramid = None
+        self._gray = None
+        self._grid_w = 0
+        self._grid_h = 0
         self.origin_x = 0
         self.origin_y = 0
         self.resolution = 0.05
         self.rx = 0
         self.ry = 0
         self.yaw = 0
+        self._pose_stamp = None
+
+        # View state: zoom is relative to "fit to widget", pan in widget px
+        self._zoom = 1.0
+        self._pan = QPointF(0, 0)
+        self._drag_start = None
+
+        # Map layer rendered at the current widget size / zoom / pan.
+        # Pose updates only repaint the arrow over this cached layer. ARGB
+        # so the margins around the map stay transparent.
+        self._base_cache = None
+        self._base_key = None
+        self._arrow_rect = QRect()
 
         # Status Overlay
         self.status = QLabel("Connecting to ROS…")
@@ -185,95 +307,140 @@ class MapViewWidget(QWidget):
     def set_status(self, text):
         self.status.setText(text)
         self.status.show()
-        self.rotated_pixmap = None
+        self._pyramid = None
+        self._base_cache = None
         self.update()
 
-    # Called once when map arrives
+    # Called when the map arrives (or its geometry changes)
     def load_from_occupancy(self, map_info, data):
         self.set_status("Rendering map…")
 
-        from PyQt5.QtGui import QImage, QPixmap, QColor
-
         width = map_info["width"]
         height = map_info["height"]
 
         print(f"[Map] Building image {width}x{height} ...")
 
-        img = QImage(width, height, QImage.Format_Indexed8)
-        gray = [QColor(i, i, i).rgb() for i in range(256)]
-        img.setColorTable(gray)
-
-        for y in range(height):
-            base = y * width
-            for x in range(width):
-                v = data[base + x]
-                if v == -1:
-                    pix = 127
-                elif v == 0:
-                    pix = 255
-                else:
-                    pix = 0
-                img.setPixel(x, y, pix)
-
-        pixmap = QPixmap.fromImage(img)
-
-        # rotate + flip map
-        t = QTransform()
-        t.rotate(-90)
-        pm = pixmap.transformed(t, Qt.SmoothTransformation)
-        flip = QTransform()
-        flip.scale(-1, 1)
-        self.rotated_pixmap = pm.transformed(flip)
+        # grayscale + rotate + flip as array ops (see map_raster.py)
+        self._gray = rasterize_occupancy(map_info, data)
+        self._pyramid = MapTilePyramid(self._gray)
+        self._grid_w = width
+        self._grid_h = height
 
         self.resolution = map_info["resolution"]
         self.origin_x = map_info["origin"]["position"]["x"]
         self.origin_y = map_info["origin"]["position"]["y"]
 
-        print("[Map] Ready, rotated size =", self.rotated_pixmap.size())
+        print(f"[Map] Ready, rotated size = {self._pyramid.width}x{self._pyramid.height}, "
+              f"{len(self._pyramid.levels)} levels")
 
         self.status.hide()
+        self._base_cache = None
         self.update()
 
-    def update_robot_pose(self, x, y, yaw_deg):
-        self.rx = x
-        self.ry = y
-        self.yaw = yaw_deg
-        self.update()
+    # Called for every /map_updates patch (or changed region of a new /map)
+    def apply_map_patch(self, rect, cells):
+        if self._pyramid is None:
+            return
 
-    def paintEvent(self, event):
-        super().paintEvent(event)
+        x, y, w, h = rect
+        col, row, dw, dh = grid_rect_to_display(self._grid_w, self._grid_h, x, y, w, h)
 
-        if self.rotated_pixmap is None:
-            return
+        # Re-render only the patch into the level-0 buffer, then refresh the
+        # pyramid levels / tiles it touches and just that part of the view.
+        self._gray[row:row + dh, col:col + dw] = orient_for_display(grid_to_gray(cells))
+        self._pyramid.update_region(col, row, dw, dh)
 
-        painter = QPainter(self)
-        r = self.rect()
+        dirty = self._map_rect_to_widget(col, row, dw, dh).intersected(self.rect())
+        if self._base_cache is not None and not dirty.isEmpty():
+            self._render_base(dirty)
+        self.update(dirty)
 
-        scaled = self.rotated_pixmap.scaled(
-            r.width(), r.height(),
-            Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
+    # ---------------- view geometry ----------------
 
-        x = (r.width() - scaled.width()) / 2
-        y = (r.height() - scaled.height()) / 2
-        painter.drawPixmap(int(x), int(y), scaled)
+    def _view_transform(self):
+        """(scale, ox, oy): screen px per map px and map top-left in widget px."""
+        r = self.rect()
+        mw, mh = self._pyramid.width, self._pyramid.height
+        scale = min(r.width() / mw, r.height() / mh) * self._zoom
+        ox = (r.width() - mw * scale) / 2 + self._pan.x()
+        oy = (r.height() - mh * scale) / 2 + self._pan.y()
+        return scale, ox, oy
+
+    def _map_rect_to_widget(self, col, row, w, h):
+        s, ox, oy = self._view_transform()
+        return QRect(
+            int(ox + col * s) - 1, int(oy + row * s) - 1,
+            int(w * s) + 3, int(h * s) + 3
+        )
 
-        # Draw robot arrow
-        map_w = self.rotated_pixmap.width()
-        map_h = self.rotated_pixmap.height()
+    def _robot_widget_pos(self):
+        s, ox, oy = self._view_transform()
+        map_w, map_h = self._pyramid.width, self._pyramid.height
 
         px_map = (self.rx - self.origin_x) / self.resolution - 0.5
         py_map = (self.ry - self.origin_y) / self.resolution - 0.5
 
         px_rot = (map_w - 1) - py_map
         py_rot = (map_h - 1) - px_map
-        #py_rot = px_map
 
-        sx = scaled.width() / map_w
-        sy = scaled.height() / map_h
+        return ox + px_rot * s, oy + py_rot * s
+
+    def _render_base(self, clip=None):
+        """(Re)draw the tile layer into the cache, optionally only `clip`."""
+        key = (self.width(), self.height(), self._zoom, self._pan.x(), self._pan.y())
+        if self._base_cache is None or self._base_key != key:
+            self._base_cache = QImage(self.size(), QImage.Format_ARGB32_Premultiplied)
+            self._base_key = key
+            clip = None
+
+        if clip is None:
+            clip = self.rect()
+
+        p = QPainter(self._base_cache)
+        p.setClipRect(clip)
+        p.setCompositionMode(QPainter.CompositionMode_Source)
+        p.fillRect(clip, Qt.transparent)
+        p.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        scale, ox, oy = self._view_transform()
+        self._pyramid.draw(p, scale, ox, oy, clip)
+        p.end()
+
+    # ---------------- robot overlay ----------------
 
-        px = x + px_rot * sx
-        py = y + py_rot * sy
+    def update_robot_pose(self, x, y, yaw_deg, stamp=None):
+        self.rx = x
+        self.ry = y
+        self.yaw = yaw_deg
+        self._pose_stamp = stamp
+
+        if self._pyramid is None:
+            return
+
+        # Repaint only where the arrow was and where it is now
+        px, py = self._robot_widget_pos()
+        r = self.ARROW_RADIUS
+        new_rect = QRect(int(px) - r, int(py) - r, 2 * r + 1, 2 * r + 1)
+        self.update(self._arrow_rect.united(new_rect))
+        self._arrow_rect = new_rect
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+
+        if self._pyramid is None:
+            return
+
+        key = (self.width(), self.height(), self._zoom, self._pan.x(), self._pan.y())
+        if self._base_cache is None or self._base_key != key:
+            self._render_base()
+
+        painter = QPainter(self)
+        clip = event.rect()
+        painter.drawImage(clip, self._base_cache, clip)
+
+        # Draw robot arrow (cheap overlay on top of the cached map layer)
+        px, py = self._robot_widget_pos()
 
         arrow = QPolygonF([
             QPointF(0, -10),
@@ -282,6 +449,7 @@ class MapViewWidget(QWidget):
         ])
 
         painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
         painter.translate(px, py)
         painter.rotate(-self.yaw)
         painter.setBrush(QColor(255, 0, 0))
@@ -289,6 +457,61 @@ class MapViewWidget(QWidget):
         painter.drawPolygon(arrow)
         painter.restore()
 
+        r = self.ARROW_RADIUS
+        self._arrow_rect = QRect(int(px) - r, int(py) - r, 2 * r + 1, 2 * r + 1)
+
+        if self._pose_stamp is not None:
+            self.pose_painted.emit(time.monotonic() - self._pose_stamp)
+            self._pose_stamp = None
+
+    # ---------------- zoom / pan ----------------
+
+    def wheelEvent(self, event):
+        if self._pyramid is None:
+            return
+
+        factor = 1.25 if event.angleDelta().y() > 0 else 1 / 1.25
+        new_zoom = min(max(self._zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        if new_zoom == self._zoom:
+            return
+
+        # Keep the map point under the cursor fixed
+        scale, ox, oy = self._view_transform()
+        cursor = event.pos()
+        mx = (cursor.x() - ox) / scale
+        my = (cursor.y() - oy) / scale
+
+        self._zoom = new_zoom
+        if self._zoom == self.MIN_ZOOM:
+            self._pan = QPointF(0, 0)
+        else:
+            scale, ox, oy = self._view_transform()
+            self._pan += QPointF(cursor.x() - (ox + mx * scale), cursor.y() - (oy + my * scale))
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self._zoom > self.MIN_ZOOM:
+            self._drag_start = (event.pos(), QPointF(self._pan))
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_start is not None:
+            start, pan = self._drag_start
+            self._pan = pan + QPointF(event.pos() - start)
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_start = None
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        # Reset to "fit to widget"
+        self._zoom = 1.0
+        self._pan = QPointF(0, 0)
+        self.update()
+        super().mouseDoubleClickEvent(event)
+
 
 # ---------------------- Telemetry Text -------------------------
 
@@ -484,9 +707,28 @@ class JoystickWidget(QWidget):
         layout.addWidget(pad, alignment=Qt.AlignCenter)
 
 
+# ---------------------- Telemetry Bridge ------------------------
+
+class TelemetryBridge(QObject):
+    """Re-emits Telemetry.bus events as Qt signals (queued onto the GUI thread)."""
+    connected = pyqtSignal()
+    pose_changed = pyqtSignal(float, float, float, float, float)
+    map_changed = pyqtSignal()
+    nav_status_changed = pyqtSignal(object)
+
+    def __init__(self, telemetry, parent=None):
+        super().__init__(parent)
+        telemetry.bus.subscribe(CONNECTED, lambda _: self.connected.emit())
+        telemetry.bus.subscribe(POSE, lambda pose: self.pose_changed.emit(*pose))
+        telemetry.bus.subscribe(MAP, lambda _: self.map_changed.emit())
+        telemetry.bus.subscribe(NAV_STATUS, self.nav_status_changed.emit)
+
+
 # ---------------------- Main Window ------------------------
 
 class MainWindow(QWidget):
+    goal_acknowledged = pyqtSignal(int, object)   # order id, move_base status or exception
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Vendobot Remote Control")
@@ -497,16 +739,12 @@ class MainWindow(QWidget):
         init_connection()
 
         # Telemetry backend (rosbridge)
-        from telemetry import Telemetry
-        self.telemetry = Telemetry()
+        self.telemetry = Telemetry(max_ui_rate_hz=TELEMETRY_MAX_UI_HZ)
         self._last_nav_code = None
 
         self._map_loaded_from_telemetry = False
-
-        # Poll telemetry in GUI thread
-        self.telemetry_timer = QTimer(self)
-        self.telemetry_timer.timeout.connect(self.refresh_telemetry_from_ros)
-        self.telemetry_timer.start(100)   # every 100 ms
+        self.pose_latency = LatencyStats()
+        self._last_polled_stamp = None
 
         # TELEOP STATE
         self.current_cmd = "stop"
@@ -527,23 +765,24 @@ class MainWindow(QWidget):
                 self.goal_sender = None
         else:
             print("[Queue] RosGoalSender not available; dispatch will only update DB.")
+        # Goal futures resolve on the rosbridge thread; handle them on the GUI thread
+        self.goal_acknowledged.connect(self.on_goal_acknowledged)
 
-        # Database connection
-        self.db_conn = None
+        # Database access (worker threads + small pool; never blocks the GUI)
+        self.db = None
         if psycopg2 is not None:
             try:
-                self.db_conn = psycopg2.connect(
-                    host=DB_HOST,
-                    port=DB_PORT,
-                    dbname=DB_NAME,
-                    user=DB_USER,
-                    password=DB_PASSWORD
+                self.db = DbWorker(
+                    DB_CONNECT_KWARGS,
+                    max_connections=DB_POOL_SIZE,
+                    statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+                    connect_timeout_s=DB_CONNECT_TIMEOUT_S,
+                    parent=self
                 )
-                self.db_conn.autocommit = True
-                print("[Queue] Connected to PostgreSQL.")
+                print("[Queue] PostgreSQL worker pool ready.")
             except Exception as e:
-                print(f"[Queue] ERROR connecting to DB: {e}")
-                self.db_conn = None
+                print(f"[Queue] ERROR setting up DB pool: {e}")
+                self.db = None
         else:
             print("[Queue] psycopg2 not installed; Delivery Queue disabled.")
 
@@ -569,13 +808,14 @@ class MainWindow(QWidget):
         self.build_queue_tab()
         self.build_logs_tab()
 
-        # Queue refresh timer (only if DB OK)
-        if self.db_conn is not None:
-            self.queue_refresh_timer = QTimer(self)
-            self.queue_refresh_timer.timeout.connect(self.refresh_delivery_queue)
-            self.queue_refresh_timer.start(2000)  # every 2 seconds
-        else:
-            self.queue_refresh_timer = None
+        self.map_widget.pose_painted.connect(self.record_pose_latency)
+        self.setup_telemetry()
+
+        # Queue follows NOTIFY events (only if DB OK)
+        self.queue_listener = None
+        self.queue_refresh_timer = None
+        if self.db is not None:
+            self.start_queue_listener()
 
     # ==========================================================
     # CONTROL TAB (Your existing UI moved here)
@@ -697,12 +937,14 @@ class MainWindow(QWidget):
         header.setStyleSheet("font-size: 20px; font-weight: 600; color: #333;")
         layout.addWidget(header)
 
-        # 1️⃣ CREATE TABLE FIRST
-        self.queue_table = QTableWidget()
-        self.queue_table.setColumnCount(6)
-        self.queue_table.setHorizontalHeaderLabels(
-            ["Order ID", "Address", "Location", "Status", "Created At", "Actions"]
-        )
+        # Model + painted action buttons: a status change touches one row
+        self.queue_model = DeliveryQueueModel(ROBOT_ID, self)
+        self.queue_table = QTableView()
+        self.queue_table.setModel(self.queue_model)
+
+        self.queue_actions = QueueActionDelegate(self.queue_table)
+        self.queue_actions.action_clicked.connect(self.on_queue_action)
+        self.queue_table.setItemDelegateForColumn(ACTIONS_COLUMN, self.queue_actions)
 
         # Column sizes
         header_view = self.queue_table.horizontalHeader()
@@ -712,154 +954,93 @@ class MainWindow(QWidget):
         header_view.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Status
         header_view.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Created
         header_view.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # Actions
+        self.queue_table.verticalHeader().setDefaultSectionSize(38)
 
-        self.queue_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.queue_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.queue_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.queue_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QTableView.SelectRows)
+        self.queue_table.setSelectionMode(QTableView.SingleSelection)
 
         layout.addWidget(self.queue_table)
 
-        if self.db_conn is None:
+        if self.db is None:
             warn = QLabel("Database connection not available. Queue is disabled.")
             warn.setStyleSheet("color: #b00; font-size:14px;")
             layout.addWidget(warn)
 
-    def refresh_delivery_queue(self):
-        if self.db_conn is None:
-            return
+    def start_queue_listener(self):
+        """Follow delivery_records_channel; fall back to a slow full resync."""
+        self.queue_listener = DeliveryNotifyListener(self.connect_db, self)
+        self.queue_listener.record_changed.connect(self.queue_model.apply_record)
+        self.queue_listener.record_deleted.connect(self.queue_model.remove_record)
+        self.queue_listener.resync_needed.connect(self.refresh_delivery_queue)
+        self.queue_listener.log_message.connect(self.log)
+        self.queue_listener.start()
 
-        try:
-            cur = self.db_conn.cursor()
-            cur.execute("""
-                SELECT id, address, dest_pos_x, dest_pos_y, status, created_at
-                FROM delivery_records
-                WHERE robot_id = %s
-                  AND status IN ('NEW','LOADING','READY','IN_PROGRESS')
-                ORDER BY created_at ASC
-            """, (ROBOT_ID,))
-            rows = cur.fetchall()
-            cur.close()
-        except Exception as e:
-            self.log(f"[Queue] Error fetching records: {e}")
-            return
-
-        self.queue_table.setRowCount(len(rows))
-
-        for row_idx, row in enumerate(rows):
-            order_id, address, dest_x, dest_y, status, created_at = row
+        # Safety net in case the NOTIFY trigger is missing or a payload is lost
+        self.queue_refresh_timer = QTimer(self)
+        self.queue_refresh_timer.timeout.connect(self.refresh_delivery_queue)
+        self.queue_refresh_timer.start(QUEUE_RESYNC_MS)
 
-            # Column 0: ID
-            self.queue_table.setItem(row_idx, 0, QTableWidgetItem(str(order_id)))
+    def connect_db(self):
+        return psycopg2.connect(connect_timeout=DB_CONNECT_TIMEOUT_S, **DB_CONNECT_KWARGS)
 
-            # Column 1: Address
-            self.queue_table.setItem(row_idx, 1, QTableWidgetItem(address or ""))
-
-            # Column 2: Location (address preferred, else coords, else Unknown)
-            if address and address.strip():
-                loc_str = address.strip()
-            else:
-                try:
-                    if dest_x is not None and dest_y is not None:
-                        loc_str = f"{float(dest_x):.2f}, {float(dest_y):.2f}"
-                    else:
-                        loc_str = "Unknown"
-                except Exception:
-                    loc_str = "Unknown"
-            self.queue_table.setItem(row_idx, 2, QTableWidgetItem(loc_str))
-
-            # Column 3: Status
-            self.queue_table.setItem(row_idx, 3, QTableWidgetItem(status or ""))
-
-            # Column 4: Created datetime
-            created_str = str(created_at) if created_at else ""
-            self.queue_table.setItem(row_idx, 4, QTableWidgetItem(created_str))
-
-            # Column 5: Actions
-            actions_widget = QWidget()
-            h = QHBoxLayout(actions_widget)
-            h.setContentsMargins(0, 0, 0, 0)
-            h.setSpacing(6)
-            h.addStretch()
-
-            # Buttons depending on status
-            if status == "NEW":
-                btn_start = QPushButton("Start Loading")
-                btn_start.setObjectName("QueueButton")
-                btn_start.setFixedHeight(30)
-                btn_start.clicked.connect(
-                    lambda _, oid=order_id: self.set_order_status(oid, "LOADING")
-                )
-                h.addWidget(btn_start)
-
-            elif status == "LOADING":
-                btn_ready = QPushButton("Mark Loaded")
-                btn_ready.setObjectName("QueueButton")
-                btn_ready.setFixedHeight(30)
-                btn_ready.clicked.connect(
-                    lambda _, oid=order_id: self.set_order_status(oid, "READY")
-                )
-                h.addWidget(btn_ready)
-
-            elif status == "READY":
-                btn_dispatch = QPushButton("Dispatch")
-                btn_dispatch.setObjectName("QueueButton")
-                btn_dispatch.setFixedHeight(30)
-                btn_dispatch.clicked.connect(
-                    lambda _, oid=order_id, x=dest_x, y=dest_y: self.dispatch_order(oid, x, y)
-                )
-                h.addWidget(btn_dispatch)
-
-            elif status == "IN_PROGRESS":
-                btn_delivered = QPushButton("Mark Delivered")
-                btn_delivered.setObjectName("QueueButton")
-                btn_delivered.setFixedHeight(30)
-                btn_delivered.clicked.connect(
-                    lambda _, oid=order_id: self.set_order_status(oid, "DELIVERED")
-                )
-                h.addWidget(btn_delivered)
+    def refresh_delivery_queue(self):
+        """Full resync of the queue; row-level diffs are applied to the model."""
+        if self.db is None:
+            return
 
-            h.addStretch()
-            self.queue_table.setCellWidget(row_idx, 5, actions_widget)
+        self.db.execute("""
+            SELECT id, robot_id, address, dest_pos_x, dest_pos_y, status, created_at
+            FROM delivery_records
+            WHERE robot_id = %s
+              AND status IN ('NEW','LOADING','READY','IN_PROGRESS')
+            ORDER BY created_at ASC
+        """, (ROBOT_ID,), fetch="all",
+            on_result=self.queue_model.sync,
+            on_error=lambda e: self.log(f"[Queue] Error fetching records: {e}"))
+
+    def on_queue_action(self, record, next_status):
+        if next_status == "IN_PROGRESS":
+            self.dispatch_order(record["id"], record.get("dest_pos_x"), record.get("dest_pos_y"))
+        else:
+            self.set_order_status(record["id"], next_status)
 
     def set_order_status(self, order_id, new_status):
-        if self.db_conn is None:
+        if self.db is None:
             QMessageBox.warning(self, "DB Error", "Database connection not available.")
             return
 
-        try:
-            cur = self.db_conn.cursor()
-            cur.execute("""
-                UPDATE delivery_records
-                SET status = %s,
-                    last_updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (new_status, order_id))
-            cur.close()
-            self.log(f"[Queue] Order {order_id} → {new_status}")
-            self.refresh_delivery_queue()
-        except Exception as e:
+        def failed(e):
             self.log(f"[Queue] Error updating order {order_id} to {new_status}: {e}")
             QMessageBox.critical(self, "DB Error", str(e))
 
+        self.db.execute("""
+            UPDATE delivery_records
+            SET status = %s,
+                last_updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (new_status, order_id),
+            on_result=lambda _: self.log(f"[Queue] Order {order_id} → {new_status}"),
+            on_error=failed)
+
     def dispatch_order(self, order_id, dest_x, dest_y):
-        if self.db_conn is None:
+        if self.db is None:
             QMessageBox.warning(self, "DB Error", "Database connection not available.")
             return
 
-        # Check if robot already has an IN_PROGRESS job
-        try:
-            cur = self.db_conn.cursor()
-            cur.execute("""
-                SELECT COUNT(*) FROM delivery_records
-                WHERE robot_id = %s AND status = 'IN_PROGRESS'
-            """, (ROBOT_ID,))
-            (count,) = cur.fetchone()
-            cur.close()
-        except Exception as e:
+        def failed(e):
             self.log(f"[Queue] Error checking active jobs: {e}")
             QMessageBox.critical(self, "DB Error", str(e))
-            return
 
+        # Check if robot already has an IN_PROGRESS job
+        self.db.execute("""
+            SELECT COUNT(*) AS count FROM delivery_records
+            WHERE robot_id = %s AND status = 'IN_PROGRESS'
+        """, (ROBOT_ID,), fetch="one",
+            on_result=lambda row: self._dispatch_if_idle(order_id, dest_x, dest_y, row["count"]),
+            on_error=failed)
+
+    def _dispatch_if_idle(self, order_id, dest_x, dest_y, count):
         if count > 0:
             QMessageBox.information(
                 self,
@@ -877,33 +1058,48 @@ class MainWindow(QWidget):
 
         yaw_deg = 0.0  # simple default; you can calculate based on path if needed
 
-        # Send goal via RosGoalSender (shared rosbridge)
+        # Send goal via RosGoalSender (shared rosbridge); move_base's answer
+        # arrives later through goal_acknowledged
         if self.goal_sender is not None:
+            self.log(f"[Queue] Dispatching order {order_id} → x={x:.2f}, y={y:.2f}, yaw={yaw_deg:.1f}")
             try:
-                self.log(f"[Queue] Dispatching order {order_id} → x={x:.2f}, y={y:.2f}, yaw={yaw_deg:.1f}")
-                self.goal_sender.send_goal(x, y, yaw_deg)
+                future = self.goal_sender.send_goal_async(x, y, yaw_deg, timeout=GOAL_ACK_TIMEOUT_S)
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
             except Exception as e:
                 self.log(f"[Queue] ERROR dispatching goal for order {order_id}: {e}")
                 QMessageBox.critical(self, "Dispatch Error", str(e))
                 return
+            future.add_done_callback(
+                lambda f: self.goal_acknowledged.emit(order_id, f.exception() or f.result())
+            )
         else:
             self.log(f"[Queue] dispatch_order: RosGoalSender not available; only updating DB.")
 
         # Update order status to IN_PROGRESS
-        try:
-            cur = self.db_conn.cursor()
-            cur.execute("""
-                UPDATE delivery_records
-                SET status = 'IN_PROGRESS',
-                    last_updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (order_id,))
-            cur.close()
-            self.refresh_delivery_queue()
-        except Exception as e:
+        def failed(e):
             self.log(f"[Queue] Error setting order {order_id} to IN_PROGRESS: {e}")
             QMessageBox.critical(self, "DB Error", str(e))
 
+        self.db.execute("""
+            UPDATE delivery_records
+            SET status = 'IN_PROGRESS',
+                last_updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (order_id,), on_error=failed)
+
+    def on_goal_acknowledged(self, order_id, outcome):
+        """move_base status for a dispatched order (or the error waiting for it)."""
+        if isinstance(outcome, Exception):
+            self.log(f"[Queue] Order {order_id}: goal not acknowledged by move_base: {outcome}")
+            return
+
+        name = GOAL_STATUS_NAMES.get(outcome, str(outcome))
+        if outcome in (1, 3):    # ACTIVE, SUCCEEDED
+            self.log(f"[Queue] Order {order_id}: move_base {name}.")
+        else:
+            self.log(f"[Queue] Order {order_id}: WARNING move_base {name}.")
+
     # ==========================================================
     # LOGS TAB
     # ==========================================================
@@ -936,45 +1132,105 @@ class MainWindow(QWidget):
             print(text)
 
     # ==========================================================
-    # TELEMETRY polling in GUI thread
+    # TELEMETRY (events from Telemetry.bus, or legacy polling)
     # ==========================================================
+    def setup_telemetry(self):
+        if TELEMETRY_MODE == "poll":
+            self.telemetry_timer = QTimer(self)
+            self.telemetry_timer.timeout.connect(self.refresh_telemetry_from_ros)
+            self.telemetry_timer.start(100)   # every 100 ms
+            return
+
+        self.telemetry_bridge = TelemetryBridge(self.telemetry, self)
+        self.telemetry_bridge.connected.connect(self.on_ros_connected)
+        self.telemetry_bridge.map_changed.connect(self.on_map_changed)
+        self.telemetry_bridge.pose_changed.connect(self.on_pose_changed)
+        self.telemetry_bridge.nav_status_changed.connect(self.check_navigation_status)
+
+        # Catch up on anything published before we subscribed
+        if self.telemetry.ros.is_connected:
+            self.on_ros_connected()
+        if self.telemetry.map_state.ready:
+            self.on_map_changed()
+
+    def on_ros_connected(self):
+        if not self._map_loaded_from_telemetry:
+            self.map_widget.set_status("Waiting for /map…")
+
+    def on_map_changed(self):
+        if self._map_loaded_from_telemetry:
+            self.apply_map_changes()
+            return
+
+        map_info, map_data = self.telemetry.get_map()
+        if map_info is None:
+            return
+
+        # Map arrived!
+        self.map_widget.set_status("Map received, rendering…")
+        print("[Main] Loading map now...")
+        self.map_widget.load_from_occupancy(map_info, map_data)
+        self._map_loaded_from_telemetry = True
+
+    def on_pose_changed(self, x, y, yaw, speed, stamp=None):
+        self.map_widget.update_robot_pose(x, y, yaw, stamp)
+
+        tele = self.findChild(TelemetryWidget)
+        if tele:
+            tele.text.setText(
+                f"X: {x:.2f}\nY: {y:.1f}°\nYaw: {yaw:.1f}°\nSpeed: {speed:.2f}"
+            )
+
+    def record_pose_latency(self, seconds):
+        self.pose_latency.add(seconds)
+        if len(self.pose_latency) % LATENCY_REPORT_EVERY == 0:
+            self.log(f"[Telemetry] odom→pixel latency ({TELEMETRY_MODE}): {self.pose_latency.summary()}")
+
     def refresh_telemetry_from_ros(self):
+        """Legacy polling path (TELEMETRY_MODE = "poll")."""
         # Map load
         if not self._map_loaded_from_telemetry:
             if not self.telemetry.ros.is_connected:
                 self.map_widget.set_status("Connecting to ROS…")
                 return
 
-            map_info, map_data = self.telemetry.get_map()
-
-            if map_info is None:
+            self.on_map_changed()
+            if not self._map_loaded_from_telemetry:
                 self.map_widget.set_status("Waiting for /map…")
                 return
-
-            # Map arrived!
-            self.map_widget.set_status("Map received, rendering…")
-            print("[Main] Loading map now...")
-            self.map_widget.load_from_occupancy(map_info, map_data)
-            self._map_loaded_from_telemetry = True
+        else:
+            self.apply_map_changes()
 
         # Pose update
         pose = self.telemetry.get_pose()
         if pose:
-            x, y, yaw, speed = pose
-            self.map_widget.update_robot_pose(x, y, yaw)
+            # Only time a pose the first time it is picked up
+            stamp = self.telemetry.pose_stamp
+            if stamp == self._last_polled_stamp:
+                stamp = None
+            else:
+                self._last_polled_stamp = stamp
+            self.on_pose_changed(*pose, stamp)
 
-            tele = self.findChild(TelemetryWidget)
-            if tele:
-                tele.text.setText(
-                    f"X: {x:.2f}\nY: {y:.1f}°\nYaw: {yaw:.1f}°\nSpeed: {speed:.2f}"
-                )
-        
         self.check_navigation_status()
 
+    def apply_map_changes(self):
+        """Push live SLAM refinements into the map widget."""
+        map_state = self.telemetry.map_state
+        full_reset, rects = map_state.take_changes()
+
+        if full_reset:
+            # Map geometry changed (new SLAM session / resized map)
+            map_info, map_data = map_state.snapshot()
+            self.map_widget.load_from_occupancy(map_info, map_data)
+            return
 
+        for rect in rects:
+            self.map_widget.apply_map_patch(rect, map_state.region(rect))
 
-    def check_navigation_status(self):
-        msg = self.telemetry.get_nav_status()
+    def check_navigation_status(self, msg=None):
+        if msg is None:
+            msg = self.telemetry.get_nav_status()
         if not msg:
             return
 
@@ -1009,38 +1265,39 @@ class MainWindow(QWidget):
 
     
     def auto_mark_delivered(self):
-        if not self.db_conn:
+        if self.db is None:
             return
 
-        cur = self.db_conn.cursor()
-        cur.execute("""
+        self.db.execute("""
             UPDATE delivery_records
             SET status='DELIVERED',
                 last_updated_at = CURRENT_TIMESTAMP
             WHERE status='IN_PROGRESS' AND robot_id=%s
-        """, (ROBOT_ID,))
-        cur.close()
-
-        self.refresh_delivery_queue()
-        self.log("[Queue] Active delivery marked as DELIVERED.")
+        """, (ROBOT_ID,),
+            on_result=lambda _: self.log("[Queue] Active delivery marked as DELIVERED."),
+            on_error=lambda e: self.log(f"[Queue] Error marking delivery as DELIVERED: {e}"))
 
 
     def auto_mark_failed(self):
-        if not self.db_conn:
+        if self.db is None:
             return
 
-        cur = self.db_conn.cursor()
-        cur.execute("""
+        self.db.execute("""
             UPDATE delivery_records
             SET status='FAILED',
                 last_updated_at = CURRENT_TIMESTAMP
             WHERE status='FAILED' AND robot_id=%s
-        """, (ROBOT_ID,))
-        cur.close()
-
-        self.refresh_delivery_queue()
-        self.log("[Queue] Active delivery marked as FAILED.")
+        """, (ROBOT_ID,),
+            on_result=lambda _: self.log("[Queue] Active delivery marked as FAILED."),
+            on_error=lambda e: self.log(f"[Queue] Error marking delivery as FAILED: {e}"))
 
+    def closeEvent(self, event):
+        if self.queue_listener is not None:
+            self.queue_listener.stop()
+        if self.db is not None:
+            # Cancels in-flight statements so shutdown never waits on the DB
+            self.db.close()
+        super().closeEvent(event)
 
 
     # ---------------- TELEOP LOGIC --------------------
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+NumPy rasterizer for nav_msgs/OccupancyGrid maps.
+
+Turns the flat `data` list of an OccupancyGrid into the grayscale image the
+Map View shows (unknown=127, free=255, occupied=0), already rotated -90° and
+flipped horizontally the same way MapViewWidget used to do it with QTransform.
+
+Run this file directly to benchmark it against the old per-pixel QImage loop:
+
+    python3 map_raster.py --size 4000
+"""
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+UNKNOWN_GRAY = 127
+FREE_GRAY = 255
+OCCUPIED_GRAY = 0
+
+# Lookup table indexed by the occupancy value reinterpreted as uint8:
+# -1 -> 255 (unknown), 0 -> free, 1..100 -> occupied.
+_GRAY_LUT = np.full(256, OCCUPIED_GRAY, dtype=np.uint8)
+_GRAY_LUT[0] = FREE_GRAY
+_GRAY_LUT[255] = UNKNOWN_GRAY
+
+
+def occupancy_to_grid(map_info, data):
+    """Return the occupancy data as an int8 array of shape (height, width)."""
+    width = map_info["width"]
+    height = map_info["height"]
+    grid = np.asarray(data, dtype=np.int8)
+    return grid.reshape(height, width)
+
+
+def grid_to_gray(grid):
+    """Map occupancy values (-1/0/1..100) to grayscale in one LUT lookup."""
+    return _GRAY_LUT[grid.view(np.uint8)]
+
+
+def orient_for_display(gray):
+    """
+    Rotate -90° and flip horizontally, as array ops.
+
+    Equivalent to QTransform().rotate(-90) followed by scale(-1, 1), which
+    maps grid cell (x, y) to display pixel (H-1-y, W-1-x).
+    """
+    return np.ascontiguousarray(gray[::-1, ::-1].T)
+
+
+def grid_rect_to_display(grid_w, grid_h, x, y, w, h):
+    """Map a grid rectangle (x, y, w, h) to its (col, row, w, h) in display space."""
+    return (grid_h - y - h, grid_w - x - w, h, w)
+
+
+def rasterize_occupancy(map_info, data):
+    """OccupancyGrid -> display-oriented uint8 grayscale array."""
+    return orient_for_display(grid_to_gray(occupancy_to_grid(map_info, data)))
+
+
+def gray_to_qimage(gray):
+    """
+    Wrap a C-contiguous uint8 array in a Grayscale8 QImage without copying.
+
+    The returned QImage references the array's memory, so the array is kept
+    alive on the image object; don't modify it while the image is in use
+    unless that is what you want.
+    """
+    h, w = gray.shape
+    img = QImage(gray.data, w, h, gray.strides[0], QImage.Format_Grayscale8)
+    img._np_buffer = gray
+    return img
+
+
+# ---------------------- Benchmark ----------------------
+
+def _legacy_rasterize(map_info, data):
+    """The original MapViewWidget loop, kept only for the benchmark."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QColor, QTransform
+
+    width = map_info["width"]
+    height = map_info["height"]
+
+    img = QImage(width, height, QImage.Format_Indexed8)
+    img.setColorTable([QColor(i, i, i).rgb() for i in range(256)])
+
+    for y in range(height):
+        base = y * width
+        for x in range(width):
+            v = data[base + x]
+            if v == -1:
+                pix = 127
+            elif v == 0:
+                pix = 255
+            else:
+                pix = 0
+            img.setPixel(x, y, pix)
+
+    t = QTransform()
+    t.rotate(-90)
+    img = img.transformed(t, Qt.SmoothTransformation)
+    flip = QTransform()
+    flip.scale(-1, 1)
+    return img.transformed(flip)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    from PyQt5.QtWidgets import QApplication
+
+    parser = argparse.ArgumentParser(description="Benchmark the occupancy rasterizer.")
+    parser.add_argument("--size", type=int, default=2000, help="Map is size x size cells")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the NumPy path")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    rng = np.random.default_rng(0)
+    n = args.size
+    data = rng.choice([-1, 0, 100], size=n * n, p=[0.3, 0.6, 0.1]).tolist()
+    info = {"width": n, "height": n}
+
+    t0 = time.perf_counter()
+    gray = rasterize_occupancy(info, data)
+    img = gray_to_qimage(gray)
+    t_np = time.perf_counter() - t0
+    print(f"[Bench] numpy  {n}x{n}: {t_np * 1000:.1f} ms")
+
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        legacy = _legacy_rasterize(info, data)
+        t_legacy = time.perf_counter() - t0
+        print(f"[Bench] legacy {n}x{n}: {t_legacy * 1000:.1f} ms ({t_legacy / t_np:.0f}x slower)")
+
+        same = legacy.convertToFormat(QImage.Format_Grayscale8) == img
+        print(f"[Bench] output identical: {same}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Live occupancy-grid state shared between the ROS thread and the Qt UI.
+
+Holds the latest map as a persistent int8 array. Full /map messages replace
+it (or, if the geometry is unchanged, only mark the bounding box of the
+cells that actually changed), and map_msgs/OccupancyGridUpdate messages from
+/map_updates are patched in place. The UI drains the accumulated dirty
+rectangles with take_changes() and re-renders only those regions.
+"""
+
+import threading
+
+import numpy as np
+
+from map_raster import occupancy_to_grid
+
+
+def _same_geometry(a, b):
+    if a is None or b is None:
+        return False
+    return (
+        a["width"] == b["width"]
+        and a["height"] == b["height"]
+        and a["resolution"] == b["resolution"]
+        and a["origin"]["position"] == b["origin"]["position"]
+    )
+
+
+def _changed_rect(old, new):
+    """Bounding box (x, y, w, h) of cells that differ, or None."""
+    diff = old != new
+    rows = np.flatnonzero(diff.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    y0, y1 = int(rows[0]), int(rows[-1]) + 1
+    x0, x1 = int(cols[0]), int(cols[-1]) + 1
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class MapState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._info = None
+        self._grid = None
+        self._full_reset = False
+        self._dirty = []
+
+    # ---------------- ROS thread ----------------
+
+    def set_full(self, info, data):
+        """Apply a full nav_msgs/OccupancyGrid. Returns True if anything changed."""
+        grid = np.array(occupancy_to_grid(info, data))
+
+        with self._lock:
+            if not self._full_reset and _same_geometry(self._info, info):
+                rect = _changed_rect(self._grid, grid)
+                self._info = info
+                self._grid = grid
+                if rect is None:
+                    return False
+                self._dirty.append(rect)
+                return True
+
+            self._info = info
+            self._grid = grid
+            self._full_reset = True
+            self._dirty = []
+            return True
+
+    def apply_update(self, msg):
+        """Patch a map_msgs/OccupancyGridUpdate into the grid. Returns True if applied."""
+        x, y = msg["x"], msg["y"]
+        w, h = msg["width"], msg["height"]
+        if w <= 0 or h <= 0:
+            return False
+
+        patch = np.asarray(msg["data"], dtype=np.int8).reshape(h, w)
+
+        with self._lock:
+            if self._grid is None:
+                # Nothing to patch yet; the next full /map will cover it.
+                return False
+
+            gh, gw = self._grid.shape
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + w, gw), min(y + h, gh)
+            if x0 >= x1 or y0 >= y1:
+                return False
+
+            self._grid[y0:y1, x0:x1] = patch[y0 - y:y1 - y, x0 - x:x1 - x]
+            self._dirty.append((x0, y0, x1 - x0, y1 - y0))
+            return True
+
+    # ---------------- UI thread ----------------
+
+    @property
+    def ready(self):
+        with self._lock:
+            return self._grid is not None
+
+    def snapshot(self):
+        """Return (info, grid copy) and clear pending changes, or (None, None)."""
+        with self._lock:
+            if self._grid is None:
+                return None, None
+            self._full_reset = False
+            self._dirty = []
+            return self._info, self._grid.copy()
+
+    def take_changes(self):
+        """
+        Drain pending changes.
+
+        Returns (full_reset, rects). If full_reset is True the caller should
+        reload from snapshot(); otherwise rects is a list of (x, y, w, h)
+        grid rectangles that changed since the last call.
+        """
+        with self._lock:
+            if self._full_reset:
+                return True, []
+            rects, self._dirty = self._dirty, []
+            return False, rects
+
+    def region(self, rect):
+        """Copy of the grid cells inside (x, y, w, h)."""
+        x, y, w, h = rect
+        with self._lock:
+            return self._grid[y:y + h, x:x + w].copy()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution tile pyramid for the Map View.
+
+Level 0 is the display-oriented grayscale map from map_raster.py; every
+further level halves both dimensions (2x2 box filter) until the map fits in
+one tile. Tiles are TILE_SIZE x TILE_SIZE QPixmaps built lazily the first
+time they become visible, so painting only ever touches the tiles that are
+on screen, at the level closest to the current zoom.
+"""
+
+import math
+
+import numpy as np
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QPixmap
+
+from map_raster import gray_to_qimage
+
+TILE_SIZE = 256
+
+
+def _downsample(a):
+    """Halve an uint8 image with a 2x2 box filter (edge-padded if odd)."""
+    h, w = a.shape
+    if h % 2 or w % 2:
+        a = np.pad(a, ((0, h % 2), (0, w % 2)), mode="edge")
+    s = a.reshape(a.shape[0] // 2, 2, a.shape[1] // 2, 2).astype(np.uint16).sum(axis=(1, 3))
+    return ((s + 2) >> 2).astype(np.uint8)
+
+
+class MapTilePyramid:
+    def __init__(self, gray):
+        """`gray` is the level-0 display array; it is shared, not copied."""
+        self.levels = [gray]
+        while max(self.levels[-1].shape) > TILE_SIZE:
+            self.levels.append(_downsample(self.levels[-1]))
+        self._tiles = {}
+
+    @property
+    def width(self):
+        return self.levels[0].shape[1]
+
+    @property
+    def height(self):
+        return self.levels[0].shape[0]
+
+    def level_for_scale(self, scale):
+        """Coarsest level that still has at least one texel per screen pixel."""
+        if scale >= 1.0:
+            return 0
+        level = int(math.floor(math.log2(1.0 / scale)))
+        return min(level, len(self.levels) - 1)
+
+    def tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        pm = self._tiles.get(key)
+        if pm is None:
+            src = self.levels[level]
+            cells = np.ascontiguousarray(
+                src[ty * TILE_SIZE:(ty + 1) * TILE_SIZE, tx * TILE_SIZE:(tx + 1) * TILE_SIZE]
+            )
+            pm = QPixmap.fromImage(gray_to_qimage(cells))
+            self._tiles[key] = pm
+        return pm
+
+    def update_region(self, col, row, w, h):
+        """
+        Level 0 changed inside (col, row, w, h): rebuild that region on the
+        coarser levels and drop every cached tile it touches.
+        """
+        c0, r0, c1, r1 = col, row, col + w, row + h
+        for level in range(len(self.levels)):
+            if level > 0:
+                c0, r0 = c0 // 2, r0 // 2
+                c1, r1 = (c1 + 1) // 2, (r1 + 1) // 2
+                prev = self.levels[level - 1]
+                self.levels[level][r0:r1, c0:c1] = _downsample(
+                    prev[2 * r0:2 * r1, 2 * c0:2 * c1]
+                )
+
+            for ty in range(r0 // TILE_SIZE, (r1 - 1) // TILE_SIZE + 1):
+                for tx in range(c0 // TILE_SIZE, (c1 - 1) // TILE_SIZE + 1):
+                    self._tiles.pop((level, tx, ty), None)
+
+    def draw(self, painter, scale, ox, oy, clip):
+        """
+        Draw the visible tiles.
+
+        `scale` is screen pixels per level-0 pixel, (ox, oy) the screen
+        position of the map's top-left corner and `clip` the QRect to fill.
+        """
+        level = self.level_for_scale(scale)
+        step = TILE_SIZE << level            # level-0 pixels per tile
+        lh, lw = self.levels[level].shape
+
+        # Visible part of the map in level-0 pixels
+        x0 = max(0.0, (clip.left() - ox) / scale)
+        y0 = max(0.0, (clip.top() - oy) / scale)
+        x1 = min(float(self.width), (clip.right() + 1 - ox) / scale)
+        y1 = min(float(self.height), (clip.bottom() + 1 - oy) / scale)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        for ty in range(int(y0) // step, (int(math.ceil(y1)) - 1) // step + 1):
+            for tx in range(int(x0) // step, (int(math.ceil(x1)) - 1) // step + 1):
+                if tx * TILE_SIZE >= lw or ty * TILE_SIZE >= lh:
+                    continue
+                pm = self.tile(level, tx, ty)
+
+                # Snap both edges to whole pixels so neighbouring tiles meet exactly
+                left = round(ox + tx * step * scale)
+                top = round(oy + ty * step * scale)
+                right = round(ox + (tx * step + (pm.width() << level)) * scale)
+                bottom = round(oy + (ty * step + (pm.height() << level)) * scale)
+
+                painter.drawPixmap(
+                    QRectF(left, top, right - left, bottom - top),
+                    pm,
+                    QRectF(0, 0, pm.width(), pm.height())
+                )
@@ -12,7 +12,9 @@ API_BASE_URL = "http://192.168.2.129:8000"
 ROBOT_ID = 1
 
 # 3. Settings
-SYNC_INTERVAL = 1.0
+# Poses go to the backend's in-memory buffer (POST /robots/positions), which
+# writes them to the database once per flush interval regardless of this rate.
+SYNC_INTERVAL = 0.1
 
 class MapUpdate:
     def __init__(self):
@@ -21,6 +23,7 @@ class MapUpdate:
         self.latest_y = 0.0
         self.lock = threading.Lock()
         self.running = True
+        self.http = requests.Session()
 
     def start(self):
         print(f"[Agent] Connecting to Robot at {ROBOT_IP}...")
@@ -63,16 +66,17 @@ class MapUpdate:
             y = self.latest_y
 
         try:
-            url = f"{API_BASE_URL}/robots/{ROBOT_ID}/position"
-            payload = {
+            url = f"{API_BASE_URL}/robots/positions"
+            payload = [{
+                "robot_id": ROBOT_ID,
                 "current_pos_x": x,
                 "current_pos_y": y
-            }
+            }]
             
-            # Send PUT request
-            response = requests.put(url, json=payload, timeout=0.5)
+            # Send POST request (reused keep-alive connection)
+            response = self.http.post(url, json=payload, timeout=0.5)
             
-            if response.status_code == 200:
+            if response.status_code == 202:
                 print(f"[Sync] OK -> Pos: ({x:.2f}, {y:.2f})")
             else:
                 print(f"[Sync] API Error: {response.status_code}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Minimal asyncio rosbridge client.
+
+Speaks just enough of the rosbridge v2 JSON protocol (advertise, publish,
+subscribe) over one persistent websocket per robot. Topics are advertised
+once per connection instead of once per message, and the connection is
+re-established (and re-advertised / re-subscribed) automatically if the
+robot drops off the network.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+
+class RosbridgeClient:
+    RECONNECT_DELAY = 2.0
+    # Give rosbridge time to create the publishers before the first message,
+    # otherwise move_base may not be connected yet and drops it.
+    ADVERTISE_SETTLE = 0.5
+
+    def __init__(self, host, port=9090, name=None):
+        self.url = f"ws://{host}:{port}"
+        self.name = name or self.url
+        self._ws = None
+        self._ready = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._advertised = {}       # topic -> msg type
+        self._subscriptions = {}    # topic -> (msg type, callback)
+        self._task = None
+
+    @property
+    def is_connected(self):
+        return self._ready.is_set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait_connected(self, timeout=None):
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    # ---------------- topics ----------------
+
+    async def advertise(self, topic, msg_type):
+        self._advertised[topic] = msg_type
+        if self._ws is not None:
+            await self._send({"op": "advertise", "topic": topic, "type": msg_type})
+
+    async def subscribe(self, topic, msg_type, callback):
+        """callback(msg) runs on the event loop for every message on topic."""
+        self._subscriptions[topic] = (msg_type, callback)
+        if self._ws is not None:
+            await self._send({"op": "subscribe", "topic": topic, "type": msg_type})
+
+    async def publish(self, topic, msg, timeout=5.0):
+        """Publish on an advertised topic, waiting up to timeout for the connection."""
+        await self.wait_connected(timeout)
+        await self._send({"op": "publish", "topic": topic, "msg": msg})
+
+    # ---------------- connection ----------------
+
+    async def _send(self, payload):
+        async with self._send_lock:
+            await self._ws.send(json.dumps(payload))
+
+    async def _run(self):
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self._ws = ws
+                    for topic, msg_type in self._advertised.items():
+                        await self._send({"op": "advertise", "topic": topic, "type": msg_type})
+                    for topic, (msg_type, _) in self._subscriptions.items():
+                        await self._send({"op": "subscribe", "topic": topic, "type": msg_type})
+                    if self._advertised:
+                        await asyncio.sleep(self.ADVERTISE_SETTLE)
+
+                    self._ready.set()
+                    print(f"[Rosbridge] Connected to {self.name}.")
+
+                    async for raw in ws:
+                        self._on_message(raw)
+
+                print(f"[Rosbridge] {self.name} closed the connection.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Rosbridge] {self.name} unavailable: {e}")
+            finally:
+                self._ready.clear()
+                self._ws = None
+
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    def _on_message(self, raw):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        if data.get("op") != "publish":
+            return
+
+        sub = self._subscriptions.get(data.get("topic"))
+        if sub is None:
+            return
+        try:
+            sub[1](data.get("msg"))
+        except Exception as e:
+            print(f"[Rosbridge] Error in callback for {data.get('topic')}: {e}")
@@ -7,22 +7,29 @@ Supports two modes:
  - CLI mode: create its own Ros connection, send a goal, and exit
 """
 
-import math
+import threading
 import time
 import uuid
+from concurrent.futures import Future
 
 import roslibpy
 
+from goal_msg import make_goal_msg
 
-def yaw_to_quaternion(yaw_deg: float):
-    """Convert yaw in degrees to a simple quaternion around Z."""
-    yaw_rad = math.radians(yaw_deg)
-    return {
-        'x': 0.0,
-        'y': 0.0,
-        'z': math.sin(yaw_rad / 2.0),
-        'w': math.cos(yaw_rad / 2.0),
-    }
+
+# actionlib_msgs/GoalStatus
+STATUS_NAMES = {
+    0: "PENDING", 1: "ACTIVE", 2: "PREEMPTED", 3: "SUCCEEDED", 4: "ABORTED",
+    5: "REJECTED", 6: "PREEMPTING", 7: "RECALLING", 8: "RECALLED", 9: "LOST",
+}
+# Statuses that resolve a send_goal_async() future
+RESOLVING_STATUSES = {1, 2, 3, 4, 5, 8}
+
+# Seconds to wait for move_base's first status before a goal's future fails
+GOAL_TIMEOUT_S = 10.0
+# Give rosbridge time to create the publishers before the first message,
+# otherwise move_base may not be connected yet and drops it.
+ADVERTISE_SETTLE = 0.5
 
 
 class RosGoalSender:
@@ -53,6 +60,13 @@ class RosGoalSender:
             print(f"[RosGoalSender] Connecting to rosbridge at {robot_ip}:{port} ...")
             self.ros.run(run_in_thread=True)
 
+        self._pending_lock = threading.Lock()
+        self._pending = {}           # goal id -> Future
+        self._ready_at = None        # monotonic time the publishers were (re)advertised
+        self._publish_lock = threading.Lock()
+        self._queued = []            # goals waiting for the advertisements to settle
+        self._setup_topics()
+
     def ensure_connected(self):
         """Ensure rosbridge is connected; only tries to reconnect if we own it."""
         if self.ros.is_connected:
@@ -65,86 +79,164 @@ class RosGoalSender:
         print("[RosGoalSender] Reconnecting rosbridge...")
         self.ros.run(run_in_thread=True)
 
-    def send_goal(self, x: float, y: float, yaw_deg: float):
-        """Send a MoveBaseActionGoal to /move_base/goal using the existing rosbridge client."""
-        print("\n===== Sending Goal =====")
-        print(f"Goal: x={x}, y={y}, yaw={yaw_deg}°")
+    # ---------------- publishers / status ----------------
 
-        self.ensure_connected()
-        if not self.ros.is_connected:
-            print("[RosGoalSender] ERROR: rosbridge is not connected; aborting goal.")
+    def _setup_topics(self):
+        """
+        Advertise the goal publishers and subscribe to move_base's status
+        once, up front. roslibpy sends both when the connection is ready
+        and again after every reconnect.
+        """
+        self._cancel_pub = roslibpy.Topic(self.ros, '/move_base/cancel', 'actionlib_msgs/GoalID')
+        self._goal_pub = roslibpy.Topic(self.ros, '/move_base/goal', 'move_base_msgs/MoveBaseActionGoal')
+        self._publishers = [self._cancel_pub, self._goal_pub]
+        for topic in self._publishers:
+            topic.advertise()
+
+        status = roslibpy.Topic(self.ros, '/move_base/status', 'actionlib_msgs/GoalStatusArray')
+        status.subscribe(self._on_status)
+        result = roslibpy.Topic(self.ros, '/move_base/result', 'move_base_msgs/MoveBaseActionResult')
+        result.subscribe(self._on_result)
+        self._status_topics = [status, result]
+
+        self.ros.on_ready(self._on_ready, run_in_thread=False)
+        self.ros.on('close', self._on_close)
+
+    def _on_ready(self):
+        self._ready_at = time.monotonic()
+
+    def _on_close(self, *args):
+        # The topics re-advertise on the next connection; time the settle from it
+        self._ready_at = None
+        self.ros.on_ready(self._on_ready, run_in_thread=False)
+
+    def _settle_delay(self):
+        """Seconds until the advertisements have settled on the current connection."""
+        if self._ready_at is None:
+            return ADVERTISE_SETTLE
+        return max(0.0, ADVERTISE_SETTLE - (time.monotonic() - self._ready_at))
+
+    def _on_status(self, msg):
+        for st in msg.get('status_list', []):
+            self._resolve(st.get('goal_id', {}).get('id'), st.get('status'))
+
+    def _on_result(self, msg):
+        st = msg.get('status', {})
+        self._resolve(st.get('goal_id', {}).get('id'), st.get('status'))
+
+    def _resolve(self, goal_id, status):
+        if status not in RESOLVING_STATUSES:
             return
+        with self._pending_lock:
+            future = self._pending.pop(goal_id, None)
+        if future is not None and not future.done():
+            future.set_result(status)
 
-        # 1. Cancel previous goal
-        cancel_pub = roslibpy.Topic(self.ros, '/move_base/cancel', 'actionlib_msgs/GoalID')
-        cancel_pub.advertise()
-        cancel_msg = {'id': ''}
-        cancel_pub.publish(roslibpy.Message(cancel_msg))
-        time.sleep(0.1)
-        cancel_pub.unadvertise()
+    def _expire(self, goal_id):
+        with self._pending_lock:
+            future = self._pending.pop(goal_id, None)
+        if future is not None and not future.done():
+            future.set_exception(TimeoutError(f"no move_base status for goal {goal_id}"))
 
-        # 2. Build quaternion
-        quat = yaw_to_quaternion(yaw_deg)
+    # ---------------- sending ----------------
 
-        # 3. Build goal ID
+    def send_goal_async(self, x: float, y: float, yaw_deg: float, timeout: float = GOAL_TIMEOUT_S):
+        """
+        Publish a MoveBaseActionGoal without blocking.
+
+        Returns a concurrent.futures.Future (with a `goal_id` attribute) that
+        resolves to the first actionlib status move_base reports for this
+        goal among ACTIVE / SUCCEEDED / ABORTED (or REJECTED / PREEMPTED /
+        RECALLED), or fails with TimeoutError / ConnectionError.
+        Callbacks added to it run on the rosbridge thread.
+
+        With timeout=None the goal is not tracked: the future resolves to
+        None once the goal is queued for publishing.
+        """
+        future = Future()
         goal_id = str(uuid.uuid4())
+        future.goal_id = goal_id
+
+        self.ensure_connected()
+        if not self.ros.is_connected:
+            future.set_exception(ConnectionError("rosbridge is not connected"))
+            return future
+
+        if timeout:
+            with self._pending_lock:
+                self._pending[goal_id] = future
+            timer = threading.Timer(timeout, self._expire, args=(goal_id,))
+            timer.daemon = True
+            timer.start()
+
+        with self._publish_lock:
+            delay = self._settle_delay()
+            if delay > 0 or self._queued:
+                # Publish after the settle, in the order the goals were sent
+                self._queued.append((goal_id, x, y, yaw_deg))
+                if len(self._queued) == 1:
+                    timer = threading.Timer(delay, self._publish_queued)
+                    timer.daemon = True
+                    timer.start()
+            else:
+                self._publish_goal(goal_id, x, y, yaw_deg)
+        if not timeout:
+            future.set_result(None)
+        return future
+
+    def _publish_queued(self):
+        with self._publish_lock:
+            goals, self._queued = self._queued, []
+            for goal in goals:
+                self._publish_goal(*goal)
+
+    def _publish_goal(self, goal_id, x, y, yaw_deg):
+        # Cancel previous goal, then publish the new one
+        self._cancel_pub.publish(roslibpy.Message({'id': ''}))
+        print(f"[RosGoalSender] Publishing goal ID: {goal_id} (x={x}, y={y}, yaw={yaw_deg}°)")
+        self._goal_pub.publish(roslibpy.Message(make_goal_msg(x, y, yaw_deg, goal_id)))
 
-        # 4. Build MoveBaseActionGoal message
-        goal_msg = {
-            'header': {
-                'seq': 0,
-                'stamp': {'secs': 0, 'nsecs': 0},
-                'frame_id': ''
-            },
-            'goal_id': {
-                'stamp': {'secs': 0, 'nsecs': 0},
-                'id': goal_id
-            },
-            'goal': {
-                'target_pose': {
-                    'header': {'frame_id': 'map'},
-                    'pose': {
-                        'position': {
-                            'x': float(x),
-                            'y': float(y),
-                            'z': 0.0
-                        },
-                        'orientation': quat
-                    }
-                }
-            }
-        }
-
-        # 5. Publish goal
-        goal_pub = roslibpy.Topic(self.ros, '/move_base/goal', 'move_base_msgs/MoveBaseActionGoal')
-        goal_pub.advertise()
-        print(f"[RosGoalSender] Publishing goal ID: {goal_id}")
-        goal_pub.publish(roslibpy.Message(goal_msg))
-        time.sleep(0.1)
-        goal_pub.unadvertise()
-
-        print("[RosGoalSender] Goal sent.\n")
+    def send_goal(self, x: float, y: float, yaw_deg: float):
+        """Fire-and-forget variant of send_goal_async(); returns the goal ID or None."""
+        future = self.send_goal_async(x, y, yaw_deg, timeout=None)
+        if future.done() and future.exception() is not None:
+            print(f"[RosGoalSender] ERROR: {future.exception()}; aborting goal.")
+            return None
+        return future.goal_id
 
     def close(self):
-        """Close rosbridge only if this instance owns the connection (CLI mode)."""
+        """Drop publishers/subscriptions; close rosbridge only if we own it (CLI mode)."""
+        self.ros.off('close', self._on_close)
+        for topic in self._publishers:
+            topic.unadvertise()
+        for topic in self._status_topics:
+            topic.unsubscribe()
+        self._publishers = []
+        self._status_topics = []
+
         if self._owns_connection and self.ros is not None:
             print("[RosGoalSender] Terminating rosbridge connection...")
             self.ros.terminate()
 
 
 # Backward-compatible CLI usage
-def send_goal(x, y, yaw_deg, robot_ip="192.168.2.115", port=9090):
+def send_goal(x, y, yaw_deg, robot_ip="192.168.2.115", port=9090, timeout=10.0):
     """
     Legacy helper for CLI:
 
         python3 send_goal.py 1.0 2.5 0
 
-    This uses its own connection, independent of the Qt UI.
+    This uses its own connection, independent of the Qt UI, and waits
+    until move_base acknowledges the goal (or timeout).
     """
     sender = RosGoalSender(ros=None, robot_ip=robot_ip, port=port)
-    sender.send_goal(x, y, yaw_deg)
-    time.sleep(0.5)
-    sender.close()
+    try:
+        status = sender.send_goal_async(x, y, yaw_deg, timeout=timeout).result()
+        print(f"[RosGoalSender] move_base status: {STATUS_NAMES.get(status, status)}")
+    except Exception as e:
+        print(f"[RosGoalSender] Goal not acknowledged: {e}")
+    finally:
+        sender.close()
 
 
 if __name__ == "__main__":
@@ -1,22 +1,93 @@
 #!/usr/bin/env python3
 import math
 import threading
+import time
+from collections import defaultdict
+
 import roslibpy
 
+from map_state import MapState
+
 ROBOT_IP = "192.168.2.115"
 ROBOT_PORT = 9090
+
+# Events published on Telemetry.bus
+CONNECTED = "connected"      # value: None
+POSE = "pose"                # value: (x, y, yaw_deg, speed, stamp)
+MAP = "map"                  # value: None -> drain Telemetry.map_state
+NAV_STATUS = "nav_status"    # value: actionlib_msgs/GoalStatusArray dict
+
+_MISSING = object()
+
+
+class TelemetryBus:
+    """
+    Coalescing publish/subscribe bus.
+
+    Each event type is delivered at most `max_rate_hz` times per second:
+    a publish inside the rate window replaces the pending value and a
+    trailing delivery is scheduled, so subscribers always end up with the
+    latest value but never see more than the UI can use. Callbacks run on
+    the publishing thread (or a timer thread), so Qt users should bounce
+    them onto the GUI thread with a queued signal.
+    """
+
+    def __init__(self, max_rate_hz=20.0):
+        self._period = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(list)
+        self._pending = {}
+        self._last_emit = {}
+        self._timers = {}
+
+    def subscribe(self, event, callback):
+        with self._lock:
+            self._subscribers[event].append(callback)
+
+    def publish(self, event, value=None):
+        with self._lock:
+            self._pending[event] = value
+            if event in self._timers:
+                return      # trailing delivery already scheduled
+
+            delay = self._last_emit.get(event, 0.0) + self._period - time.monotonic()
+            if delay > 0:
+                timer = threading.Timer(delay, self._flush, (event,))
+                timer.daemon = True
+                self._timers[event] = timer
+                timer.start()
+                return
+
+        self._flush(event)
+
+    def _flush(self, event):
+        with self._lock:
+            self._timers.pop(event, None)
+            value = self._pending.pop(event, _MISSING)
+            if value is _MISSING:
+                return
+            self._last_emit[event] = time.monotonic()
+            callbacks = list(self._subscribers[event])
+
+        for cb in callbacks:
+            try:
+                cb(value)
+            except Exception as e:
+                print(f"[Telemetry] Subscriber for '{event}' failed: {e}")
+
+
 class Telemetry:
-    def __init__(self):
-        self._map_lock = threading.Lock()
-        self._map_info = None
-        self._map_data = None
-        self._map_ready = False
+    def __init__(self, max_ui_rate_hz=20.0):
+        self.bus = TelemetryBus(max_ui_rate_hz)
+
+        self.map_state = MapState()
         self._nav_status_lock = threading.Lock()
         self._nav_status = None
-
+        self._nav_status_key = None
 
         self._pose_lock = threading.Lock()
         self._latest_pose = None
+        self.pose_stamp = None
 
         self.ros = roslibpy.Ros(host=ROBOT_IP, port=ROBOT_PORT)
 
@@ -27,10 +98,14 @@ class Telemetry:
         print("[Telemetry] Connecting to rosbridge...")
         self.ros.run()
         print("[Telemetry] Connected.")
+        self.bus.publish(CONNECTED)
 
         map_topic = roslibpy.Topic(self.ros, "/map", "nav_msgs/OccupancyGrid")
         map_topic.subscribe(self._handle_map)
 
+        map_updates_topic = roslibpy.Topic(self.ros, "/map_updates", "map_msgs/OccupancyGridUpdate")
+        map_updates_topic.subscribe(self._handle_map_update)
+
         odom_topic = roslibpy.Topic(self.ros, "/odom", "nav_msgs/Odometry")
         odom_topic.subscribe(self._handle_odom)
         
@@ -38,25 +113,35 @@ class Telemetry:
         status_topic.subscribe(self._handle_status)
 
     def _handle_status(self, msg):
+        # move_base republishes the same status array at ~5 Hz; only
+        # forward it when a goal's state actually changed.
+        key = tuple(
+            (s.get("goal_id", {}).get("id"), s.get("status"))
+            for s in msg.get("status_list", [])
+        )
         with self._nav_status_lock:
             self._nav_status = msg
+            changed = key != self._nav_status_key
+            self._nav_status_key = key
+
+        if changed:
+            self.bus.publish(NAV_STATUS, msg)
 
     def get_nav_status(self):
         with self._nav_status_lock:
             return self._nav_status
 
-
-
-
     def _handle_map(self, msg):
-        with self._map_lock:
-            if self._map_ready:
-                return
-            self._map_info = msg["info"]
-            self._map_data = msg["data"]
-            self._map_ready = True
+        first = not self.map_state.ready
+        if self.map_state.set_full(msg["info"], msg["data"]):
+            self.bus.publish(MAP)
+        if first:
             print("[Telemetry] /map received.")
 
+    def _handle_map_update(self, msg):
+        if self.map_state.apply_update(msg):
+            self.bus.publish(MAP)
+
     def _handle_odom(self, msg):
         pos = msg["pose"]["pose"]["position"]
         ori = msg["pose"]["pose"]["orientation"]
@@ -71,15 +156,19 @@ class Telemetry:
         yaw_deg = math.degrees(math.atan2(siny, cosy))
 
         speed = twist["linear"]["x"]
+        stamp = time.monotonic()
 
+        pose = (x, y, yaw_deg, speed)
         with self._pose_lock:
-            self._latest_pose = (x, y, yaw_deg, speed)
+            if pose == self._latest_pose:
+                return
+            self._latest_pose = pose
+            self.pose_stamp = stamp
+
+        self.bus.publish(POSE, pose + (stamp,))
 
     def get_map(self):
-        with self._map_lock:
-            if not self._map_ready:
-                return None, None
-            return self._map_info, self._map_data
+        return self.map_state.snapshot()
 
     def get_pose(self):
         with self._pose_lock:
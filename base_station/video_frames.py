@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Frame plumbing for the live video feed.
+
+GStreamer hands frames to appsink on its streaming thread. FrameRing copies
+each mapped buffer exactly once into one of a few preallocated numpy slots,
+so the GstBuffer can be unmapped immediately, and the GUI thread wraps the
+latest slot in a QImage without copying. The writer never touches the slot
+the GUI is painting or the one waiting to be painted.
+
+rounded_corner_mask() builds the static overlay that gives the video its
+rounded corners, once per widget size instead of once per frame.
+
+GstBusWatcher runs the pipeline's bus on a private GLib main loop in its
+own thread and forwards the messages the UI cares about as Qt signals, so
+nothing on the GUI thread has to poll GStreamer.
+"""
+
+import threading
+
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QPixmap
+
+# appsink caps: BGRx is QImage.Format_RGB32 on little-endian, Qt's native
+# fast path, and 4 bytes/pixel avoids RGB888 row-padding issues.
+FRAME_FORMAT = "BGRx"
+QIMAGE_FORMAT = QImage.Format_RGB32
+
+
+class FrameRing:
+    def __init__(self, slots=3):
+        self._slots = [None] * slots
+        self._shape = [None] * slots      # (width, height, stride) per slot
+        self._lock = threading.Lock()
+        self._latest = None
+        self._reading = None
+
+    def write(self, data, width, height, stride):
+        """Copy one frame from a mapped buffer (streaming thread)."""
+        with self._lock:
+            index = next(
+                i for i in range(len(self._slots)) if i != self._latest and i != self._reading
+            )
+
+        src = np.frombuffer(data, dtype=np.uint8, count=height * stride).reshape(height, stride)
+        buf = self._slots[index]
+        if buf is None or buf.shape != src.shape:
+            buf = self._slots[index] = np.empty_like(src)
+        np.copyto(buf, src)
+        self._shape[index] = (width, height, stride)
+
+        with self._lock:
+            self._latest = index
+
+    def acquire(self):
+        """Pin the latest frame and return it as a QImage (GUI thread), or None."""
+        with self._lock:
+            if self._latest is None:
+                return None
+            self._reading = self._latest
+            index = self._reading
+
+        width, height, stride = self._shape[index]
+        return QImage(self._slots[index].data, width, height, stride, QIMAGE_FORMAT)
+
+    def release(self):
+        with self._lock:
+            self._reading = None
+
+    def clear(self):
+        """Forget the latest frame (e.g. after the stream dropped)."""
+        with self._lock:
+            self._latest = None
+
+
+def rounded_corner_mask(width, height, radius, color):
+    """Transparent pixmap with `color` painted outside a rounded rect."""
+    mask = QPixmap(width, height)
+    mask.fill(Qt.transparent)
+
+    outside = QPainterPath()
+    outside.addRect(QRectF(0, 0, width, height))
+    inner = QPainterPath()
+    inner.addRoundedRect(QRectF(0, 0, width, height), radius, radius)
+
+    p = QPainter(mask)
+    p.setRenderHint(QPainter.Antialiasing)
+    p.fillPath(outside.subtracted(inner), color)
+    p.end()
+    return mask
+
+
+class GstBusWatcher(QObject):
+    error = pyqtSignal(str)
+    eos = pyqtSignal()
+    stalled = pyqtSignal()         # udpsrc timeout: no packets for a while
+    playing = pyqtSignal()
+
+    def __init__(self, pipeline, parent=None):
+        super().__init__(parent)
+        from gi.repository import GLib, Gst
+
+        self.Gst = Gst
+        self.pipeline = pipeline
+
+        # A private context: Qt may already own GLib's default one on this thread
+        self._context = GLib.MainContext.new()
+        self._loop = GLib.MainLoop.new(self._context, False)
+
+        self._bus = pipeline.get_bus()
+        self._context.push_thread_default()
+        self._bus.add_signal_watch()
+        self._context.pop_thread_default()
+        self._handler = self._bus.connect("message", self._on_message)
+
+        self._thread = threading.Thread(target=self._run, name="gst-bus", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self._context.push_thread_default()
+        self._loop.run()
+        self._context.pop_thread_default()
+
+    def stop(self):
+        self._bus.disconnect(self._handler)
+        self._bus.remove_signal_watch()
+        self._loop.quit()
+        self._thread.join(timeout=1.0)
+
+    def _on_message(self, bus, msg):
+        # GLib thread: only emit (queued) signals from here
+        Gst = self.Gst
+        if msg.type == Gst.MessageType.ERROR:
+            err, _debug = msg.parse_error()
+            self.error.emit(f"{msg.src.get_name()}: {err.message}")
+        elif msg.type == Gst.MessageType.EOS:
+            self.eos.emit()
+        elif msg.type == Gst.MessageType.LATENCY:
+            self.pipeline.recalculate_latency()
+        elif msg.type == Gst.MessageType.ELEMENT:
+            st = msg.get_structure()
+            if st is not None and st.get_name() == "GstUDPSrcTimeout":
+                self.stalled.emit()
+        elif msg.type == Gst.MessageType.STATE_CHANGED and msg.src == self.pipeline:
+            _old, new, _pending = msg.parse_state_changed()
+            if new == Gst.State.PLAYING:
+                self.playing.emit()
+
+
+# ---------------------- Benchmark ----------------------
+
+def _legacy_frame(frame, w, h, display_w, display_h):
+    """Old path: QImage over the buffer, fresh rounded QPixmap per frame, scaled by QLabel."""
+    qimg = QImage(frame.data, w, h, 3 * w, QImage.Format_RGB888).copy()
+    pix = QPixmap.fromImage(qimg)
+    rounded = QPixmap(pix.size())
+    rounded.fill(Qt.transparent)
+    p = QPainter(rounded)
+    p.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    path.addRoundedRect(0, 0, pix.width(), pix.height(), 24, 24)
+    p.setClipPath(path)
+    p.drawPixmap(0, 0, pix)
+    p.end()
+    # QLabel.setScaledContents(True) scales on every paint
+    return rounded.scaled(display_w, display_h)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtGui import QColor
+    from PyQt5.QtWidgets import QApplication
+
+    parser = argparse.ArgumentParser(description="Compare legacy and ring-buffer video frame paths.")
+    parser.add_argument("--src", default="1280x720", help="decoded stream size")
+    parser.add_argument("--display", default="640x360", help="on-screen video size")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    sw, sh = map(int, args.src.split("x"))
+    dw, dh = map(int, args.display.split("x"))
+    rng = np.random.default_rng(0)
+
+    rgb = rng.integers(0, 255, (sh, sw, 3), dtype=np.uint8)
+    target = QImage(dw, dh, QImage.Format_RGB32)
+
+    t = time.perf_counter()
+    for _ in range(args.frames):
+        pm = _legacy_frame(rgb, sw, sh, dw, dh)
+        p = QPainter(target)
+        p.drawPixmap(0, 0, pm)
+        p.end()
+    legacy = (time.perf_counter() - t) / args.frames
+
+    # New path: videoscale already delivered display-size BGRx frames
+    bgrx = rng.integers(0, 255, (dh, dw * 4), dtype=np.uint8)
+    ring = FrameRing()
+    mask = rounded_corner_mask(dw, dh, 24, QColor("white"))
+    t = time.perf_counter()
+    for _ in range(args.frames):
+        ring.write(bgrx, dw, dh, dw * 4)
+        img = ring.acquire()
+        p = QPainter(target)
+        p.drawImage(0, 0, img)
+        p.drawPixmap(0, 0, mask)
+        p.end()
+        ring.release()
+    ring_ms = (time.perf_counter() - t) / args.frames
+
+    print(f"legacy: {legacy * 1000:.2f} ms/frame ({args.src} -> {args.display})")
+    print(f"ring:   {ring_ms * 1000:.2f} ms/frame ({args.display} from videoscale)")
+    print(f"saving: {(legacy - ring_ms) * 1000:.2f} ms/frame ({legacy / ring_ms:.1f}x)")
@@ -159,7 +159,7 @@ model.load_state_dict(state["net"], strict=True)
 # -----------------------------
 # NO THREAD VERSION
 # -----------------------------
-def satisficationEvaluation(save_path):
+def satisficationEvaluation(save_path, recording_session_id=None):
     print(f"Start processing: {save_path}")
 
     handler = VideoEmotionHandle(save_path, model)
@@ -191,7 +191,8 @@ def satisficationEvaluation(save_path):
     # Send result to API
     url = f"{backend_url}/deliveryRecord/updateSatistifiedResult"
     data = {"statisfication": str(satistifiedResult), 
-            "video_url": save_path }
+            "video_url": save_path,
+            "recording_session_id": recording_session_id }
 
     print(url)
     try:
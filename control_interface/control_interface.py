@@ -1,4 +1,5 @@
 import sys
+import json
 import threading
 import socket
 import time
@@ -8,10 +9,11 @@ from PyQt5.QtWidgets import (
     QGridLayout, QTextEdit
 )
 from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import numpy as np
 import cv2
 import requests
+import websocket
 
 # --- UDP Video Stream Parameters ---
 UDP_IP = "0.0.0.0" # Listen on ALL interfaces, not just the specific IP
@@ -26,6 +28,9 @@ class RobotControlInterface(QWidget):
     """
     Main application window for the robot control interface.
     """
+    # Backend /live events, emitted from the WebSocket thread
+    live_event = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Vendobots Robot Control Interface")
@@ -57,6 +62,11 @@ class RobotControlInterface(QWidget):
         self.sim_x = 0.0
         self.sim_y = 0.0
 
+        # --- LIVE ORDERS (pushed by the backend, no polling) ---
+        self.active_deliveries = {}
+        self.live_event.connect(self.on_live_event)
+        self.start_live_feed()
+
     def setup_ui(self):
         """Initializes all widgets and layouts."""
         main_layout = QHBoxLayout(self)
@@ -245,7 +255,7 @@ class RobotControlInterface(QWidget):
     def sync_robot_data(self):
         """
         This loop runs every 1 second.
-        It uploads LOCATION and downloads ORDERS.
+        It uploads LOCATION; orders arrive through the live feed.
         """
         # 1. SIMULATE MOVEMENT (Replace this with real sensor data later)
         self.sim_x += 0.5
@@ -256,11 +266,11 @@ class RobotControlInterface(QWidget):
 
         # 2. UPLOAD LOCATION TO DB
         try:
-            url = f"{self.api_base_url}/robots/{self.robot_id}/position"
-            payload = {"current_pos_x": current_x, "current_pos_y": current_y}
+            url = f"{self.api_base_url}/robots/positions"
+            payload = [{"robot_id": self.robot_id, "current_pos_x": current_x, "current_pos_y": current_y}]
             
             # Short timeout to prevent GUI freeze if server is offline
-            requests.put(url, json=payload, timeout=0.5)
+            requests.post(url, json=payload, timeout=0.5)
             
             # Update GUI
             self.location_value.setText(f"({current_x:.1f}, {current_y:.1f})")
@@ -272,28 +282,44 @@ class RobotControlInterface(QWidget):
         except Exception as e:
             self.log_message(f"Upload Error: {e}")
 
-        # 3. CHECK FOR NEW ORDERS
-        try:
-            url = f"{self.api_base_url}/deliveryRecord/{self.robot_id}"
-            response = requests.get(url, timeout=0.5)
-            
-            if response.status_code == 200:
-                records = response.json()
-                active_order_found = False
-                
-                for record in records:
-                    if record.get('status') in ['WAITING', 'IN_PROGRESS']:
-                        dest_x = record['dest_pos_x']
-                        dest_y = record['dest_pos_y']
-                        self.status_value.setText(f"DELIVERING TO ({dest_x}, {dest_y})")
-                        active_order_found = True
-                        break
-                
-                if not active_order_found:
-                    self.status_value.setText("IDLE - No Orders")
-                    
-        except Exception:
-            pass
+    # --- LIVE FEED ---
+
+    def start_live_feed(self):
+        """Snapshot + deltas of this robot's deliveries over /live/ws, in a background thread."""
+        url = self.api_base_url.replace("http", "ws", 1) + f"/live/ws?robot_id={self.robot_id}"
+        self.live_ws = websocket.WebSocketApp(
+            url,
+            on_message=lambda ws, message: self.live_event.emit(json.loads(message)),
+            on_error=lambda ws, error: print(f"[Live] {error}"),
+        )
+        # reconnect: retry every 3 s; each new connection starts with a fresh snapshot
+        threading.Thread(target=self.live_ws.run_forever, kwargs={"reconnect": 3}, daemon=True).start()
+
+    def on_live_event(self, event):
+        if event["type"] == "snapshot":
+            self.active_deliveries = {d["id"]: d for d in event["deliveries"]}
+        elif event["type"] == "delivery":
+            record = event["data"]
+            if event["op"] != "DELETE" and record.get("status") in ["WAITING", "IN_PROGRESS"]:
+                self.active_deliveries[record["id"]] = record
+            else:
+                self.active_deliveries.pop(record["id"], None)
+        else:
+            return
+        self.refresh_order_status()
+
+    def refresh_order_status(self):
+        if self.active_deliveries:
+            record = self.active_deliveries[min(self.active_deliveries)]
+            dest_x = record['dest_pos_x']
+            dest_y = record['dest_pos_y']
+            self.status_value.setText(f"DELIVERING TO ({dest_x}, {dest_y})")
+        else:
+            self.status_value.setText("IDLE - No Orders")
+
+    def closeEvent(self, event):
+        self.live_ws.close()
+        super().closeEvent(event)
 
 # --- Main Execution ---
 
@@ -64,16 +64,15 @@ def stop_record():
         out.release()
         out = None
         if videourl != 'NONE':
-            send_videourl = videourl+","+save_path
-           
+            # videourl carries the order's recording session id
             url = f"{backend_url}/deliveryRecord/updateVideoURL"
-            data = {"video_url": send_videourl}
+            data = {"recording_session_id": videourl, "video_url": save_path}
             try:
                 response = requests.post(url, json=data)
                 response.raise_for_status()  # raise exception for HTTP errors
                 print("Video URL sent successfully:")
                 
-                thread = threading.Thread(target=satisficationEvaluation, args=(save_path,), daemon=True)
+                thread = threading.Thread(target=satisficationEvaluation, args=(save_path, videourl), daemon=True)
                 thread.start()
             except requests.RequestException as e:
                 print("Failed to send video URL:", e)
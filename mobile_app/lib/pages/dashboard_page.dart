@@ -28,7 +28,7 @@ class _DashboardPageState extends State<DashboardPage> {
   void _refreshData() {
     setState(() {
       futureRobots = apiService.getRobots();
-      futureLogs = apiService.getLogs();
+      futureLogs = apiService.getLogs(limit: 5);
     });
   }
 
@@ -184,9 +184,9 @@ class _DashboardPageState extends State<DashboardPage> {
                         shrinkWrap: true,
                         physics: const NeverScrollableScrollPhysics(),
                         itemCount: logs.length > 5 ? 5 : logs.length, // Limit to 5
-                        // Show most recent logs first
+                        // Logs arrive most recent first
                         itemBuilder: (context, index) =>
-                            _activityCard(logs.reversed.toList()[index].message),
+                            _activityCard(logs[index].message),
                       );
                     } else {
                       return _activityCard("No logs found.");
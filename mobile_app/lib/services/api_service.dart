@@ -32,7 +32,7 @@ class ApiService {
 
   // Fetches all robots (from GET /robots)
   Future<List<Robot>> getRobots() async {
-    final response = await http.get(Uri.parse('$baseUrl/robots/'));
+    final response = await http.get(Uri.parse('$baseUrl/robots/?include=inventory'));
 
     if (response.statusCode == 200) {
       List<dynamic> jsonResponse = json.decode(response.body);
@@ -42,19 +42,26 @@ class ApiService {
     }
   }
 
+  // Every item: follows X-Next-Cursor until the last page.
   Future<List<InventoryItem>> getInventoryItems() async {
-    final response = await http.get(Uri.parse('$baseUrl/inventory/'));
-
-    if (response.statusCode == 200) {
+    final items = <InventoryItem>[];
+    String? cursor;
+    do {
+      final query = {'limit': '5000', if (cursor != null) 'cursor': cursor};
+      final response = await http.get(Uri.parse('$baseUrl/inventory/').replace(queryParameters: query));
+      if (response.statusCode != 200) {
+        throw Exception('Failed to load inventory');
+      }
       List<dynamic> jsonResponse = json.decode(response.body);
-      return jsonResponse.map((item) => InventoryItem.fromJson(item)).toList();
-    } else {
-      throw Exception('Failed to load inventory');
-    }
+      items.addAll(jsonResponse.map((item) => InventoryItem.fromJson(item)));
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor != null);
+    return items;
   }
 
-  Future<List<RobotLog>> getLogs() async {
-    final response = await http.get(Uri.parse('$baseUrl/logs/'));
+  // Newest first; the server pages results (see X-Next-Cursor).
+  Future<List<RobotLog>> getLogs({int limit = 50}) async {
+    final response = await http.get(Uri.parse('$baseUrl/logs/?order=desc&limit=$limit'));
     if (response.statusCode == 200) {
       List<dynamic> jsonResponse = json.decode(response.body);
       return jsonResponse.map((log) => RobotLog.fromJson(log)).toList();
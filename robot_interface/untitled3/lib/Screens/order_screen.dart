@@ -292,7 +292,7 @@ class _OrderScreenState extends State<OrderScreen> {
   Future<void> _loadFakeData2() async {
     try {
       // Fetch robot data from API
-      final response = await http.get(Uri.parse("$beUrl/robots/$robotId"));
+      final response = await http.get(Uri.parse("$beUrl/robots/$robotId?include=inventory"));
       if (response.statusCode == 200) {
         final Map<String, dynamic> data = jsonDecode(response.body);
 
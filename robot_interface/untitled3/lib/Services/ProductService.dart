@@ -12,7 +12,7 @@ class ProductService {
 
     try {
       // Fetch robot data from API
-      final response = await http.get(Uri.parse("$beUrl/robots/$idRobot"));
+      final response = await http.get(Uri.parse("$beUrl/robots/$idRobot?include=inventory"));
 
       if (response.statusCode == 200) {
         final Map<String, dynamic> data = jsonDecode(response.body);